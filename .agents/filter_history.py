@@ -1,16 +1,21 @@
 #!/usr/bin/env python3
 """Filter history entries to keep only those with matching SVG files"""
-import json
-from pathlib import Path
+import sys
 from datetime import datetime
+from pathlib import Path
+
+# Add the repo root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.storage import MonkeyStorage
+from src.svg_archive import SVGArchive
 
 # Load history
-with open("monkey_data/history.json", "r") as f:
-    history = json.load(f)
+storage = MonkeyStorage()
+history = {"entries": storage.get_history()}
 
 # Get list of available SVG files
-svg_dir = Path("monkey_evolution")
-svg_files = {f.name for f in svg_dir.glob("*_monkey.svg")}
+svg_files = {filename for filename, _ in SVGArchive().snapshots()}
 
 print(f"Total history entries: {len(history['entries'])}")
 print(f"Available SVG files: {len(svg_files)}")
@@ -36,8 +41,6 @@ for entry in history['entries']:
 print(f"\nKept: {len(kept_entries)} | Removed: {len(history['entries']) - len(kept_entries)}")
 
 # Save filtered history
-history['entries'] = kept_entries
-with open("monkey_data/history.json", "w") as f:
-    json.dump(history, f, indent=2)
+storage.replace_history(kept_entries)
 
-print(f"✅ Saved {len(kept_entries)} entries to history.json")
+print(f"✅ Saved {len(kept_entries)} entries to {storage.backend.name()}")
@@ -0,0 +1,233 @@
+"""
+ForkMonkey Genetics Benchmarks
+
+Times the genetics hot paths at several population sizes and fails when an
+operation is slower than its baseline on the same machine by more than a
+threshold. The baseline is the median of the last recorded runs, and only runs
+without regressions are recorded (unless accepted with --accept), so a slow
+run never becomes the new baseline.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_genetics                  # 1, 1k and 100k monkeys
+    python -m benchmarks.bench_genetics --sizes 1,1000000
+    python -m benchmarks.bench_genetics --no-save --threshold 0.5
+    python -m benchmarks.bench_genetics --accept         # Record a deliberate slowdown
+"""
+
+import argparse
+import itertools
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import timeit
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from src.genetics import GeneticsEngine
+
+
+HISTORY_FILE = Path(__file__).parent / "history.json"
+DEFAULT_SIZES = [1, 1000, 100000]
+DEFAULT_THRESHOLD = 0.25  # Fail when an operation is 25% slower than its baseline
+BASELINE_RUNS = 5  # Recorded runs per machine the baseline median is taken over
+POOL_SIZE = 10000  # Prepared monkeys are cycled instead of keeping 1M in memory
+
+
+def _pool(size: int) -> list:
+    """Prepared input monkeys, reused by the benchmarks that need DNA to work on"""
+    rng = random.Random(0)
+    return [GeneticsEngine.generate_random_dna(rng=rng) for _ in range(min(size, POOL_SIZE))]
+
+
+def _cycled(items: list, n: int):
+    """First n items of items repeated endlessly"""
+    return itertools.islice(itertools.cycle(items), n)
+
+
+def build_benchmarks(n: int) -> Dict[str, Callable[[], None]]:
+    """Callables that each run one operation n times"""
+    pool = _pool(n)
+    dicts = [GeneticsEngine.dna_to_dict(dna) for dna in pool]
+    rng = random.Random(1)
+
+    def generate():
+        for _ in range(n):
+            GeneticsEngine.generate_random_dna(rng=rng)
+
+    def generate_batch():
+        GeneticsEngine.generate_random_dna_batch(n, rng=rng)
+
+    def breed():
+        for dna in _cycled(pool, n):
+            GeneticsEngine.breed(dna, rng=rng)
+
+    def evolve():
+        for dna in _cycled(pool, n):
+            GeneticsEngine.evolve(dna, rng=rng)
+
+    def calculate_hash():
+        for dna in _cycled(pool, n):
+            dna._calculate_hash()
+
+    def rarity_score():
+        for dna in _cycled(pool, n):
+            dna.get_rarity_score()
+
+    def dna_to_dict():
+        for dna in _cycled(pool, n):
+            GeneticsEngine.dna_to_dict(dna)
+
+    def dict_to_dna():
+        for data in _cycled(dicts, n):
+            GeneticsEngine.dict_to_dna(data)
+
+    return {
+        "generate_random_dna": generate,
+        "generate_random_dna_batch": generate_batch,
+        "breed": breed,
+        "evolve": evolve,
+        "calculate_hash": calculate_hash,
+        "get_rarity_score": rarity_score,
+        "dna_to_dict": dna_to_dict,
+        "dict_to_dna": dict_to_dna
+    }
+
+
+def time_benchmark(func: Callable[[], None], n: int, repeat: int = 3) -> float:
+    """Best wall-clock seconds per single operation"""
+    timer = timeit.Timer(func)
+    # Small sizes are looped until a run takes long enough to time reliably
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / (number * n)
+
+
+def run_benchmarks(sizes: List[int], only: Optional[List[str]] = None, repeat: int = 3) -> Dict[str, float]:
+    """
+    Run every benchmark at every size
+
+    Args:
+        sizes: Population sizes (number of monkeys per run)
+        only: Benchmark names to run (defaults to all)
+        repeat: Timed repetitions per benchmark; the fastest is kept
+
+    Returns:
+        Seconds per operation keyed by "<benchmark>[<size>]"
+    """
+    results = {}
+    for n in sizes:
+        for name, func in build_benchmarks(n).items():
+            if only and name not in only:
+                continue
+            key = f"{name}[{n}]"
+            results[key] = time_benchmark(func, n, repeat)
+            print(f"   {key:<36} {results[key] * 1e6:10.2f} µs/op")
+    return results
+
+
+def machine_id(name: Optional[str] = None) -> str:
+    """
+    Identify the machine and interpreter, so runs are only compared like for like
+
+    Args:
+        name: Machine name to use instead of the host name (CI runners get a new
+            host name every run)
+    """
+    node = name or platform.node()
+    return f"{node}/{platform.machine()}/{platform.python_implementation()}-{platform.python_version()}"
+
+
+def load_history(path: Path = HISTORY_FILE) -> List[dict]:
+    """Load recorded runs"""
+    if not path.exists():
+        return []
+    with open(path) as f:
+        return json.load(f).get("runs", [])
+
+
+def save_run(run: dict, path: Path = HISTORY_FILE):
+    """Append a run to the history file"""
+    runs = load_history(path)
+    runs.append(run)
+    with open(path, "w") as f:
+        json.dump({"runs": runs}, f, indent=2)
+
+
+def baseline_timings(history: List[dict], machine: str, runs: int = BASELINE_RUNS) -> Dict[str, float]:
+    """Median timing of each benchmark over its last `runs` recorded runs on this machine"""
+    timings: Dict[str, List[float]] = {}
+    for run in history:
+        if run.get("machine") == machine:
+            for key, seconds in run["results"].items():
+                timings.setdefault(key, []).append(seconds)
+    return {key: statistics.median(values[-runs:]) for key, values in timings.items()}
+
+
+def find_regressions(
+    results: Dict[str, float],
+    history: List[dict],
+    machine: str,
+    threshold: float = DEFAULT_THRESHOLD
+) -> Dict[str, float]:
+    """
+    Compare results against the baseline of each benchmark on this machine
+
+    Returns:
+        Relative slowdown (0.3 = 30% slower) for every benchmark past the threshold
+    """
+    baseline = baseline_timings(history, machine)
+
+    regressions = {}
+    for key, seconds in results.items():
+        previous = baseline.get(key)
+        if previous and seconds > previous * (1 + threshold):
+            regressions[key] = seconds / previous - 1
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the ForkMonkey genetics engine")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="Comma-separated population sizes (up to 1000000)")
+    parser.add_argument("--only", help="Comma-separated benchmark names to run")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed repetitions per benchmark")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed slowdown before failing (0.25 = 25%%)")
+    parser.add_argument("--history", type=Path, default=HISTORY_FILE, help="JSON history file")
+    parser.add_argument("--machine", help="Machine name for the history (defaults to the host name)")
+    parser.add_argument("--no-save", action="store_true", help="Do not record this run")
+    parser.add_argument("--accept", action="store_true",
+                        help="Record this run even if it has regressions, and do not fail")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    only = args.only.split(",") if args.only else None
+
+    print(f"⏱️  Benchmarking genetics at sizes {sizes}\n")
+    results = run_benchmarks(sizes, only, args.repeat)
+
+    machine = machine_id(args.machine)
+    regressions = find_regressions(results, load_history(args.history), machine, args.threshold)
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) over {args.threshold:.0%}:")
+        for key, slowdown in sorted(regressions.items()):
+            print(f"   {key}: {slowdown:.0%} slower")
+
+    # A run with regressions would drag the baseline along, so it needs --accept
+    if not args.no_save and (args.accept or not regressions):
+        save_run({"timestamp": int(time.time()), "machine": machine, "results": results}, args.history)
+        print(f"\n💾 Recorded run in {args.history}")
+
+    if regressions and not args.accept:
+        print("   Not recorded; rerun with --accept if the slowdown is intended")
+        return 1
+
+    print("\n✅ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,40 +1,45 @@
-import os
-import glob
 from pathlib import Path
 from PIL import Image
 import io
 import subprocess
 
+from src.svg_archive import SVGArchive
+
 EVOLUTION_DIR = "monkey_evolution"
 OUTPUT_FILE = "monkey_evolution/evolution.gif"
 DURATION = 500  # ms between frames
 
 def create_animation():
-    svg_files = sorted(glob.glob(os.path.join(EVOLUTION_DIR, "*_monkey*.svg")))
+    archive = SVGArchive(Path(EVOLUTION_DIR))
+    snapshots = list(archive.snapshots())
     
-    if not svg_files:
+    if not snapshots:
         print("No SVG files found in monkey_evolution/")
         return
 
-    print(f"Found {len(svg_files)} evolution steps.")
+    print(f"Found {len(snapshots)} evolution steps.")
     
     frames = []
-    for svg_path in svg_files:
-        print(f"Processing {os.path.basename(svg_path)}...")
+    rendered = {}  # Identical snapshots share a content hash, render each once
+    for filename, svg_hash in snapshots:
+        print(f"Processing {filename}...")
+        key = svg_hash or filename
         try:
-            # Use rsvg-convert CLI to convert SVG to PNG
-            result = subprocess.run(
-                ["rsvg-convert", svg_path], 
-                capture_output=True, 
-                check=True
-            )
-            png_data = result.stdout
-            img = Image.open(io.BytesIO(png_data))
-            frames.append(img)
+            if key not in rendered:
+                # Use rsvg-convert CLI to convert SVG (loose or packed) to PNG
+                result = subprocess.run(
+                    ["rsvg-convert"], 
+                    input=archive.read(filename).encode(),
+                    capture_output=True, 
+                    check=True
+                )
+                png_data = result.stdout
+                rendered[key] = Image.open(io.BytesIO(png_data))
+            frames.append(rendered[key])
         except subprocess.CalledProcessError as e:
-            print(f"rsvg-convert failed for {svg_path}: {e}")
+            print(f"rsvg-convert failed for {filename}: {e}")
         except Exception as e:
-            print(f"Error processing {svg_path}: {e}")
+            print(f"Error processing {filename}: {e}")
 
     if frames:
         print(f"Generating GIF with {len(frames)} frames...")
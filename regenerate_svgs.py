@@ -1,10 +1,9 @@
 #!/usr/bin/env python3
 """
-Regenerate missing SVG files from history.json entries.
+Regenerate missing SVG files from history entries.
 Uses stored trait data to recreate the visual appearance.
 """
 
-import json
 from pathlib import Path
 import sys
 
@@ -12,6 +11,8 @@ import sys
 sys.path.insert(0, str(Path(__file__).parent))
 
 from src.genetics import MonkeyDNA, Trait, TraitCategory, Rarity, GeneticsEngine
+from src.storage import MonkeyStorage
+from src.svg_archive import SVGArchive
 from src.visualizer import MonkeyVisualizer
 
 
@@ -51,7 +52,7 @@ def create_dna_from_traits(traits_dict: dict, entry: dict) -> MonkeyDNA:
                 gene_sequence=f"regen_{trait_value}"
             )
     
-    return MonkeyDNA(
+    return MonkeyDNA.from_trusted(
         generation=entry.get("generation", 1),
         parent_id=None,
         traits=traits,
@@ -62,27 +63,22 @@ def create_dna_from_traits(traits_dict: dict, entry: dict) -> MonkeyDNA:
 
 
 def main():
-    history_file = Path("monkey_data/history.json")
-    evolution_dir = Path("monkey_evolution")
-    evolution_dir.mkdir(exist_ok=True)
+    archive = SVGArchive()
     
-    with open(history_file) as f:
-        history = json.load(f)
+    history = MonkeyStorage().get_history()
     
     regenerated = 0
     skipped = 0
     
-    for entry in history["entries"]:
+    for entry in history:
         svg_filename = entry.get("svg_filename")
         if not svg_filename:
             print(f"⚠️  Entry {entry['timestamp']}: No svg_filename, skipping")
             skipped += 1
             continue
         
-        svg_path = evolution_dir / svg_filename
-        
-        # Skip if already exists
-        if svg_path.exists():
+        # Skip if already archived
+        if svg_filename in archive:
             print(f"✓ {svg_filename} already exists")
             skipped += 1
             continue
@@ -98,7 +94,7 @@ def main():
         try:
             dna = create_dna_from_traits(traits, entry)
             svg = MonkeyVisualizer.generate_svg(dna)
-            svg_path.write_text(svg)
+            archive.add(svg, svg_filename)
             print(f"✅ Regenerated {svg_filename}")
             regenerated += 1
         except Exception as e:
@@ -18,12 +18,20 @@ from rich.panel import Panel
 
 from src.genetics import GeneticsEngine, MonkeyDNA, TraitCategory
 from src.storage import MonkeyStorage
+from src.svg_archive import SVGArchive
 from src.visualizer import MonkeyVisualizer
 from src.evolution import EvolutionAgent
 
 console = Console()
 
 
+def open_storage() -> MonkeyStorage:
+    """MonkeyStorage with a session that lasts until the current command finishes"""
+    storage = MonkeyStorage()
+    click.get_current_context().with_resource(storage.session())
+    return storage
+
+
 @click.group()
 def cli():
     """🐵 ForkMonkey - Your AI-powered digital pet on GitHub"""
@@ -37,7 +45,7 @@ def init(from_fork, force):
     """Initialize a new monkey"""
     console.print("\n🐵 [bold cyan]Initializing ForkMonkey...[/bold cyan]\n")
     
-    storage = MonkeyStorage()
+    storage = open_storage()
     
     # Check if monkey already exists
     existing_dna = storage.load_dna()
@@ -67,25 +75,16 @@ def init(from_fork, force):
         console.print("[cyan]🎲 Generating random monkey...[/cyan]")
         dna = GeneticsEngine.generate_random_dna()
     
-    # Save DNA
-    storage.save_dna_locally(dna)
-    storage.save_stats(dna, age_days=0)
-    
     # Generate initial visualization
     svg = MonkeyVisualizer.generate_svg(dna)
     svg_file = Path("monkey_data/monkey.svg")
     svg_file.write_text(svg)
     
-    # Archive with timestamp
-    from datetime import datetime, timezone
-    timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d_%H-%M")
-    svg_filename = f"{timestamp}_monkey.svg"
-    archive_file = Path(f"monkey_evolution/{svg_filename}")
-    archive_file.parent.mkdir(exist_ok=True)
-    archive_file.write_text(svg)
+    # Archive with timestamp (deduplicated by content)
+    svg_filename = SVGArchive().add(svg)
     
-    # Save history with SVG filename
-    storage.save_history_entry(dna, "🎉 Your monkey was born!", svg_filename=svg_filename)
+    # Save DNA, stats and history with SVG filename in one step
+    storage.commit_evolution(dna, "🎉 Your monkey was born!", svg_filename=svg_filename, age_days=0)
     
     # Display info
     console.print("\n[bold green]✅ Monkey initialized![/bold green]\n")
@@ -114,7 +113,7 @@ def evolve(ai, strength):
     """Evolve your monkey"""
     console.print("\n🧬 [bold cyan]Evolving monkey...[/bold cyan]\n")
     
-    storage = MonkeyStorage()
+    storage = open_storage()
     
     # Load current DNA
     dna = storage.load_dna()
@@ -161,25 +160,18 @@ def evolve(ai, strength):
     if not changes:
         console.print("  [dim]No changes today[/dim]")
     
-    # Save
-    storage.save_dna_locally(evolved_dna)
-    storage.save_stats(evolved_dna, age_days=0)  # TODO: calculate actual age
-    
     # Generate new visualization
     svg = MonkeyVisualizer.generate_svg(evolved_dna)
     svg_file = Path("monkey_data/monkey.svg")
     svg_file.write_text(svg)
     
-    # Archive with timestamp (using UTC for consistency)
-    from datetime import datetime, timezone
-    timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d_%H-%M")
-    svg_filename = f"{timestamp}_monkey.svg"
-    archive_file = Path(f"monkey_evolution/{svg_filename}")
-    archive_file.parent.mkdir(exist_ok=True)
-    archive_file.write_text(svg)
+    # Archive with timestamp (using UTC for consistency, deduplicated by content)
+    archive = SVGArchive()
+    archive.migrate()
+    svg_filename = archive.add(svg)
     
-    # Save history with SVG filename
-    storage.save_history_entry(evolved_dna, story, svg_filename=svg_filename)
+    # Save DNA, stats and history with SVG filename in one step
+    storage.commit_evolution(evolved_dna, story, svg_filename=svg_filename, age_days=0)  # TODO: calculate actual age
     
     console.print(f"\n[bold green]✅ Evolution complete![/bold green]")
     console.print(f"New DNA: {evolved_dna.dna_hash}")
@@ -192,7 +184,7 @@ def show():
     """Show current monkey stats"""
     console.print("\n🐵 [bold cyan]Your Monkey[/bold cyan]\n")
     
-    storage = MonkeyStorage()
+    storage = open_storage()
     dna = storage.load_dna()
     
     if not dna:
@@ -200,8 +192,7 @@ def show():
         return
     
     # Get history for age
-    history = storage.get_history()
-    age_days = len(history)
+    age_days = storage.count_history()
     rarity = dna.get_rarity_score()
     
     # Calculate rarity percentile (simulated based on score distribution)
@@ -320,15 +311,15 @@ def history(limit):
     """Show evolution history"""
     console.print("\n📜 [bold cyan]Evolution History[/bold cyan]\n")
     
-    storage = MonkeyStorage()
-    entries = storage.get_history()
+    storage = open_storage()
+    entries = storage.tail_history(limit)
     
     if not entries:
         console.print("[yellow]No history yet.[/yellow]")
         return
     
     # Show recent entries
-    for entry in entries[-limit:]:
+    for entry in entries:
         timestamp = entry.get("timestamp", "Unknown")
         story = entry.get("story", "")
         mutations = entry.get("mutation_count", 0)
@@ -349,7 +340,7 @@ def visualize():
     """Generate and save monkey visualization"""
     console.print("\n🎨 [bold cyan]Generating visualization...[/bold cyan]\n")
     
-    storage = MonkeyStorage()
+    storage = open_storage()
     dna = storage.load_dna()
     
     if not dna:
@@ -361,15 +352,11 @@ def visualize():
     svg_file = Path("monkey_data/monkey.svg")
     svg_file.write_text(svg)
     
-    # Archive with timestamp (using UTC for consistency)
-    from datetime import datetime, timezone
-    timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d_%H-%M")
-    archive_file = Path(f"monkey_evolution/{timestamp}_monkey.svg")
-    archive_file.parent.mkdir(exist_ok=True)
-    archive_file.write_text(svg)
+    # Archive with timestamp (using UTC for consistency, deduplicated by content)
+    svg_filename = SVGArchive().add(svg)
     
     console.print(f"[green]✅ SVG saved to: {svg_file}[/green]")
-    console.print(f"[dim]   Archived to: {archive_file}[/dim]")
+    console.print(f"[dim]   Archived as: monkey_evolution/{svg_filename}[/dim]")
     
     # Try to open in browser
     try:
@@ -380,12 +367,49 @@ def visualize():
         pass
 
 
+@cli.command()
+@click.option('--codec', type=click.Choice(['zlib', 'zstd']), default='zlib',
+              help='Compression (zstd needs the zstandard package)')
+def pack(codec):
+    """Compress the SVG evolution archive into one pack file"""
+    console.print("\n📦 [bold cyan]Packing evolution archive...[/bold cyan]\n")
+    
+    archive = SVGArchive()
+    try:
+        count, raw_size, packed_size = archive.pack_objects(codec)
+    except RuntimeError as e:
+        console.print(f"[red]❌ {e}[/red]")
+        return
+    
+    if not count:
+        console.print("[yellow]⚠️  No SVG snapshots to pack[/yellow]")
+        return
+    
+    console.print(f"[green]✅ Packed {count} SVGs into {archive.pack.path}[/green]")
+    console.print(f"[dim]   {raw_size / 1024:.0f} KB → {packed_size / 1024:.0f} KB[/dim]")
+
+
+@cli.command()
+def unpack():
+    """Extract the packed SVG archive back into individual files"""
+    console.print("\n📂 [bold cyan]Unpacking evolution archive...[/bold cyan]\n")
+    
+    archive = SVGArchive()
+    count = archive.unpack_objects()
+    
+    if not count:
+        console.print("[yellow]⚠️  No pack file found[/yellow]")
+        return
+    
+    console.print(f"[green]✅ Unpacked {count} SVGs into {archive.objects_dir}[/green]")
+
+
 @cli.command()
 def update_readme():
     """Update README with current monkey"""
     console.print("\n📝 [bold cyan]Updating README...[/bold cyan]\n")
     
-    storage = MonkeyStorage()
+    storage = open_storage()
     dna = storage.load_dna()
     
     if not dna:
@@ -405,12 +429,8 @@ def update_readme():
     svg_file = Path("monkey_data/monkey.svg")
     svg_file.write_text(svg)
     
-    # Archive with timestamp (using UTC for consistency)
-    from datetime import datetime, timezone
-    timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d_%H-%M")
-    archive_file = Path(f"monkey_evolution/{timestamp}_monkey.svg")
-    archive_file.parent.mkdir(exist_ok=True)
-    archive_file.write_text(svg)
+    # Archive with timestamp (using UTC for consistency, deduplicated by content)
+    SVGArchive().add(svg)
     
     # Update monkey display section with image reference
     monkey_section = '''<!-- MONKEY_DISPLAY_START -->
@@ -427,8 +447,7 @@ def update_readme():
     readme = re.sub(pattern, monkey_section, readme, flags=re.DOTALL)
     
     # Update stats section
-    history = storage.get_history()
-    age_days = len(history)
+    age_days = storage.count_history()
     rarity = dna.get_rarity_score()
     
     # Calculate rarity tier for display
@@ -478,15 +497,13 @@ def update_readme():
     if re.search(pattern, readme, flags=re.DOTALL):
         readme = re.sub(pattern, lineage_section, readme, flags=re.DOTALL)
     
-    # Update breeding boost section with urgency
-    import random
-    boost_messages = [
-        "⚡ **First 5 forks get +15% legendary trait inheritance!**",
-        "🔥 **Breeding boost active!** Fork now for enhanced trait inheritance.",
-        "✨ **Limited time:** Rare trait inheritance rates boosted!",
-        "🎯 **Today only:** Higher chance to inherit legendary traits!"
-    ]
-    boost_msg = random.choice(boost_messages)
+    # Update breeding boost section with this monkey's exact breeding odds
+    from src.odds import breeding_odds
+    odds = breeding_odds(dna)
+    boost_msg = (
+        f"🎯 **Breeding odds:** a fork of this monkey has a {odds['any_legendary']:.0%} chance "
+        f"of a legendary trait ({odds['any_rare_or_better']:.0%} for rare or better)!"
+    )
     
     breeding_section = f'''<!-- BREEDING_BOOST_START -->
 {boost_msg}
@@ -510,7 +527,7 @@ def share(copy, evolution, achievement):
     """Generate a shareable tweet about your monkey"""
     console.print("\n🐦 [bold cyan]Generating shareable tweet...[/bold cyan]\n")
     
-    storage = MonkeyStorage()
+    storage = open_storage()
     dna = storage.load_dna()
     
     if not dna:
@@ -518,8 +535,8 @@ def share(copy, evolution, achievement):
         return
     
     # Get stats
-    history = storage.get_history()
-    age_days = len(history)
+    age_days = storage.count_history()
+    history = storage.tail_history(1)
     rarity = dna.get_rarity_score()
     repo = os.environ.get('GITHUB_REPOSITORY', 'roeiba/forkMonkey')
     
@@ -612,7 +629,7 @@ def share_card(copy):
     """Generate a Wordle-style shareable evolution card"""
     console.print("\n🎨 [bold cyan]Generating Evolution Card...[/bold cyan]\n")
     
-    storage = MonkeyStorage()
+    storage = open_storage()
     dna = storage.load_dna()
     
     if not dna:
@@ -620,8 +637,8 @@ def share_card(copy):
         return
     
     # Get stats
-    history = storage.get_history()
-    age_days = len(history)
+    age_days = storage.count_history()
+    history = storage.tail_history(2)
     rarity = dna.get_rarity_score()
     repo = os.environ.get('GITHUB_REPOSITORY', 'roeiba/forkMonkey')
     
@@ -739,7 +756,7 @@ def streak():
     """Show your evolution streak"""
     console.print("\n🔥 [bold cyan]Evolution Streak[/bold cyan]\n")
     
-    storage = MonkeyStorage()
+    storage = open_storage()
     streak_data = storage.get_streak()
     
     current = streak_data.get("current", 0)
@@ -789,7 +806,7 @@ def achievements():
     """Show unlocked achievements"""
     console.print("\n🏆 [bold cyan]Achievements[/bold cyan]\n")
     
-    storage = MonkeyStorage()
+    storage = open_storage()
     dna = storage.load_dna()
     
     if not dna:
@@ -797,8 +814,8 @@ def achievements():
         return
     
     # Get history and stats for achievement checking
-    history = storage.get_history()
-    age_days = len(history)
+    age_days = storage.count_history()
+    first_entry = next(storage.iter_history(limit=1), None)
     rarity = dna.get_rarity_score()
     
     # Build stats dict for achievement checking
@@ -807,7 +824,7 @@ def achievements():
         "rarity_score": rarity,
         "generation": dna.generation,
         "total_mutations": dna.mutation_count,
-        "created_at": history[0].get("timestamp") if history else None,
+        "created_at": first_entry.get("timestamp") if first_entry else None,
         "children_count": 0,  # Would need to scan forks to get this
     }
     
@@ -873,7 +890,7 @@ def leaderboard():
     """Show your position on the rarity leaderboard"""
     console.print("\n🏆 [bold cyan]Rarity Leaderboard[/bold cyan]\n")
     
-    storage = MonkeyStorage()
+    storage = open_storage()
     dna = storage.load_dna()
     
     if not dna:
@@ -911,5 +928,66 @@ def leaderboard():
     console.print("\n[dim]View full leaderboard at your GitHub Pages site![/dim]")
 
 
+@cli.command()
+@click.option('--lineages', default=10, help='Number of root (Gen 1) monkeys')
+@click.option('--depth', default=10, help='Generations of forks below each root')
+@click.option('--fan-out', default=2, help='Forks bred from every monkey')
+@click.option('--mutation-rate', default=0.3, help='Breeding mutation rate (0-1)')
+@click.option('--evolve-days', default=0, help='Daily evolutions before each monkey is forked')
+@click.option('--strength', default=0.1, help='Evolution strength (0-1)')
+@click.option('--seed', default=0, help='Random seed (same seed, same results)')
+@click.option('--workers', default=None, type=int, help='Worker processes (default: CPU count)')
+@click.option('--output', '-o', type=click.Path(), help='Write per-generation stats as JSON lines')
+def simulate(lineages, depth, fan_out, mutation_rate, evolve_days, strength, seed, workers, output):
+    """Simulate fork trees and show trait statistics per generation"""
+    console.print("\n🧪 [bold cyan]Simulating lineages...[/bold cyan]\n")
+    
+    from src.genetics import Rarity
+    from src.simulate import run_simulation
+    
+    per_root = sum(fan_out ** level for level in range(depth + 1))
+    console.print(f"[dim]{lineages} lineages × {per_root} monkeys, {depth + 1} generations[/dim]\n")
+    
+    results = run_simulation(
+        lineages=lineages,
+        depth=depth,
+        fan_out=fan_out,
+        mutation_rate=mutation_rate,
+        evolve_days=evolve_days,
+        evolution_strength=strength,
+        seed=seed,
+        workers=workers
+    )
+    
+    table = Table(title="Trait Distribution by Generation")
+    table.add_column("Gen", style="cyan", justify="right")
+    table.add_column("Monkeys", justify="right")
+    table.add_column("Avg Rarity", style="green", justify="right")
+    table.add_column("Legendary %", style="magenta", justify="right")
+    table.add_column("Gen-Locked Carriers", style="yellow", justify="right")
+    table.add_column("Extinct", style="red", justify="right")
+    
+    for stats in results:
+        legendary = sum(histogram[Rarity.LEGENDARY] for histogram in stats.rarity_histogram.values())
+        total_traits = stats.count * len(TraitCategory)
+        table.add_row(
+            str(stats.generation),
+            str(stats.count),
+            f"{stats.avg_rarity:.1f}",
+            f"{legendary / total_traits * 100:.1f}" if total_traits else "0.0",
+            str(stats.gen_locked_carriers),
+            str(len(stats.extinct_gen_locked))
+        )
+    
+    console.print(table)
+    
+    if output:
+        import json
+        with open(output, "w") as f:
+            for stats in results:
+                f.write(json.dumps(stats.to_dict()) + "\n")
+        console.print(f"\n[dim]Stats written to: {output}[/dim]")
+
+
 if __name__ == "__main__":
     cli()
@@ -0,0 +1,479 @@
+"""
+ForkMonkey Community Index
+
+SQLite store for community scan results: repos, monkey stats and DNA, SVGs
+(deduplicated by hash), parent edges, scan runs and per-repo scan state
+(pushed_at, file SHAs and ETags) for incremental scans, SVGs rendered from DNA by
+the scanner, and the checkpoint of a fork crawl that ran out of budget. The scanner upserts what it
+finds and the web JSON files are produced from queries, so data persists between
+runs and ad-hoc questions can be answered without rescanning.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+DEFAULT_INDEX_PATH = Path("community_index.db")
+
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS repos (
+        full_name TEXT PRIMARY KEY,
+        owner TEXT NOT NULL,
+        name TEXT NOT NULL,
+        url TEXT,
+        parent TEXT,
+        degree INTEGER NOT NULL DEFAULT 0,
+        degree_label TEXT,
+        is_root INTEGER NOT NULL DEFAULT 0,
+        created_at TEXT,
+        updated_at TEXT,
+        last_seen_scan INTEGER
+    );
+    CREATE INDEX IF NOT EXISTS repos_parent ON repos (parent);
+    CREATE INDEX IF NOT EXISTS repos_degree ON repos (degree);
+    CREATE INDEX IF NOT EXISTS repos_last_seen_scan ON repos (last_seen_scan);
+
+    CREATE TABLE IF NOT EXISTS monkeys (
+        full_name TEXT PRIMARY KEY REFERENCES repos (full_name) ON DELETE CASCADE,
+        generation INTEGER NOT NULL DEFAULT 1,
+        rarity_score REAL NOT NULL DEFAULT 0,
+        age_days INTEGER NOT NULL DEFAULT 0,
+        mutation_count INTEGER NOT NULL DEFAULT 0,
+        dna_hash TEXT,
+        stats TEXT NOT NULL,
+        dna TEXT,
+        svg_hash TEXT REFERENCES svgs (hash),
+        changed_at TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS monkeys_rarity ON monkeys (rarity_score DESC);
+    CREATE INDEX IF NOT EXISTS monkeys_generation ON monkeys (generation);
+    CREATE INDEX IF NOT EXISTS monkeys_dna_hash ON monkeys (dna_hash);
+
+    CREATE TABLE IF NOT EXISTS svgs (
+        hash TEXT PRIMARY KEY,
+        svg TEXT NOT NULL
+    );
+
+    CREATE TABLE IF NOT EXISTS scan_state (
+        full_name TEXT PRIMARY KEY,
+        pushed_at TEXT,
+        files TEXT NOT NULL,
+        checked_at TEXT NOT NULL
+    );
+
+    CREATE TABLE IF NOT EXISTS renders (
+        dna_hash TEXT NOT NULL,
+        version INTEGER NOT NULL,
+        svg_hash TEXT NOT NULL REFERENCES svgs (hash),
+        PRIMARY KEY (dna_hash, version)
+    );
+
+    CREATE TABLE IF NOT EXISTS crawls (
+        root TEXT PRIMARY KEY,
+        started_scan INTEGER NOT NULL,
+        visible_since INTEGER NOT NULL,
+        checkpoint TEXT
+    );
+
+    CREATE TABLE IF NOT EXISTS scans (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        root TEXT NOT NULL,
+        started_at TEXT NOT NULL,
+        finished_at TEXT,
+        repos_seen INTEGER,
+        monkeys_found INTEGER
+    );
+"""
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class CommunityIndex:
+    """SQLite-backed index of every monkey found by the community scanner"""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path or os.getenv("COMMUNITY_INDEX_PATH") or DEFAULT_INDEX_PATH)
+        if self.path.parent != Path("."):
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(SCHEMA)
+        self.scan_id: Optional[int] = None
+        self.scan_root: Optional[str] = None
+        # Scans whose repos are reported (more than the current one while a crawl is resumed)
+        self.visible_since: Optional[int] = None
+
+    def close(self):
+        self.conn.close()
+
+    # ------------------------------------------------------------------
+    # Scans
+    # ------------------------------------------------------------------
+
+    def begin_scan(self, root: str) -> int:
+        """Start a scan run; repos recorded until finish_scan belong to it"""
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO scans (root, started_at) VALUES (?, ?)", (root, _now())
+            )
+        self.scan_id = cursor.lastrowid
+        self.scan_root = root
+        self.visible_since = self.scan_id
+        return self.scan_id
+
+    def finish_scan(self):
+        """Record totals for the current scan run"""
+        repos_seen, monkeys_found = self.conn.execute(
+            """
+            SELECT COUNT(*), COUNT(m.full_name)
+            FROM repos r LEFT JOIN monkeys m USING (full_name)
+            WHERE r.last_seen_scan = ?
+            """,
+            (self.scan_id,)
+        ).fetchone()
+        with self.conn:
+            self.conn.execute(
+                "UPDATE scans SET finished_at = ?, repos_seen = ?, monkeys_found = ? WHERE id = ?",
+                (_now(), repos_seen, monkeys_found, self.scan_id)
+            )
+
+    def crawl_checkpoint(self, root: str) -> Optional[dict]:
+        """Checkpoint saved by the last scan of root if its fork crawl was cut short"""
+        row = self.conn.execute("SELECT checkpoint FROM crawls WHERE root = ?", (root,)).fetchone()
+        return json.loads(row["checkpoint"]) if row and row["checkpoint"] else None
+
+    def save_crawl_checkpoint(self, checkpoint: Optional[dict]):
+        """
+        Record where the current scan's fork crawl stopped
+
+        While a crawl spans several scans, the repos seen since the last
+        complete crawl started stay in the outputs; once it completes, only
+        the repos it saw are reported.
+
+        Args:
+            checkpoint: ForkCrawler.checkpoint(), or None if the crawl completed
+        """
+        row = self.conn.execute(
+            "SELECT started_scan, visible_since, checkpoint FROM crawls WHERE root = ?", (self.scan_root,)
+        ).fetchone()
+        in_progress = row is not None and row["checkpoint"] is not None
+        started_scan = row["started_scan"] if in_progress else self.scan_id
+        if checkpoint is None:
+            visible_since = started_scan
+        elif in_progress:
+            visible_since = row["visible_since"]
+        else:
+            visible_since = row["started_scan"] if row else self.scan_id
+
+        with self.conn:
+            self.conn.execute(
+                """
+                INSERT INTO crawls (root, started_scan, visible_since, checkpoint)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (root) DO UPDATE SET
+                    started_scan = excluded.started_scan, visible_since = excluded.visible_since,
+                    checkpoint = excluded.checkpoint
+                """,
+                (self.scan_root, started_scan, visible_since,
+                 json.dumps(checkpoint) if checkpoint is not None else None)
+            )
+        self.visible_since = visible_since
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def upsert_repo(self, monkey: dict):
+        """Insert or update a repo row from a scanned monkey dict and mark it seen"""
+        with self.conn:
+            self.conn.execute(
+                """
+                INSERT INTO repos (full_name, owner, name, url, parent, degree, degree_label,
+                                   is_root, created_at, updated_at, last_seen_scan)
+                VALUES (:full_name, :owner, :repo, :url, :parent, :degree, :degree_label,
+                        :is_root, :created_at, :updated_at, :scan_id)
+                ON CONFLICT (full_name) DO UPDATE SET
+                    owner = excluded.owner, name = excluded.name, url = excluded.url,
+                    parent = excluded.parent, degree = excluded.degree,
+                    degree_label = excluded.degree_label, is_root = excluded.is_root,
+                    created_at = excluded.created_at, updated_at = excluded.updated_at,
+                    last_seen_scan = excluded.last_seen_scan
+                """,
+                {
+                    "full_name": monkey["full_name"],
+                    "owner": monkey["owner"],
+                    "repo": monkey["repo"],
+                    "url": monkey.get("url"),
+                    "parent": monkey.get("parent"),
+                    "degree": monkey.get("degree", 0),
+                    "degree_label": monkey.get("degree_label"),
+                    "is_root": int(bool(monkey.get("is_root"))),
+                    "created_at": monkey.get("created_at"),
+                    "updated_at": monkey.get("updated_at"),
+                    "scan_id": self.scan_id
+                }
+            )
+
+    def upsert_monkey(self, monkey: dict) -> bool:
+        """
+        Store a scanned monkey (repo row included)
+
+        Returns:
+            True if anything about the monkey changed since it was last stored
+        """
+        self.upsert_repo(monkey)
+
+        stats = monkey.get("monkey_stats") or {}
+        dna = monkey.get("monkey_dna")
+        svg = monkey.get("monkey_svg")
+        svg_hash = hashlib.sha256(svg.encode()).hexdigest() if svg else None
+
+        with self.conn:
+            if svg_hash:
+                self.conn.execute(
+                    "INSERT OR IGNORE INTO svgs (hash, svg) VALUES (?, ?)", (svg_hash, svg)
+                )
+            cursor = self.conn.execute(
+                """
+                INSERT INTO monkeys (full_name, generation, rarity_score, age_days, mutation_count,
+                                     dna_hash, stats, dna, svg_hash, changed_at)
+                VALUES (:full_name, :generation, :rarity_score, :age_days, :mutation_count,
+                        :dna_hash, :stats, :dna, :svg_hash, :changed_at)
+                ON CONFLICT (full_name) DO UPDATE SET
+                    generation = excluded.generation, rarity_score = excluded.rarity_score,
+                    age_days = excluded.age_days, mutation_count = excluded.mutation_count,
+                    dna_hash = excluded.dna_hash, stats = excluded.stats, dna = excluded.dna,
+                    svg_hash = excluded.svg_hash, changed_at = excluded.changed_at
+                WHERE monkeys.stats IS NOT excluded.stats
+                   OR monkeys.dna IS NOT excluded.dna
+                   OR monkeys.svg_hash IS NOT excluded.svg_hash
+                """,
+                {
+                    "full_name": monkey["full_name"],
+                    "generation": stats.get("generation", 1),
+                    "rarity_score": stats.get("rarity_score", 0),
+                    "age_days": stats.get("age_days", 0),
+                    "mutation_count": stats.get("mutation_count", 0),
+                    "dna_hash": stats.get("dna_hash") or (dna or {}).get("dna_hash"),
+                    "stats": json.dumps(stats, sort_keys=True),
+                    "dna": json.dumps(dna, sort_keys=True) if dna is not None else None,
+                    "svg_hash": svg_hash,
+                    "changed_at": _now()
+                }
+            )
+        return cursor.rowcount > 0
+
+    def remove_monkey(self, full_name: str):
+        """Forget the monkey of a repo that no longer has monkey data"""
+        with self.conn:
+            self.conn.execute("DELETE FROM monkeys WHERE full_name = ?", (full_name,))
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def query(self, sql: str, params: tuple = ()) -> List[dict]:
+        """Run an ad-hoc read query, returning rows as dictionaries"""
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def _current_filter(self, alias: str = "r") -> str:
+        """Restrict a query to repos seen by the current scan or crawl (all repos outside a scan)"""
+        return f"{alias}.last_seen_scan >= {int(self.visible_since)}" if self.scan_id else "1"
+
+    def monkeys(self, by_rarity: bool = False) -> List[dict]:
+        """Stored monkeys in the same shape scan_repo_incremental returns"""
+        order = "m.rarity_score DESC, r.full_name" if by_rarity else "r.degree, r.full_name"
+        return self._monkeys(self._current_filter(), order)
+
+    def stored_monkeys(self) -> Dict[str, dict]:
+        """Every stored monkey by full name, whether or not the current scan saw it"""
+        return {monkey["full_name"]: monkey for monkey in self._monkeys("1", "r.full_name")}
+
+    def _monkeys(self, where: str, order: str) -> List[dict]:
+        rows = self.conn.execute(
+            f"""
+            SELECT r.*, m.stats, m.dna, s.svg
+            FROM monkeys m
+            JOIN repos r USING (full_name)
+            LEFT JOIN svgs s ON s.hash = m.svg_hash
+            WHERE {where}
+            ORDER BY {order}
+            """
+        )
+        return [
+            {
+                "owner": row["owner"],
+                "repo": row["name"],
+                "full_name": row["full_name"],
+                "url": row["url"],
+                "is_root": bool(row["is_root"]),
+                "degree": row["degree"],
+                "degree_label": row["degree_label"],
+                "parent": row["parent"],
+                "created_at": row["created_at"],
+                "updated_at": row["updated_at"],
+                "monkey_stats": json.loads(row["stats"]),
+                "monkey_svg": row["svg"],
+                "monkey_dna": json.loads(row["dna"]) if row["dna"] else None
+            }
+            for row in rows
+        ]
+
+    # ------------------------------------------------------------------
+    # Incremental scan state
+    # ------------------------------------------------------------------
+
+    def scan_states(self) -> Dict[str, dict]:
+        """
+        Per-repo state from the last scan that looked at it
+
+        Returns:
+            {full_name: {"pushed_at": ..., "files": {path: {"sha": ..., "etag": ...}}}}
+        """
+        return {
+            row["full_name"]: {"pushed_at": row["pushed_at"], "files": json.loads(row["files"])}
+            for row in self.conn.execute("SELECT full_name, pushed_at, files FROM scan_state")
+        }
+
+    def renders(self, version: int) -> Dict[str, str]:
+        """SVGs rendered from DNA by a visualizer version, by DNA hash"""
+        return {
+            row["dna_hash"]: row["svg"]
+            for row in self.conn.execute(
+                "SELECT r.dna_hash, s.svg FROM renders r JOIN svgs s ON s.hash = r.svg_hash WHERE r.version = ?",
+                (version,)
+            )
+        }
+
+    def save_renders(self, version: int, renders: Dict[str, str]):
+        """Remember SVGs rendered from DNA (dna_hash -> svg) by a visualizer version"""
+        with self.conn:
+            for dna_hash, svg in renders.items():
+                svg_hash = hashlib.sha256(svg.encode()).hexdigest()
+                self.conn.execute("INSERT OR IGNORE INTO svgs (hash, svg) VALUES (?, ?)", (svg_hash, svg))
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO renders (dna_hash, version, svg_hash) VALUES (?, ?, ?)",
+                    (dna_hash, version, svg_hash)
+                )
+
+    def save_scan_state(self, full_name: str, pushed_at: Optional[str], files: Dict[str, dict]):
+        """Remember what a repo looked like when it was scanned (monkey or not)"""
+        with self.conn:
+            self.conn.execute(
+                """
+                INSERT INTO scan_state (full_name, pushed_at, files, checked_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (full_name) DO UPDATE SET
+                    pushed_at = excluded.pushed_at, files = excluded.files,
+                    checked_at = excluded.checked_at
+                """,
+                (full_name, pushed_at, json.dumps(files, sort_keys=True), _now())
+            )
+
+    def family_tree_nodes(self) -> List[dict]:
+        """Family tree nodes with children looked up through the parent edges"""
+        nodes = self.conn.execute(
+            f"""
+            SELECT r.full_name, r.owner, r.name, r.url, r.parent, r.is_root, r.degree,
+                   r.degree_label, m.rarity_score, m.generation, s.svg,
+                   (SELECT json_group_array(c.full_name)
+                    FROM repos c JOIN monkeys cm USING (full_name)
+                    WHERE c.parent = r.full_name AND {self._current_filter("c")}) AS children
+            FROM monkeys m
+            JOIN repos r USING (full_name)
+            LEFT JOIN svgs s ON s.hash = m.svg_hash
+            WHERE {self._current_filter()}
+            ORDER BY r.degree, r.full_name
+            """
+        )
+        return [
+            {
+                "id": row["full_name"],
+                "owner": row["owner"],
+                "repo": row["name"],
+                "url": row["url"],
+                "parent": row["parent"],
+                "children": json.loads(row["children"]),
+                "is_root": bool(row["is_root"]),
+                "degree": row["degree"],
+                "degree_label": row["degree_label"],
+                "rarity_score": row["rarity_score"],
+                "generation": row["generation"],
+                "monkey_svg": row["svg"]
+            }
+            for row in nodes
+        ]
+
+    def network_stats(self) -> Dict:
+        """Aggregate network statistics computed in SQL"""
+        current = self._current_filter()
+        totals = self.conn.execute(
+            f"""
+            SELECT COUNT(*) AS total, AVG(m.rarity_score) AS avg_rarity,
+                   MAX(m.rarity_score) AS max_rarity, MIN(m.rarity_score) AS min_rarity,
+                   SUM(julianday('now') - julianday(r.updated_at) < 1) AS active_today
+            FROM monkeys m JOIN repos r USING (full_name)
+            WHERE {current}
+            """
+        ).fetchone()
+
+        generations = {
+            str(row["generation"]): row["count"]
+            for row in self.conn.execute(
+                f"""
+                SELECT m.generation, COUNT(*) AS count
+                FROM monkeys m JOIN repos r USING (full_name)
+                WHERE {current}
+                GROUP BY m.generation ORDER BY m.generation
+                """
+            )
+        }
+
+        # Traits come from stats.json, falling back to dna.json
+        trait_rows = self.conn.execute(
+            f"""
+            SELECT t.key AS trait,
+                   CASE WHEN t.type = 'object' THEN COALESCE(json_extract(t.value, '$.value'), 'unknown')
+                        ELSE t.value END AS value,
+                   COUNT(*) AS count
+            FROM monkeys m
+            JOIN repos r USING (full_name),
+                 json_each(CASE WHEN json_extract(m.stats, '$.traits') IS NOT NULL
+                                 AND json_extract(m.stats, '$.traits') != '{{}}'
+                                THEN json_extract(m.stats, '$.traits')
+                                ELSE COALESCE(json_extract(m.dna, '$.traits'), '{{}}') END) AS t
+            WHERE {current}
+            GROUP BY trait, value
+            ORDER BY count DESC
+            """
+        ).fetchall()
+
+        trait_distribution: Dict[str, Dict[str, int]] = {}
+        for row in trait_rows:
+            trait_distribution.setdefault(row["trait"], {})[str(row["value"])] = row["count"]
+
+        def trait_summary(row) -> Optional[dict]:
+            if row is None:
+                return None
+            return {"trait": row["trait"], "value": str(row["value"]), "count": row["count"]}
+
+        return {
+            "total_monkeys": totals["total"],
+            "active_today": totals["active_today"] or 0,
+            "generations": generations,
+            "avg_rarity": round(totals["avg_rarity"] or 0, 2),
+            "max_rarity": round(totals["max_rarity"] or 0, 2),
+            "min_rarity": round(totals["min_rarity"] or 0, 2),
+            "rarest_trait": trait_summary(trait_rows[-1] if trait_rows else None),
+            "most_common_trait": trait_summary(trait_rows[0] if trait_rows else None),
+            "trait_distribution": trait_distribution
+        }
@@ -200,10 +200,10 @@ Keep changes minimal (0-2 traits). Consider the monkey's current aesthetic."""
     
     def _apply_evolution(self, dna: MonkeyDNA, decision: dict) -> MonkeyDNA:
         """Apply AI-decided evolution"""
-        from src.genetics import Trait, Rarity
+        from src.genetics import Rarity
         
-        # Copy current traits
-        new_traits = {cat: trait.model_copy() for cat, trait in dna.traits.items()}
+        # Traits are immutable, so unchanged ones are shared with the old DNA
+        new_traits = dict(dna.traits)
         mutations = 0
         
         # Apply changes
@@ -214,18 +214,14 @@ Keep changes minimal (0-2 traits). Consider the monkey's current aesthetic."""
                 new_rarity = Rarity(change["new_rarity"])
                 
                 # Create new trait
-                new_traits[category] = Trait(
-                    category=category,
-                    value=new_value,
-                    rarity=new_rarity
-                )
+                new_traits[category] = GeneticsEngine.get_trait(category, new_value, new_rarity)
                 mutations += 1
                 
             except Exception as e:
                 print(f"⚠️  Failed to apply change: {e}")
         
         # Create evolved DNA
-        evolved = MonkeyDNA(
+        evolved = MonkeyDNA.from_trusted(
             generation=dna.generation,
             parent_id=dna.parent_id,
             traits=new_traits,
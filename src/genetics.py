@@ -8,9 +8,13 @@ Inspired by CryptoKitties breeding mechanics.
 import random
 import hashlib
 import json
-from typing import Dict, List, Optional, Tuple
+import struct
+from array import array
+from functools import lru_cache
+from itertools import accumulate
+from typing import Dict, Iterator, List, Optional, Tuple
 from enum import Enum
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class Rarity(str, Enum):
@@ -31,20 +35,63 @@ class TraitCategory(str, Enum):
     SPECIAL = "special"
 
 
+# Rarity codes of the binary DNA record (declaration order)
+_RARITY_CODES = {rarity: code for code, rarity in enumerate(Rarity)}
+
+
+@lru_cache(maxsize=1024)
+def _gene_sequence(category: TraitCategory, value: str) -> str:
+    """Gene sequence for a trait value (first 8 hex chars of its md5)"""
+    return hashlib.md5(f"{category}:{value}".encode()).hexdigest()[:8]
+
+
+# Order trait parts are fed to the DNA hash (sorted by category value)
+_HASH_ORDER = tuple(sorted(TraitCategory))
+
+
+@lru_cache(maxsize=4096)
+def _hash_state(parts: Tuple[str, ...]):
+    """sha256 state after feeding the given trait parts, shared by genomes with the same prefix"""
+    if not parts:
+        return hashlib.sha256()
+    state = _hash_state(parts[:-1]).copy()
+    state.update(parts[-1].encode())
+    return state
+
+
+@lru_cache(maxsize=65536)
+def _genome_hash(categories: Tuple[TraitCategory, ...], genes: Tuple[str, ...]) -> str:
+    """
+    DNA hash for gene sequences listed in hash order
+    
+    Equal to sha256 of the joined "category:gene" parts, so stored hashes stay valid,
+    but memoized per genome and resumed from the longest cached prefix otherwise.
+    """
+    parts = tuple(f"{category.value}:{gene}" for category, gene in zip(categories, genes))
+    if not parts:
+        return hashlib.sha256().hexdigest()[:16]
+    state = _hash_state(parts[:-1]).copy()
+    state.update(parts[-1].encode())
+    return state.hexdigest()[:16]
+
+
 class Trait(BaseModel):
-    """A single genetic trait"""
+    """A single genetic trait (immutable, so identical traits can be shared)"""
+    model_config = ConfigDict(frozen=True)
+    
     category: TraitCategory
     value: str
     rarity: Rarity
     gene_sequence: str = Field(default="")  # Hex representation
     
     def __init__(self, **data):
-        super().__init__(**data)
-        if not self.gene_sequence:
+        if not data.get("gene_sequence") and "category" in data and "value" in data:
             # Generate gene sequence from value
-            self.gene_sequence = hashlib.md5(
-                f"{self.category}:{self.value}".encode()
-            ).hexdigest()[:8]
+            try:
+                data["gene_sequence"] = _gene_sequence(TraitCategory(data["category"]), data["value"])
+            except (ValueError, TypeError):
+                pass  # Let field validation report the bad input
+        super().__init__(**data)
 
 
 class MonkeyDNA(BaseModel):
@@ -61,13 +108,48 @@ class MonkeyDNA(BaseModel):
         if not self.dna_hash:
             self.dna_hash = self._calculate_hash()
     
+    @classmethod
+    def from_trusted(
+        cls,
+        traits: Dict[TraitCategory, Trait],
+        generation: int = 1,
+        parent_id: Optional[str] = None,
+        mutation_count: int = 0,
+        birth_timestamp: int = 0,
+        dna_hash: str = ""
+    ) -> "MonkeyDNA":
+        """
+        Build DNA from values the engine produced itself, skipping validation
+        
+        Traits must already be Trait instances keyed by TraitCategory. Data read from
+        files or received over HTTP should go through MonkeyDNA(...) instead.
+        """
+        dna = cls.model_construct(
+            generation=generation,
+            parent_id=parent_id,
+            traits=traits,
+            mutation_count=mutation_count,
+            birth_timestamp=birth_timestamp,
+            dna_hash=dna_hash
+        )
+        if not dna_hash:
+            dna.dna_hash = dna._calculate_hash()
+        return dna
+    
     def _calculate_hash(self) -> str:
         """Calculate unique hash for this DNA"""
-        trait_string = "".join([
-            f"{cat.value}:{trait.gene_sequence}"
-            for cat, trait in sorted(self.traits.items())
-        ])
-        return hashlib.sha256(trait_string.encode()).hexdigest()[:16]
+        traits = self.traits
+        if len(traits) == len(_HASH_ORDER):
+            try:
+                genes = tuple(traits[category].gene_sequence for category in _HASH_ORDER)
+                return _genome_hash(_HASH_ORDER, genes)
+            except KeyError:
+                pass
+        ordered = sorted(traits.items())
+        return _genome_hash(
+            tuple(category for category, _ in ordered),
+            tuple(trait.gene_sequence for _, trait in ordered)
+        )
     
     def get_rarity_score(self) -> float:
         """Calculate overall rarity score (0-100)"""
@@ -82,6 +164,167 @@ class MonkeyDNA(BaseModel):
         return (total / max_possible) * 100 if max_possible > 0 else 0
 
 
+class MonkeyView:
+    """
+    Read-only view of one Population row
+
+    Exposes the MonkeyDNA attributes (generation, parent_id, traits, mutation_count,
+    birth_timestamp, dna_hash) straight from the population columns, so code written
+    against MonkeyDNA can read a row without copying it into a pydantic model.
+    """
+
+    __slots__ = ("population", "index", "_traits")
+
+    get_rarity_score = MonkeyDNA.get_rarity_score
+    _calculate_hash = MonkeyDNA._calculate_hash
+
+    def __init__(self, population: "Population", index: int):
+        self.population = population
+        self.index = index
+        self._traits = None
+
+    @property
+    def generation(self) -> int:
+        return self.population.generation[self.index]
+
+    @property
+    def mutation_count(self) -> int:
+        return self.population.mutation_count[self.index]
+
+    @property
+    def birth_timestamp(self) -> int:
+        return self.population.birth_timestamp[self.index]
+
+    @property
+    def parent_id(self) -> Optional[str]:
+        return self.population.parent_id(self.index)
+
+    @property
+    def traits(self) -> Dict[TraitCategory, Trait]:
+        if self._traits is None:
+            self._traits = {
+                category: self.population.trait(category, self.index)
+                for category in TraitCategory
+            }
+        return self._traits
+
+    @property
+    def dna_hash(self) -> str:
+        return self.population.dna_hash(self.index)
+
+    def to_dna(self) -> MonkeyDNA:
+        """Materialize this row as a standalone MonkeyDNA"""
+        return MonkeyDNA.from_trusted(
+            generation=self.generation,
+            parent_id=self.parent_id,
+            traits=dict(self.traits),
+            mutation_count=self.mutation_count,
+            birth_timestamp=self.birth_timestamp,
+            dna_hash=self.dna_hash
+        )
+
+
+class Population:
+    """
+    Column-oriented store of monkeys
+
+    Each trait is stored as a uint8 code indexing GeneticsEngine.trait_table(category),
+    next to typed columns for generation, mutation_count, birth_timestamp, the index of
+    the parent row (-1 when the parent is not in the population) and the 64-bit DNA
+    hash (0 until it is first computed). A million monkeys fit in a few tens of
+    megabytes; indexing returns a MonkeyView instead of building a MonkeyDNA.
+    """
+
+    def __init__(
+        self,
+        trait_codes: Optional[Dict[TraitCategory, array]] = None,
+        generation: Optional[array] = None,
+        birth_timestamp: Optional[array] = None,
+        mutation_count: Optional[array] = None,
+        parent_index: Optional[array] = None,
+        hashes: Optional[array] = None
+    ):
+        self.trait_codes = trait_codes or {category: array("B") for category in TraitCategory}
+        self.generation = generation if generation is not None else array("H")
+        size = len(self.generation)
+        self.birth_timestamp = birth_timestamp if birth_timestamp is not None else array("I", [0]) * size
+        self.mutation_count = mutation_count if mutation_count is not None else array("I", [0]) * size
+        self.parent_index = parent_index if parent_index is not None else array("i", [-1]) * size
+        self.hashes = hashes if hashes is not None else array("Q", [0]) * size
+        # Parent hashes for rows whose parent lives outside this population
+        self.external_parents: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.generation)
+
+    def __getitem__(self, index: int) -> MonkeyView:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("population index out of range")
+        return MonkeyView(self, index)
+
+    def __iter__(self) -> Iterator[MonkeyView]:
+        for index in range(len(self)):
+            yield MonkeyView(self, index)
+
+    def trait(self, category: TraitCategory, index: int) -> Trait:
+        """Shared Trait instance stored for one row"""
+        return GeneticsEngine.trait_by_code(category, self.trait_codes[category][index])
+
+    def dna_hash(self, index: int) -> str:
+        """DNA hash of a row, computed from its trait codes on first access"""
+        stored = self.hashes[index]
+        if not stored:
+            stored = int(MonkeyView(self, index)._calculate_hash(), 16)
+            self.hashes[index] = stored
+        return f"{stored:016x}"
+
+    def parent_id(self, index: int) -> Optional[str]:
+        """Parent DNA hash of a row, if it has a parent"""
+        parent = self.parent_index[index]
+        if parent >= 0:
+            return self.dna_hash(parent)
+        return self.external_parents.get(index)
+
+    def append(self, dna: MonkeyDNA, parent_index: int = -1) -> int:
+        """
+        Add a monkey to the population and return its row index
+
+        Args:
+            dna: DNA to store (its traits must be in GeneticsEngine.trait_table)
+            parent_index: Row of the parent monkey, or -1 if it is not in the population
+        """
+        codes = {
+            category: GeneticsEngine.trait_code(category, trait.value, trait.rarity)
+            for category, trait in dna.traits.items()
+        }
+        if len(codes) != len(TraitCategory):
+            raise ValueError("DNA must define every trait category")
+
+        index = len(self)
+        for category, code in codes.items():
+            self.trait_codes[category].append(code)
+        self.generation.append(dna.generation)
+        self.mutation_count.append(dna.mutation_count)
+        self.birth_timestamp.append(dna.birth_timestamp)
+        self.parent_index.append(parent_index)
+        self.hashes.append(int(dna.dna_hash, 16) if dna.dna_hash else 0)
+        if parent_index < 0 and dna.parent_id:
+            self.external_parents[index] = dna.parent_id
+        return index
+
+    @classmethod
+    def from_dnas(cls, dnas) -> "Population":
+        """Build a population from MonkeyDNA objects, linking parents found in the batch"""
+        population = cls()
+        rows = {}
+        for dna in dnas:
+            parent_index = rows.get(dna.parent_id, -1)
+            rows[dna.dna_hash] = population.append(dna, parent_index)
+        return population
+
+
 class GeneticsEngine:
     """Handles all genetic operations"""
     
@@ -105,6 +348,14 @@ class GeneticsEngine:
         }
     }
     
+    # Percent chance of rolling each rarity (see _roll_rarity)
+    RARITY_WEIGHTS = {
+        Rarity.COMMON: 60,
+        Rarity.UNCOMMON: 25,
+        Rarity.RARE: 10,
+        Rarity.LEGENDARY: 5
+    }
+    
     # Trait definitions with rarity
     TRAIT_POOL = {
         TraitCategory.BODY_COLOR: {
@@ -145,6 +396,83 @@ class GeneticsEngine:
         }
     }
     
+    _trait_tables: Dict[TraitCategory, List[Tuple[str, Rarity]]] = {}
+    
+    @classmethod
+    def trait_table(cls, category: TraitCategory) -> List[Tuple[str, Rarity]]:
+        """
+        Every (value, rarity) pair a category can roll, in a stable order.
+        
+        A trait code is an index into this list: pool traits first (by rarity),
+        then gen-locked traits, which are always legendary.
+        """
+        table = cls._trait_tables.get(category)
+        if table is None:
+            table = [
+                (value, rarity)
+                for rarity in Rarity
+                for value in cls.TRAIT_POOL[category][rarity]
+            ]
+            for traits in cls.GEN_LOCKED_TRAITS.get(category, {}).values():
+                table.extend((value, Rarity.LEGENDARY) for value in traits)
+            cls._trait_tables[category] = table
+        return table
+    
+    _trait_codes: Dict[TraitCategory, Dict[Tuple[str, Rarity], int]] = {}
+    
+    @classmethod
+    def trait_code(cls, category: TraitCategory, value: str, rarity: Rarity) -> int:
+        """Code of a (value, rarity) pair in trait_table(category)"""
+        codes = cls._trait_codes.get(category)
+        if codes is None:
+            codes = {pair: code for code, pair in enumerate(cls.trait_table(category))}
+            cls._trait_codes[category] = codes
+        try:
+            return codes[(value, Rarity(rarity))]
+        except KeyError:
+            raise ValueError(f"Unknown {category.value} trait: {value} ({Rarity(rarity).value})") from None
+    
+    # Shared Trait instances indexed by trait code, filled in at import time
+    _trait_flyweights: Dict[TraitCategory, List[Trait]] = {}
+    
+    @classmethod
+    def trait_by_code(cls, category: TraitCategory, code: int) -> Trait:
+        """Shared Trait instance for a trait code"""
+        return cls._trait_flyweights[category][code]
+    
+    @classmethod
+    def get_trait(
+        cls,
+        category: TraitCategory,
+        value: str,
+        rarity: Rarity,
+        gene_sequence: Optional[str] = None
+    ) -> Trait:
+        """
+        Shared Trait instance for a (category, value, rarity)
+        
+        A new Trait is only built for combinations outside the trait table
+        or with a non-standard gene sequence.
+        """
+        try:
+            trait = cls.trait_by_code(category, cls.trait_code(category, value, rarity))
+        except ValueError:
+            return Trait(category=category, value=value, rarity=rarity, gene_sequence=gene_sequence or "")
+        if gene_sequence and gene_sequence != trait.gene_sequence:
+            return Trait(category=category, value=value, rarity=rarity, gene_sequence=gene_sequence)
+        return trait
+    
+    @classmethod
+    def _intern_traits(cls):
+        """Build one shared Trait per trait table entry"""
+        cls._trait_flyweights = {
+            category: [
+                Trait(category=category, value=value, rarity=rarity)
+                for value, rarity in cls.trait_table(category)
+            ]
+            for category in TraitCategory
+        }
+    
     @classmethod
     def get_gen_locked_traits(cls, category: TraitCategory, generation: int) -> List[str]:
         """Get gen-locked traits available for this generation"""
@@ -156,153 +484,239 @@ class GeneticsEngine:
         return available
     
     @classmethod
-    def generate_random_dna(cls, generation: int = 1, parent_id: Optional[str] = None) -> MonkeyDNA:
-        """Generate completely random DNA"""
+    def derive_rng(cls, dna_hash: str, seed: int = 0) -> random.Random:
+        """
+        Derive an independent, reproducible random stream for one monkey
+        
+        The stream depends only on (dna_hash, seed), so the same call gives the same
+        outcome in any process and results can be cached under that key.
+        """
+        return random.Random(f"{dna_hash}:{seed}")
+    
+    @classmethod
+    def generate_random_dna(
+        cls,
+        generation: int = 1,
+        parent_id: Optional[str] = None,
+        rng: Optional[random.Random] = None
+    ) -> MonkeyDNA:
+        """
+        Generate completely random DNA
+        
+        Args:
+            generation: Generation of the new monkey
+            parent_id: Optional parent DNA hash
+            rng: Random source (defaults to the global random module)
+        """
+        rng = rng or random
         traits = {}
         
         for category in TraitCategory:
             # 5% chance to get a gen-locked trait if eligible
             gen_locked = cls.get_gen_locked_traits(category, generation)
-            if gen_locked and random.random() < 0.05:
-                value = random.choice(gen_locked)
+            if gen_locked and rng.random() < 0.05:
+                value = rng.choice(gen_locked)
                 # Gen-locked traits are always LEGENDARY
-                traits[category] = Trait(
-                    category=category,
-                    value=value,
-                    rarity=Rarity.LEGENDARY
-                )
+                traits[category] = cls.get_trait(category, value, Rarity.LEGENDARY)
             else:
-                rarity = cls._roll_rarity()
+                rarity = cls._roll_rarity(rng)
                 available_traits = cls.TRAIT_POOL[category][rarity]
-                value = random.choice(available_traits)
+                value = rng.choice(available_traits)
                 
-                traits[category] = Trait(
-                    category=category,
-                    value=value,
-                    rarity=rarity
-                )
+                traits[category] = cls.get_trait(category, value, rarity)
         
-        return MonkeyDNA(
+        return MonkeyDNA.from_trusted(
             generation=generation,
             parent_id=parent_id,
             traits=traits,
-            birth_timestamp=int(random.random() * 1000000)  # Mock timestamp
+            birth_timestamp=int(rng.random() * 1000000)  # Mock timestamp
         )
     
     @classmethod
-    def _roll_rarity(cls) -> Rarity:
+    def generate_random_dna_batch(
+        cls,
+        n: int,
+        generation: int = 1,
+        rng: Optional[random.Random] = None
+    ) -> Population:
+        """
+        Generate N random monkeys at once
+        
+        Rolls the same distribution as generate_random_dna, but draws trait codes
+        for a whole category in one weighted sampling call instead of building
+        pydantic objects per monkey.
+        
+        Args:
+            n: Number of monkeys to generate
+            generation: Generation shared by every monkey in the batch
+            rng: Random source (defaults to the global random module)
+        """
+        rng = rng or random
+        
+        trait_codes = {}
+        for category in TraitCategory:
+            codes, cum_weights = cls._code_weights(category, generation)
+            trait_codes[category] = array("B", rng.choices(codes, cum_weights=cum_weights, k=n))
+        
+        return Population(
+            trait_codes=trait_codes,
+            generation=array("H", [generation]) * n,
+            birth_timestamp=array("I", rng.choices(range(1000000), k=n))  # Mock timestamp
+        )
+    
+    @classmethod
+    def _code_weights(cls, category: TraitCategory, generation: int) -> Tuple[List[int], List[float]]:
+        """Trait codes with cumulative probabilities matching generate_random_dna"""
+        table = cls.trait_table(category)
+        gen_locked = cls.get_gen_locked_traits(category, generation)
+        locked_chance = 0.05 if gen_locked else 0.0
+        total_weight = sum(cls.RARITY_WEIGHTS.values())
+        
+        pool_size = cls._pool_size(category)
+        
+        codes = []
+        weights = []
+        for code, (value, rarity) in enumerate(table):
+            if code < pool_size:
+                pool = cls.TRAIT_POOL[category][rarity]
+                weight = (1 - locked_chance) * cls.RARITY_WEIGHTS[rarity] / total_weight / len(pool)
+            elif value in gen_locked:
+                weight = locked_chance / len(gen_locked)
+            else:
+                continue  # Extinct for this generation
+            codes.append(code)
+            weights.append(weight)
+        
+        return codes, list(accumulate(weights))
+    
+    @classmethod
+    def _pool_size(cls, category: TraitCategory) -> int:
+        """Number of codes in a category's table that come from TRAIT_POOL"""
+        return sum(len(values) for values in cls.TRAIT_POOL[category].values())
+    
+    @classmethod
+    def _roll_rarity(cls, rng: Optional[random.Random] = None) -> Rarity:
         """Roll for trait rarity based on probabilities"""
-        roll = random.random() * 100
+        roll = (rng or random).random() * 100
         
-        if roll < 60:
-            return Rarity.COMMON
-        elif roll < 85:
-            return Rarity.UNCOMMON
-        elif roll < 95:
-            return Rarity.RARE
-        else:
-            return Rarity.LEGENDARY
+        threshold = 0
+        for rarity, weight in cls.RARITY_WEIGHTS.items():
+            threshold += weight
+            if roll < threshold:
+                return rarity
+        return Rarity.LEGENDARY
     
     @classmethod
-    def breed(cls, parent_dna: MonkeyDNA, mutation_rate: float = 0.3) -> MonkeyDNA:
+    def breed(
+        cls,
+        parent_dna: MonkeyDNA,
+        mutation_rate: float = 0.3,
+        rng: Optional[random.Random] = None,
+        seed: Optional[int] = None
+    ) -> MonkeyDNA:
         """
         Create child DNA from parent with inheritance and mutations
         
         Args:
             parent_dna: Parent's DNA
             mutation_rate: Probability of mutation per trait (0-1)
+            rng: Random source (defaults to the global random module)
+            seed: If set (and rng is not), breed from derive_rng(parent hash, seed)
         """
+        if rng is None and seed is not None:
+            rng = cls.derive_rng(parent_dna.dna_hash, seed)
+        rng = rng or random
+        
         child_generation = parent_dna.generation + 1
         child_traits = {}
         
         for category in TraitCategory:
             # Check for gen-locked traits first (3% chance for children)
             gen_locked = cls.get_gen_locked_traits(category, child_generation)
-            if gen_locked and random.random() < 0.03:
-                value = random.choice(gen_locked)
-                child_traits[category] = Trait(
-                    category=category,
-                    value=value,
-                    rarity=Rarity.LEGENDARY  # Gen-locked = legendary
+            if gen_locked and rng.random() < 0.03:
+                value = rng.choice(gen_locked)
+                child_traits[category] = cls.get_trait(
+                    category, value, Rarity.LEGENDARY  # Gen-locked = legendary
                 )
-            elif random.random() < 0.5:
-                # Inherit from parent
-                parent_trait = parent_dna.traits[category]
-                # Check if parent's trait is gen-locked and still available
-                if parent_trait.value in gen_locked:
-                    # Can inherit gen-locked trait from parent!
-                    child_traits[category] = parent_trait.model_copy()
-                else:
-                    child_traits[category] = parent_trait.model_copy()
+            elif rng.random() < 0.5:
+                # Inherit from parent (traits are immutable, so share the instance)
+                # Gen-locked traits can be inherited even once they are extinct
+                child_traits[category] = parent_dna.traits[category]
             else:
                 # Generate new trait
-                rarity = cls._roll_rarity()
+                rarity = cls._roll_rarity(rng)
                 available_traits = cls.TRAIT_POOL[category][rarity]
-                value = random.choice(available_traits)
+                value = rng.choice(available_traits)
                 
-                child_traits[category] = Trait(
-                    category=category,
-                    value=value,
-                    rarity=rarity
-                )
+                child_traits[category] = cls.get_trait(category, value, rarity)
             
             # Apply mutation
-            if random.random() < mutation_rate:
-                child_traits[category] = cls._mutate_trait(child_traits[category])
+            if rng.random() < mutation_rate:
+                child_traits[category] = cls._mutate_trait(child_traits[category], rng)
         
-        return MonkeyDNA(
+        return MonkeyDNA.from_trusted(
             generation=child_generation,
             parent_id=parent_dna.dna_hash,
             traits=child_traits,
-            birth_timestamp=int(random.random() * 1000000)
+            birth_timestamp=int(rng.random() * 1000000)
         )
     
     @classmethod
-    def _mutate_trait(cls, trait: Trait) -> Trait:
+    def _mutate_trait(cls, trait: Trait, rng: Optional[random.Random] = None) -> Trait:
         """Mutate a single trait"""
+        rng = rng or random
+        
         # 70% chance to stay in same rarity, 30% chance to shift
-        if random.random() < 0.7:
+        if rng.random() < 0.7:
             new_rarity = trait.rarity
         else:
             # Shift rarity up or down
             rarities = list(Rarity)
             current_idx = rarities.index(trait.rarity)
-            shift = random.choice([-1, 1])
+            shift = rng.choice([-1, 1])
             new_idx = max(0, min(len(rarities) - 1, current_idx + shift))
             new_rarity = rarities[new_idx]
         
         # Pick new value from rarity pool
         available_traits = cls.TRAIT_POOL[trait.category][new_rarity]
-        new_value = random.choice(available_traits)
+        new_value = rng.choice(available_traits)
         
-        return Trait(
-            category=trait.category,
-            value=new_value,
-            rarity=new_rarity
-        )
+        return cls.get_trait(trait.category, new_value, new_rarity)
     
     @classmethod
-    def evolve(cls, dna: MonkeyDNA, evolution_strength: float = 0.1) -> MonkeyDNA:
+    def evolve(
+        cls,
+        dna: MonkeyDNA,
+        evolution_strength: float = 0.1,
+        rng: Optional[random.Random] = None,
+        seed: Optional[int] = None
+    ) -> MonkeyDNA:
         """
         Evolve DNA over time (daily mutations)
         
         Args:
             dna: Current DNA
             evolution_strength: Probability of change per trait (0-1)
+            rng: Random source (defaults to the global random module)
+            seed: If set (and rng is not), evolve from derive_rng(dna hash, seed)
         """
+        if rng is None and seed is not None:
+            rng = cls.derive_rng(dna.dna_hash, seed)
+        rng = rng or random
+        
         evolved_traits = {}
         mutations = 0
         
         for category, trait in dna.traits.items():
-            if random.random() < evolution_strength:
+            if rng.random() < evolution_strength:
                 # Evolve this trait
-                evolved_traits[category] = cls._mutate_trait(trait)
+                evolved_traits[category] = cls._mutate_trait(trait, rng)
                 mutations += 1
             else:
                 # Keep unchanged
-                evolved_traits[category] = trait.model_copy()
+                evolved_traits[category] = trait
         
-        return MonkeyDNA(
+        return MonkeyDNA.from_trusted(
             generation=dna.generation,
             parent_id=dna.parent_id,
             traits=evolved_traits,
@@ -336,10 +750,10 @@ class GeneticsEngine:
         traits = {}
         for cat_str, trait_data in data["traits"].items():
             category = TraitCategory(cat_str)
-            traits[category] = Trait(
-                category=category,
-                value=trait_data["value"],
-                rarity=Rarity(trait_data["rarity"]),
+            traits[category] = cls.get_trait(
+                category,
+                trait_data["value"],
+                Rarity(trait_data["rarity"]),
                 gene_sequence=trait_data["gene_sequence"]
             )
         
@@ -351,6 +765,122 @@ class GeneticsEngine:
             birth_timestamp=data.get("birth_timestamp", 0),
             dna_hash=data.get("dna_hash", "")
         )
+    
+    # Fixed-width binary DNA record (little-endian, 40 bytes):
+    # version, flags, generation, mutation_count, birth_timestamp, dna_hash,
+    # parent_id, then one value code and one rarity code per TraitCategory
+    BINARY_VERSION = 1
+    BINARY_RECORD = struct.Struct("<BBHIIQQ6B6B")
+    _FLAG_HAS_PARENT = 0x01
+    
+    _trait_values: Dict[TraitCategory, List[str]] = {}
+    
+    @classmethod
+    def trait_values(cls, category: TraitCategory) -> List[str]:
+        """Distinct values of a category in trait table order; binary value codes index this"""
+        values = cls._trait_values.get(category)
+        if values is None:
+            values = list(dict.fromkeys(value for value, _ in cls.trait_table(category)))
+            cls._trait_values[category] = values
+        return values
+    
+    _value_codes: Dict[TraitCategory, Dict[str, int]] = {}
+    
+    @classmethod
+    def value_code(cls, category: TraitCategory, value: str) -> int:
+        """Binary value code of a trait value (its index in trait_values)"""
+        codes = cls._value_codes.get(category)
+        if codes is None:
+            codes = {value: code for code, value in enumerate(cls.trait_values(category))}
+            cls._value_codes[category] = codes
+        try:
+            return codes[value]
+        except KeyError:
+            raise ValueError(f"Unknown {category.value} trait: {value}") from None
+    
+    @classmethod
+    def dna_to_bytes(cls, dna: MonkeyDNA) -> bytes:
+        """Convert DNA to its fixed-width binary record"""
+        buffer = bytearray(cls.BINARY_RECORD.size)
+        cls._pack_dna(buffer, 0, dna)
+        return bytes(buffer)
+    
+    @classmethod
+    def bytes_to_dna(cls, data: bytes) -> MonkeyDNA:
+        """Convert a binary record back to DNA"""
+        return cls._unpack_dna(cls.BINARY_RECORD.unpack(data))
+    
+    @classmethod
+    def encode_many(cls, dnas: List[MonkeyDNA]) -> bytes:
+        """Concatenate the binary records of many monkeys"""
+        record = cls.BINARY_RECORD
+        buffer = bytearray(record.size * len(dnas))
+        for index, dna in enumerate(dnas):
+            cls._pack_dna(buffer, index * record.size, dna)
+        return bytes(buffer)
+    
+    @classmethod
+    def decode_many(cls, data: bytes) -> List[MonkeyDNA]:
+        """Decode concatenated binary records"""
+        if len(data) % cls.BINARY_RECORD.size:
+            raise ValueError("Binary DNA data is not a whole number of records")
+        return [cls._unpack_dna(fields) for fields in cls.BINARY_RECORD.iter_unpack(data)]
+    
+    @classmethod
+    def _pack_dna(cls, buffer: bytearray, offset: int, dna: MonkeyDNA):
+        """Write one DNA record into buffer at offset"""
+        value_codes = []
+        rarity_codes = []
+        for category in TraitCategory:
+            trait = dna.traits[category]
+            if trait.gene_sequence != _gene_sequence(category, trait.value):
+                raise ValueError(f"Cannot encode non-standard gene sequence for {category.value}")
+            value_codes.append(cls.value_code(category, trait.value))
+            rarity_codes.append(_RARITY_CODES[trait.rarity])
+        
+        cls.BINARY_RECORD.pack_into(
+            buffer,
+            offset,
+            cls.BINARY_VERSION,
+            cls._FLAG_HAS_PARENT if dna.parent_id else 0,
+            dna.generation,
+            dna.mutation_count,
+            dna.birth_timestamp,
+            int(dna.dna_hash, 16),
+            int(dna.parent_id, 16) if dna.parent_id else 0,
+            *value_codes,
+            *rarity_codes
+        )
+    
+    @classmethod
+    def _unpack_dna(cls, fields: tuple) -> MonkeyDNA:
+        """Build DNA from the fields of one binary record"""
+        version, flags, generation, mutation_count, birth_timestamp, dna_hash, parent_id = fields[:7]
+        if version != cls.BINARY_VERSION:
+            raise ValueError(f"Unsupported binary DNA version: {version}")
+        
+        categories = list(TraitCategory)
+        value_codes = fields[7:7 + len(categories)]
+        rarity_codes = fields[7 + len(categories):]
+        rarities = list(Rarity)
+        traits = {}
+        for category, value_code, rarity_code in zip(categories, value_codes, rarity_codes):
+            values = cls.trait_values(category)
+            if value_code >= len(values) or rarity_code >= len(rarities):
+                raise ValueError(f"Unknown {category.value} trait codes: {value_code}, {rarity_code}")
+            traits[category] = cls.get_trait(category, values[value_code], rarities[rarity_code])
+        
+        return MonkeyDNA.from_trusted(
+            generation=generation,
+            parent_id=f"{parent_id:016x}" if flags & cls._FLAG_HAS_PARENT else None,
+            traits=traits,
+            mutation_count=mutation_count,
+            birth_timestamp=birth_timestamp,
+            dna_hash=f"{dna_hash:016x}"
+        )
+
+
+GeneticsEngine._intern_traits()
 
 
 def main():
@@ -0,0 +1,274 @@
+"""
+ForkMonkey GitHub Fetch Layer
+
+Thin client for the GitHub REST and GraphQL APIs on a pooled HTTP session.
+REST reads can be conditional (the caller keeps the ETags), so repeated
+lookups are answered with 304s that do not count against the rate limit.
+
+Monkey files and metadata of many forks can be fetched in bulk: one GraphQL
+query per batch of repos, each repo an aliased field.
+
+Only depends on requests, so the community scanner can use it as well.
+"""
+
+import json
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+API_URL = "https://api.github.com"
+MONKEY_FILES = {"dna": "monkey_data/dna.json", "stats": "monkey_data/stats.json"}
+SVG_FILE = "monkey_data/monkey.svg"
+GRAPHQL_BATCH = 25  # Repos per bulk query; monkey SVGs keep responses at a few hundred KB
+
+
+class GitHubAPIError(Exception):
+    """A GitHub API request failed"""
+
+    def __init__(
+        self,
+        message: str,
+        status: Optional[int] = None,
+        headers: Optional[dict] = None,
+        rate_limited: bool = False
+    ):
+        super().__init__(message)
+        self.status = status
+        self.headers = dict(headers or {})
+        self.rate_limited = rate_limited
+
+
+class GitHubAPI:
+    """GitHub REST and GraphQL client on one connection-pooled session"""
+
+    def __init__(
+        self,
+        token: Optional[str] = None,
+        api_url: str = API_URL,
+        timeout: float = 15,
+        pool_size: int = 10
+    ):
+        self.token = token
+        self.api_url = api_url.rstrip("/")
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        self.session.mount(self.api_url, HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        self.session.headers["Accept"] = "application/vnd.github+json"
+        if token:
+            self.session.headers["Authorization"] = f"Bearer {token}"
+
+    def get_if_changed(self, path: str, etag: Optional[str] = None, raw: bool = False) -> tuple:
+        """
+        Conditional GET of a REST resource
+
+        Args:
+            path: API path, e.g. "/repos/owner/repo/contents/monkey_data/dna.json"
+            etag: ETag of the copy the caller already has
+            raw: Return the body as text instead of JSON
+
+        Returns:
+            (status, body, etag): status is 200, 304 (unchanged, no body) or 404 (no body)
+
+        Raises:
+            GitHubAPIError: For any other response (rate limits included)
+        """
+        headers = {"Accept": "application/vnd.github.raw+json"} if raw else {}
+        if etag:
+            headers["If-None-Match"] = etag
+
+        response = self.session.get(f"{self.api_url}{path}", headers=headers, timeout=self.timeout)
+        if response.status_code in (304, 404):
+            return response.status_code, None, etag
+        if not response.ok:
+            raise GitHubAPIError(
+                f"GET {path} failed: {response.status_code} {response.text[:200]}",
+                response.status_code,
+                response.headers
+            )
+
+        body = response.text if raw else response.json()
+        return response.status_code, body, response.headers.get("ETag")
+
+    def graphql(self, query: str, variables: Optional[dict] = None, partial: bool = False) -> dict:
+        """
+        Run a GraphQL query (needs a token) and return its data
+
+        Args:
+            query: GraphQL document
+            variables: Query variables
+            partial: Return the data despite errors for some fields (e.g. a
+                repo deleted since it was listed), which come back as null
+
+        Raises:
+            GitHubAPIError: For failed queries, with rate_limited set for rate limits
+        """
+        if not self.token:
+            raise GitHubAPIError("The GraphQL API needs a token")
+
+        response = self.session.post(
+            f"{self.api_url}/graphql",
+            json={"query": query, "variables": variables or {}},
+            timeout=self.timeout
+        )
+        if not response.ok:
+            raise GitHubAPIError(
+                f"GraphQL request failed: {response.status_code} {response.text[:200]}",
+                response.status_code,
+                response.headers
+            )
+
+        result = response.json()
+        # Rate limits come back as 200 with a RATE_LIMITED error, even for partial queries
+        if any(error.get("type") == "RATE_LIMITED" for error in result.get("errors") or []):
+            raise GitHubAPIError(
+                f"GraphQL rate limit exceeded: {result['errors']}",
+                response.status_code,
+                response.headers,
+                rate_limited=True
+            )
+        if result.get("errors") and not (partial and result.get("data")):
+            raise GitHubAPIError(f"GraphQL errors: {result['errors']}")
+        return result["data"]
+
+    def fetch_parent(self, full_name: str) -> dict:
+        """
+        Fork parent of a repo with its monkey DNA and stats, in one GraphQL request
+
+        Args:
+            full_name: Repository (owner/repo)
+
+        Returns:
+            {"full_name", "fork", "parent", "dna", "stats"} where parent is the
+            parent's full name (None if the repo is not a fork) and dna and
+            stats are the parent's files as parsed JSON, or None when missing
+        """
+        owner, name = full_name.split("/", 1)
+        files = " ".join(
+            f'{key}: object(expression: "HEAD:{path}") {{ ... on Blob {{ text }} }}'
+            for key, path in MONKEY_FILES.items()
+        )
+        query = f"""
+            query($owner: String!, $name: String!) {{
+                repository(owner: $owner, name: $name) {{
+                    nameWithOwner isFork parent {{ nameWithOwner {files} }}
+                }}
+            }}
+        """
+        repository = self.graphql(query, {"owner": owner, "name": name})["repository"]
+        if repository is None:
+            raise GitHubAPIError(f"Repository not found: {full_name}")
+
+        parent = repository.get("parent") or {}
+        return {
+            "full_name": repository["nameWithOwner"],
+            "fork": repository["isFork"],
+            "parent": parent.get("nameWithOwner"),
+            **{key: _parse_blob(parent.get(key)) for key in MONKEY_FILES}
+        }
+
+    def fetch_monkeys(
+        self,
+        full_names: List[str],
+        batch_size: int = GRAPHQL_BATCH,
+        include_svg: bool = True
+    ) -> Dict[str, Optional[dict]]:
+        """
+        Monkey files and repo metadata of many repos, a batch per GraphQL query
+
+        Args:
+            full_names: Repositories (owner/repo)
+            batch_size: Repositories per query
+            include_svg: Also fetch the text of monkey.svg (by far the largest
+                file); when False, svg is None but shas still lists the file
+
+        Returns:
+            {full_name: {"owner", "name", "url", "fork", "parent", "created_at",
+            "updated_at", "pushed_at", "stats", "dna", "svg", "shas"}} where
+            stats and dna are parsed JSON, svg is text (each None when missing)
+            and shas maps file paths to blob SHAs. Repos that could not be
+            read map to None.
+        """
+        monkeys = {}
+        for start in range(0, len(full_names), batch_size):
+            monkeys.update(self._fetch_monkey_batch(full_names[start:start + batch_size], include_svg))
+        return monkeys
+
+    def _fetch_monkey_batch(self, full_names: List[str], include_svg: bool) -> Dict[str, Optional[dict]]:
+        files = {**MONKEY_FILES, "svg": SVG_FILE}
+        # Without include_svg only the SVG's oid is fetched, telling whether there is one
+        blobs = " ".join(
+            f'{key}: object(expression: "HEAD:{path}") '
+            f'{{ ... on Blob {{ {"oid" if key == "svg" and not include_svg else "oid text"} }} }}'
+            for key, path in files.items()
+        )
+
+        # Owners and names go in as variables; each repo is an aliased field r<i>
+        parameters = []
+        fields = []
+        variables = {}
+        for i, full_name in enumerate(full_names):
+            owner, name = full_name.split("/", 1)
+            parameters.append(f"$o{i}: String!, $n{i}: String!")
+            fields.append(f"r{i}: repository(owner: $o{i}, name: $n{i}) {{ ...Monkey }}")
+            variables[f"o{i}"] = owner
+            variables[f"n{i}"] = name
+
+        query = f"""
+            query({", ".join(parameters)}) {{ {" ".join(fields)} }}
+            fragment Monkey on Repository {{
+                nameWithOwner name url isFork createdAt updatedAt pushedAt
+                owner {{ login }} parent {{ nameWithOwner }} {blobs}
+            }}
+        """
+        data = self.graphql(query, variables, partial=True)
+
+        monkeys = {}
+        for i, full_name in enumerate(full_names):
+            node = data.get(f"r{i}")
+            if node is None:
+                monkeys[full_name] = None
+                continue
+            monkeys[full_name] = {
+                "owner": node["owner"]["login"],
+                "name": node["name"],
+                "url": node["url"],
+                "fork": node["isFork"],
+                "parent": node["parent"]["nameWithOwner"] if node.get("parent") else None,
+                "created_at": _timestamp(node["createdAt"]),
+                "updated_at": _timestamp(node["updatedAt"]),
+                "pushed_at": _timestamp(node["pushedAt"]),
+                "stats": _parse_blob(node.get("stats")),
+                "dna": _parse_blob(node.get("dna")),
+                "svg": node["svg"].get("text") if node.get("svg") else None,
+                "shas": {path: node[key]["oid"] for key, path in files.items() if node.get(key)}
+            }
+        return monkeys
+
+
+def _parse_json(text: Optional[str]) -> Optional[dict]:
+    """Parse a monkey file, treating missing or corrupt files alike"""
+    if text is None:
+        return None
+    try:
+        return json.loads(text)
+    except ValueError:
+        return None
+
+
+def _parse_blob(blob: Optional[dict]) -> Optional[dict]:
+    return _parse_json(blob.get("text") if blob else None)
+
+
+def _timestamp(value: Optional[str]) -> Optional[str]:
+    """GraphQL DateTime in the isoformat() form PyGithub datetimes produce"""
+    return value.replace("Z", "+00:00") if value else None
+
+
+@lru_cache(maxsize=None)
+def github_api(token: Optional[str] = None) -> GitHubAPI:
+    """Shared client per token, so its connection pool is reused"""
+    return GitHubAPI(token)
@@ -0,0 +1,160 @@
+"""
+ForkMonkey Breeding Odds
+
+Exact outcome probabilities for GeneticsEngine.breed and GeneticsEngine.evolve,
+derived from TRAIT_POOL, RARITY_WEIGHTS and the gen-locked tables instead of
+sampling thousands of breeds.
+
+A distribution maps (value, rarity) pairs to probabilities for one trait category.
+"""
+
+from typing import Dict, Tuple
+
+from src.genetics import GeneticsEngine, MonkeyDNA, Rarity, Trait, TraitCategory
+
+
+Distribution = Dict[Tuple[str, Rarity], float]
+
+# Breeding constants, mirroring GeneticsEngine.breed and _mutate_trait
+GEN_LOCKED_CHANCE = 0.03
+INHERIT_CHANCE = 0.5
+RARITY_SHIFT_CHANCE = 0.3
+
+
+def rarity_transition_matrix() -> Dict[Rarity, Dict[Rarity, float]]:
+    """Probability that _mutate_trait moves a trait from one rarity to another"""
+    rarities = list(Rarity)
+    matrix = {}
+    for index, rarity in enumerate(rarities):
+        row = {r: 0.0 for r in rarities}
+        row[rarity] += 1 - RARITY_SHIFT_CHANCE
+        for shift in (-1, 1):
+            # Shifts past either end are clamped back onto the same rarity
+            target = rarities[max(0, min(len(rarities) - 1, index + shift))]
+            row[target] += RARITY_SHIFT_CHANCE / 2
+        matrix[rarity] = row
+    return matrix
+
+
+RARITY_TRANSITIONS = rarity_transition_matrix()
+
+
+def pool_distribution(category: TraitCategory, rarities: Dict[Rarity, float]) -> Distribution:
+    """Spread rarity probabilities uniformly over each rarity's TRAIT_POOL values"""
+    distribution: Distribution = {}
+    for rarity, probability in rarities.items():
+        if not probability:
+            continue
+        values = GeneticsEngine.TRAIT_POOL[category][rarity]
+        for value in values:
+            key = (value, rarity)
+            distribution[key] = distribution.get(key, 0.0) + probability / len(values)
+    return distribution
+
+
+def fresh_distribution(category: TraitCategory) -> Distribution:
+    """Outcome of a fresh _roll_rarity draw followed by a uniform value pick"""
+    total = sum(GeneticsEngine.RARITY_WEIGHTS.values())
+    return pool_distribution(category, {
+        rarity: weight / total
+        for rarity, weight in GeneticsEngine.RARITY_WEIGHTS.items()
+    })
+
+
+def mutation_distribution(category: TraitCategory, rarity: Rarity) -> Distribution:
+    """Outcome of _mutate_trait applied to any trait of the given rarity"""
+    return pool_distribution(category, RARITY_TRANSITIONS[rarity])
+
+
+def rarity_vector(distribution: Distribution) -> Dict[Rarity, float]:
+    """Collapse a distribution to per-rarity probabilities"""
+    vector = {rarity: 0.0 for rarity in Rarity}
+    for (_, rarity), probability in distribution.items():
+        vector[rarity] += probability
+    return vector
+
+
+def _mix(target: Distribution, source: Distribution, weight: float):
+    """Add weight * source into target"""
+    for key, probability in source.items():
+        target[key] = target.get(key, 0.0) + weight * probability
+
+
+def _mutate(category: TraitCategory, distribution: Distribution, chance: float) -> Distribution:
+    """Apply _mutate_trait with the given probability to every outcome"""
+    result: Distribution = {}
+    _mix(result, distribution, 1 - chance)
+    for rarity, probability in rarity_vector(distribution).items():
+        if probability:
+            _mix(result, mutation_distribution(category, rarity), chance * probability)
+    return result
+
+
+def child_trait_distribution(
+    category: TraitCategory,
+    parent_trait: Trait,
+    child_generation: int,
+    mutation_rate: float = 0.3
+) -> Distribution:
+    """Exact distribution of one child trait produced by GeneticsEngine.breed"""
+    gen_locked = GeneticsEngine.get_gen_locked_traits(category, child_generation)
+    locked_chance = GEN_LOCKED_CHANCE if gen_locked else 0.0
+
+    before_mutation: Distribution = {}
+    for value in gen_locked:
+        _mix(before_mutation, {(value, Rarity.LEGENDARY): 1.0}, locked_chance / len(gen_locked))
+    inherit_chance = (1 - locked_chance) * INHERIT_CHANCE
+    _mix(before_mutation, {(parent_trait.value, parent_trait.rarity): 1.0}, inherit_chance)
+    _mix(before_mutation, fresh_distribution(category), 1 - locked_chance - inherit_chance)
+
+    return _mutate(category, before_mutation, mutation_rate)
+
+
+def child_distribution(parent_dna: MonkeyDNA, mutation_rate: float = 0.3) -> Dict[TraitCategory, Distribution]:
+    """Exact per-category trait distributions for a child of parent_dna"""
+    return {
+        category: child_trait_distribution(
+            category, parent_dna.traits[category], parent_dna.generation + 1, mutation_rate
+        )
+        for category in TraitCategory
+    }
+
+
+def evolve_distribution(
+    dna: MonkeyDNA,
+    steps: int = 1,
+    evolution_strength: float = 0.1
+) -> Dict[TraitCategory, Distribution]:
+    """Exact per-category trait distributions after N GeneticsEngine.evolve steps"""
+    result = {}
+    for category, trait in dna.traits.items():
+        distribution: Distribution = {(trait.value, trait.rarity): 1.0}
+        for _ in range(steps):
+            distribution = _mutate(category, distribution, evolution_strength)
+        result[category] = distribution
+    return result
+
+
+def chance_of_any(distributions: Dict[TraitCategory, Distribution], *rarities: Rarity) -> float:
+    """Probability that at least one trait ends up with one of the given rarities"""
+    none = 1.0
+    for distribution in distributions.values():
+        vector = rarity_vector(distribution)
+        none *= 1 - sum(vector[rarity] for rarity in rarities)
+    return 1 - none
+
+
+def breeding_odds(parent_dna: MonkeyDNA, mutation_rate: float = 0.3) -> dict:
+    """Summary of a child's odds, ready for JSON output or README messages"""
+    distributions = child_distribution(parent_dna, mutation_rate)
+    return {
+        "any_legendary": chance_of_any(distributions, Rarity.LEGENDARY),
+        "any_rare_or_better": chance_of_any(distributions, Rarity.RARE, Rarity.LEGENDARY),
+        "rarity": {
+            category.value: {
+                rarity.value: probability
+                for rarity, probability in rarity_vector(distribution).items()
+            }
+            for category, distribution in distributions.items()
+        }
+    }
@@ -8,14 +8,65 @@ Generates multiple static JSON files for the web app:
 - web/leaderboard.json - Rarity rankings
 - web/family_tree.json - Fork genealogy
 - web/network_stats.json - Aggregate statistics
+
+Results are upserted into a SQLite community index (see community_index.py),
+and the leaderboard, family tree and network stats are queried from it.
+Scans are incremental: repos not pushed since the last scan are not fetched
+again. Changed repos are fetched in bulk with GraphQL (a batch of repos per
+request), or without a token with conditional (ETag) REST requests. Monkey
+SVGs are rendered locally from DNA where possible instead of downloaded.
 """
 
 import os
 import json
+import time
+import base64
+import sys
+import heapq
+import itertools
+import threading
 from pathlib import Path
 from datetime import datetime, timezone
 from collections import Counter
-from github import Github, GithubException
+from concurrent.futures import ThreadPoolExecutor
+from github import Github, GithubException, RateLimitExceededException
+
+try:
+    from src.community_index import CommunityIndex
+    from src.github_api import GRAPHQL_BATCH, GitHubAPI, GitHubAPIError
+except ImportError:  # Run as a script: python src/scan_community.py
+    from community_index import CommunityIndex
+    from github_api import GRAPHQL_BATCH, GitHubAPI, GitHubAPIError
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+
+try:
+    from src.genetics import GeneticsEngine
+    from src.visualizer import MonkeyVisualizer
+    HAS_VISUALIZER = True
+except ImportError:  # pydantic is not installed: fork SVGs are downloaded
+    HAS_VISUALIZER = False
+
+
+# Concurrent GitHub requests while crawling forks and fetching monkey files
+SCAN_CONCURRENCY = int(os.getenv("SCAN_CONCURRENCY", "8"))
+MAX_RETRIES = 5
+MAX_BACKOFF = 300  # Seconds; longer rate-limit resets are not waited out
+# The fork crawl reads whole fork lists within a work budget (0 = unlimited) and
+# continues where it stopped on the next run
+SCAN_MAX_TOTAL = int(os.getenv("SCAN_MAX_TOTAL", "0")) or None
+SCAN_BUDGET_CALLS = int(os.getenv("SCAN_BUDGET_CALLS", "2000")) or None
+SCAN_BUDGET_SECONDS = int(os.getenv("SCAN_BUDGET_SECONDS", "1200")) or None
+FORKS_PER_PAGE = 100  # The most the forks API returns per page
+# "graphql" fetches the monkey files of GRAPHQL_BATCH repos per request (needs a
+# token); "rest" makes three contents requests per repo
+SCAN_MODE = os.getenv("SCAN_MODE", "graphql")
+
+# The SVG is fetched last, and only if it cannot be rendered from the DNA
+MONKEY_FILES = {
+    "monkey_stats": "monkey_data/stats.json",
+    "monkey_dna": "monkey_data/dna.json",
+    "monkey_svg": "monkey_data/monkey.svg"
+}
 
 
 def scan_community():
@@ -27,7 +78,9 @@ def scan_community():
     if not token:
         print("⚠️  No GITHUB_TOKEN found. API limits will be strict.")
     
-    g = Github(token)
+    # Concurrency is bounded by the worker pools, so PyGithub's own request
+    # spacing is turned off and its connection pool sized to match
+    g = Github(token, pool_size=SCAN_CONCURRENCY, seconds_between_requests=None, per_page=FORKS_PER_PAGE)
     
     # Determine repo to scan
     repo_name = os.getenv("GITHUB_REPOSITORY")
@@ -47,19 +100,51 @@ def scan_community():
             
         print(f"📡 Scanning forks of {target_repo.full_name}...")
         
-        # Collect all repos to scan
-        repos_to_scan = collect_repos(target_repo)
-        print(f"🎯 Found {len(repos_to_scan)} potential habitats.")
+        index = CommunityIndex()
+        
+        # Collect all repos to scan, continuing an interrupted crawl if there is one
+        budget = CrawlBudget(SCAN_BUDGET_CALLS, SCAN_BUDGET_SECONDS)
+        options = {"max_total": SCAN_MAX_TOTAL, "budget": budget}
+        checkpoint = index.crawl_checkpoint(target_repo.full_name)
+        if checkpoint:
+            print(f"⏯️  Resuming the fork crawl ({len(checkpoint['frontier'])} fork pages left)...")
+            crawler = ForkCrawler.resume(checkpoint, g.withLazy(True).get_repo, **options)
+            repos_to_scan = crawler.run()
+        else:
+            crawler = ForkCrawler(**options)
+            repos_to_scan = crawler.crawl(target_repo)
+        print(f"🎯 Found {len(repos_to_scan)} potential habitats ({budget.calls} fork list requests).")
         
-        # Scan each repo and collect monkey data
+        api = GitHubAPI(token, pool_size=SCAN_CONCURRENCY)
+        renders = RenderCache(index.renders(MonkeyVisualizer.VERSION) if HAS_VISUALIZER else None)
+        scan = scan_repos_graphql if token and SCAN_MODE == "graphql" else scan_repos_incremental
+        results = scan(
+            repos_to_scan, target_repo.full_name, api, index.scan_states(), index.stored_monkeys(),
+            renders=renders
+        )
+        if HAS_VISUALIZER:
+            index.save_renders(MonkeyVisualizer.VERSION, renders.new)
+        index.begin_scan(target_repo.full_name)
+        index.save_crawl_checkpoint(crawler.checkpoint())
+        
+        # Store the results and collect monkey data
         monkeys = []
-        for repo_tuple in repos_to_scan:
-            repo, degree = repo_tuple
-            monkey = scan_repo(repo, target_repo.full_name, degree)
+        changed = 0
+        reused = 0
+        for (repo, degree), (monkey, state, unchanged) in zip(repos_to_scan, results):
+            if state is not None:
+                index.save_scan_state(repo.full_name, state["pushed_at"], state["files"])
+            reused += unchanged
             if monkey:
                 monkeys.append(monkey)
+                changed += index.upsert_monkey(monkey)
                 degree_label = get_degree_label(degree)
                 print(f"✅ Found monkey in {repo.full_name} ({degree_label})")
+            elif state is not None:
+                # Scanned without errors and no monkey found: drop any stored one
+                index.remove_monkey(repo.full_name)
+        
+        index.finish_scan()
         
         # Print summary by degree
         degree_counts = {}
@@ -70,13 +155,16 @@ def scan_community():
         for d in sorted(degree_counts.keys()):
             print(f"   {get_degree_label(d)}: {degree_counts[d]} monkeys")
         
-        print(f"\n✨ Scan complete! Discovered {len(monkeys)} monkeys.")
+        print(f"\n✨ Scan complete! Discovered {len(monkeys)} monkeys ({changed} new or changed).")
+        print(f"♻️  {reused} repos unchanged since the last scan were not fetched again.")
+        print(f"🎨 {renders.hits} monkey SVGs rendered from DNA instead of downloaded.")
         
         # Generate all output files
-        generate_community_data(target_repo.full_name, monkeys)
-        generate_leaderboard(monkeys)
-        generate_family_tree(target_repo.full_name, monkeys)
-        generate_network_stats(monkeys)
+        generate_community_data(target_repo.full_name, index)
+        generate_leaderboard(index)
+        generate_family_tree(target_repo.full_name, index)
+        generate_network_stats(index)
+        index.close()
         
         print("\n💾 All data files generated successfully!")
         
@@ -87,48 +175,231 @@ def scan_community():
         exit(1)
 
 
-def collect_repos(target_repo, max_depth=3, max_total=200):
+def collect_repos(target_repo, max_depth=3, max_total=None, workers=SCAN_CONCURRENCY, budget=None):
     """Collect all repos in the network (root + nested forks up to max_depth levels).
     
     Args:
         target_repo: The root repository to scan
         max_depth: Maximum depth to scan (1=direct forks, 2=forks of forks, 3=third level)
-        max_total: Maximum total repos to collect
+        max_total: Maximum total repos to collect (None for no limit)
+        workers: Maximum concurrent fork page requests
+        budget: CrawlBudget limiting the fork list requests
         
     Returns:
         List of tuples: (repo, degree) where degree is the distance from root (0=root, 1=1st degree, etc.)
     """
-    repos = [(target_repo, 0)]  # (repo, degree)
-    seen = {target_repo.full_name}
-    queue = [(target_repo, 0)]  # BFS queue with (repo, current_depth)
+    return ForkCrawler(max_depth, max_total, workers, budget).crawl(target_repo)
+
+
+class CrawlBudget:
+    """Work allowed for a fork crawl, in API calls and/or wall-clock seconds."""
+    
+    def __init__(self, max_calls=None, max_seconds=None):
+        self.max_calls = max_calls
+        self.max_seconds = max_seconds
+        self.calls = 0
+        self.started = time.monotonic()
+    
+    def remaining_calls(self):
+        """Calls left, or None if calls are not limited."""
+        return None if self.max_calls is None else max(self.max_calls - self.calls, 0)
+    
+    def spend(self, calls=1):
+        self.calls += calls
+    
+    @property
+    def exhausted(self):
+        if self.max_calls is not None and self.calls >= self.max_calls:
+            return True
+        return self.max_seconds is not None and time.monotonic() - self.started >= self.max_seconds
+
+
+class ForkCrawler:
+    """Crawl of a fork network, page by page, that can stop and resume.
+    
+    Fork lists are read to the last page. Pages are fetched concurrently in
+    batches of `workers`, degree by degree; within a degree the forks pushed
+    most recently are expanded first, so a crawl cut short by its budget, by
+    max_total or by the rate limit has covered the active part of the network.
+    The pages still to fetch are returned by checkpoint() for resume().
+    """
+    
+    def __init__(self, max_depth=3, max_total=None, workers=SCAN_CONCURRENCY, budget=None,
+                 per_page=FORKS_PER_PAGE):
+        self.max_depth = max_depth
+        self.max_total = max_total
+        self.workers = workers
+        self.budget = budget
+        self.per_page = per_page
+        self.frontier = []  # Heap of (depth, -pushed_at, seq, full_name, page, repo)
+        self.seen = set()
+        self.repos = []
+        self.rate_limited = False
+        self._seq = itertools.count()
     
-    while queue and len(repos) < max_total:
-        current_repo, current_depth = queue.pop(0)
+    @classmethod
+    def resume(cls, checkpoint, get_repo, **options):
+        """Continue a crawl from checkpoint() output.
         
-        # Stop if we've reached max depth
-        if current_depth >= max_depth:
-            continue
+        Args:
+            checkpoint: Saved checkpoint
+            get_repo: Function returning a (lazy) repo object for a full name
+            **options: ForkCrawler arguments
+        """
+        crawler = cls(**options)
+        crawler.seen = set(checkpoint["seen"])
+        for depth, pushed, full_name, page in checkpoint["frontier"]:
+            crawler._push(get_repo(full_name), full_name, depth, pushed, page)
+        return crawler
+    
+    def checkpoint(self):
+        """Pages still to fetch and repos already found, or None if the crawl is complete."""
+        if not self.frontier:
+            return None
+        return {
+            "frontier": [[depth, -negative_pushed, full_name, page]
+                         for depth, negative_pushed, _, full_name, page, _ in sorted(self.frontier)],
+            "seen": sorted(self.seen)
+        }
+    
+    def crawl(self, root):
+        """Crawl the network of root, returning [(repo, degree)] with root first."""
+        self.seen.add(root.full_name)
+        self.repos.append((root, 0))
+        self._push(root, root.full_name, 0, pushed_timestamp(root))
+        return self.run()
+    
+    def _push(self, repo, full_name, depth, pushed, page=0):
+        # Repos at max depth are not expanded
+        if depth < self.max_depth:
+            heapq.heappush(self.frontier, (depth, -pushed, next(self._seq), full_name, page, repo))
+    
+    def _full(self):
+        return self.max_total is not None and len(self.repos) >= self.max_total
+    
+    def run(self):
+        """Fetch fork pages until the network, budget or max_total runs out.
+        
+        Returns:
+            The (repo, degree) tuples found so far
+        """
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while self.frontier and not self._full() and not self.rate_limited:
+                size = min(self.workers, len(self.frontier))
+                if self.budget:
+                    if self.budget.exhausted:
+                        break
+                    remaining = self.budget.remaining_calls()
+                    size = size if remaining is None else min(size, remaining)
+                    self.budget.spend(size)
+                
+                batch = [heapq.heappop(self.frontier) for _ in range(size)]
+                pages = pool.map(lambda entry: fetch_fork_page(entry[5], entry[4]), batch)
+                for entry, page in zip(batch, pages):
+                    self._add_page(entry, page)
         
+        if self.frontier:
+            reason = "rate limit" if self.rate_limited else "repo limit" if self._full() else "budget"
+            print(f"⏸️  Crawl stopped by the {reason}; {len(self.frontier)} fork pages left for the next run.")
+        return self.repos
+    
+    def _add_page(self, entry, page):
+        depth, negative_pushed, _, full_name, page_number, repo = entry
+        if page is None:
+            self.rate_limited = True
+        if page is None or self._full():
+            heapq.heappush(self.frontier, entry)
+            return
+        
+        for fork in page:
+            if fork.full_name in self.seen:
+                continue
+            if self._full():
+                # Fetched again on the next run; forks already seen are skipped
+                heapq.heappush(self.frontier, entry)
+                return
+            self.seen.add(fork.full_name)
+            fork_degree = depth + 1
+            self.repos.append((fork, fork_degree))
+            self._push(fork, fork.full_name, fork_degree, pushed_timestamp(fork))
+            
+            degree_label = get_degree_label(fork_degree)
+            print(f"  📍 Found {degree_label} fork: {fork.full_name}")
+        
+        # A full page may be followed by another
+        if len(page) >= self.per_page:
+            self._push(repo, full_name, depth, -negative_pushed, page_number + 1)
+
+
+def pushed_timestamp(repo):
+    """When a repo was last pushed to (POSIX seconds), 0 if unknown."""
+    pushed = getattr(repo, "pushed_at", None)
+    return pushed.timestamp() if isinstance(pushed, datetime) else 0.0
+
+
+def fetch_fork_page(repo, page=0):
+    """Fetch one page of a repo's forks.
+    
+    Returns:
+        The forks on the page ([] on errors), or None if the rate limit
+        outlasted the retries, so the page can be fetched on the next run
+    """
+    try:
+        forks = repo.get_forks()
+    except Exception as e:
+        print(f"⚠️ Error fetching forks of {repo.full_name}: {e}")
+        return []
+    
+    try:
+        return list(with_backoff(forks.get_page, page))
+    except GithubException as e:
+        return None if is_rate_limited(e) else []
+    except Exception:
+        return []
+
+
+def is_rate_limited(error):
+    """Check whether a GitHub error is a (primary or secondary) rate limit."""
+    if isinstance(error, RateLimitExceededException):
+        return True
+    if isinstance(error, GitHubAPIError) and error.rate_limited:
+        return True
+    if not isinstance(error, (GithubException, GitHubAPIError)) or error.status not in (403, 429):
+        return False
+    headers = {key.lower(): value for key, value in (error.headers or {}).items()}
+    return (
+        "retry-after" in headers
+        or headers.get("x-ratelimit-remaining") == "0"
+        or "rate limit" in str(getattr(error, "data", error)).lower()
+    )
+
+
+def rate_limit_delay(error, attempt):
+    """Seconds to wait before retrying a rate-limited request."""
+    headers = {key.lower(): value for key, value in (getattr(error, "headers", None) or {}).items()}
+    if "retry-after" in headers:
+        delay = float(headers["retry-after"])
+    elif "x-ratelimit-reset" in headers:
+        delay = float(headers["x-ratelimit-reset"]) - time.time() + 1
+    else:
+        delay = 2 ** attempt
+    return min(max(delay, 1), MAX_BACKOFF)
+
+
+def with_backoff(func, *args, retries=MAX_RETRIES):
+    """Call func(*args), waiting and retrying while GitHub reports a rate limit.
+    
+    Other errors (e.g. 404 for a missing file) are raised immediately.
+    """
+    for attempt in range(retries + 1):
         try:
-            forks = current_repo.get_forks()
-            # Get up to 50 forks per repo (1 page)
-            try:
-                page = forks.get_page(0)
-                for fork in page:
-                    if fork.full_name not in seen and len(repos) < max_total:
-                        seen.add(fork.full_name)
-                        fork_degree = current_depth + 1
-                        repos.append((fork, fork_degree))
-                        queue.append((fork, fork_degree))
-                        
-                        degree_label = get_degree_label(fork_degree)
-                        print(f"  📍 Found {degree_label} fork: {fork.full_name}")
-            except Exception:
-                pass
-        except Exception as e:
-            print(f"⚠️ Error fetching forks of {current_repo.full_name}: {e}")
-    
-    return repos
+            return func(*args)
+        except (GithubException, GitHubAPIError) as e:
+            if attempt == retries or not is_rate_limited(e):
+                raise
+            delay = rate_limit_delay(e, attempt)
+            print(f"⏳ Rate limited, retrying in {delay:.0f}s...")
+            time.sleep(delay)
 
 
 def get_degree_label(degree):
@@ -142,83 +413,341 @@ def get_degree_label(degree):
     return labels.get(degree, f"{degree}th degree")
 
 
-def scan_repo(repo, root_name, degree=0):
-    """Scan a single repo for monkey data.
+def repo_age(repo):
+    """Days since the repo was created."""
+    now = datetime.now(timezone.utc)
+    created = repo.created_at.replace(tzinfo=timezone.utc)
+    return (now - created).days
+
+
+def repo_data(repo, root_name, degree, parent=None):
+    """Repo fields of a monkey record, without monkey files yet.
+    
+    Args:
+        parent: Parent repo name if already known (saves a repo lookup)
+    """
+    if parent is None and repo.fork and repo.parent:
+        parent = repo.parent.full_name
+    
+    return {
+        "owner": repo.owner.login,
+        "repo": repo.name,
+        "full_name": repo.full_name,
+        "url": repo.html_url,
+        "is_root": repo.full_name == root_name,
+        "degree": degree,
+        "degree_label": get_degree_label(degree),
+        "parent": parent,
+        "created_at": repo.created_at.isoformat(),
+        "updated_at": repo.updated_at.isoformat() if repo.updated_at else None,
+        "monkey_stats": None,
+        "monkey_svg": None,
+        "monkey_dna": None
+    }
+
+
+def finish_monkey(monkey_data, age):
+    """Return the monkey record if the repo has a monkey (stats or SVG), else None."""
+    if monkey_data["monkey_stats"]:
+        # Always calculate fresh age from repo creation date (fixes Issue #64)
+        monkey_data["monkey_stats"]["age_days"] = age
+    
+    # Only return if we found at least stats or SVG
+    if monkey_data["monkey_stats"] or monkey_data["monkey_svg"]:
+        # Ensure basic stats if missing
+        if not monkey_data["monkey_stats"]:
+            monkey_data["monkey_stats"] = {
+                "generation": 1,
+                "rarity_score": 0,
+                "age_days": age,
+                "mutation_count": 0
+            }
+        return monkey_data
+    
+    return None
+
+
+def is_unchanged(repo, previous_state):
+    """Check whether a repo was not pushed since the scan that stored its state."""
+    return bool(
+        previous_state and repo.pushed_at
+        and previous_state["pushed_at"] == repo.pushed_at.isoformat()
+    )
+
+
+def reuse_monkey(repo, root_name, degree, previous_monkey):
+    """The stored monkey of an unchanged repo, with fresh repo fields and age."""
+    if previous_monkey is None:
+        return None
+    monkey_data = repo_data(repo, root_name, degree, previous_monkey["parent"])
+    for key in MONKEY_FILES:
+        monkey_data[key] = previous_monkey[key]
+    monkey_data["monkey_stats"] = dict(previous_monkey["monkey_stats"])
+    return finish_monkey(monkey_data, repo_age(repo))
+
+
+def scan_repo_incremental(repo, root_name, degree, api, previous_state=None, previous_monkey=None,
+                          renders=None):
+    """Scan a repo, reusing what the last scan stored where nothing changed.
+    
+    A repo whose pushed_at is unchanged is not fetched at all. Otherwise each
+    monkey file is requested with the ETag stored for it, and only files that
+    changed are downloaded. The SVG is only requested if it cannot be
+    rendered from the DNA.
     
     Args:
         repo: GitHub repository object
         root_name: Full name of the root repository
-        degree: Fork degree (0=root, 1=1st degree, 2=2nd degree, 3=3rd degree)
+        degree: Fork degree
+        api: GitHubAPI used for the conditional contents requests
+        previous_state: Scan state stored for this repo, if any
+        previous_monkey: Monkey stored for this repo, if any
+        renders: RenderCache for rendering the SVG from the DNA
+        
+    Returns:
+        (monkey or None, new scan state or None on error, True if the repo was not fetched).
+        When a file cannot be fetched, the monkey is the stored one (if any)
     """
+    renders = renders or RenderCache()
     try:
-        # Calculate age from creation
-        now = datetime.now(timezone.utc)
-        created = repo.created_at.replace(tzinfo=timezone.utc)
-        age = (now - created).days
-        
-        monkey_data = {
-            "owner": repo.owner.login,
-            "repo": repo.name,
-            "full_name": repo.full_name,
-            "url": repo.html_url,
-            "is_root": repo.full_name == root_name,
-            "degree": degree,
-            "degree_label": get_degree_label(degree),
-            "parent": repo.parent.full_name if repo.fork and repo.parent else None,
-            "created_at": repo.created_at.isoformat(),
-            "updated_at": repo.updated_at.isoformat() if repo.updated_at else None,
-            "monkey_stats": None,
-            "monkey_svg": None,
-            "monkey_dna": None
-        }
+        age = repo_age(repo)
+        pushed_at = repo.pushed_at.isoformat() if repo.pushed_at else None
+        # Parents never change, so a stored one saves looking the repo up
+        parent = previous_monkey["parent"] if previous_monkey else None
         
-        # Fetch stats.json
-        try:
-            contents = repo.get_contents("monkey_data/stats.json")
-            stats = json.loads(contents.decoded_content.decode())
-            # Always calculate fresh age from repo creation date (fixes Issue #64)
-            stats["age_days"] = age
-            monkey_data["monkey_stats"] = stats
-        except Exception:
-            pass
-        
-        # Fetch monkey.svg
-        try:
-            contents = repo.get_contents("monkey_data/monkey.svg")
-            svg = contents.decoded_content.decode()
-            monkey_data["monkey_svg"] = svg
-        except Exception:
-            pass
+        if is_unchanged(repo, previous_state):
+            return reuse_monkey(repo, root_name, degree, previous_monkey), previous_state, True
         
-        # Fetch dna.json for extra data
-        try:
-            contents = repo.get_contents("monkey_data/dna.json")
-            dna = json.loads(contents.decoded_content.decode())
-            monkey_data["monkey_dna"] = dna
-        except Exception:
-            pass
-        
-        # Only return if we found at least stats or SVG
-        if monkey_data["monkey_stats"] or monkey_data["monkey_svg"]:
-            # Ensure basic stats if missing
-            if not monkey_data["monkey_stats"]:
-                monkey_data["monkey_stats"] = {
-                    "generation": 1,
-                    "rarity_score": 0,
-                    "age_days": age,
-                    "mutation_count": 0
-                }
-            return monkey_data
+        old_files = previous_state["files"] if previous_state else {}
+        files = {}
+        contents = {}
+        for key, path in MONKEY_FILES.items():
+            cached = previous_monkey.get(key) if previous_monkey else None
+            old = old_files.get(path, {})
+            contents[key] = None
+            if key == "monkey_svg":
+                contents[key] = renders.render(contents["monkey_dna"], contents["monkey_stats"])
+                if contents[key] is not None:
+                    continue
+            try:
+                status, body, etag = with_backoff(
+                    api.get_if_changed,
+                    f"/repos/{repo.full_name}/contents/{path}",
+                    old.get("etag") if cached is not None else None
+                )
+            except Exception as e:
+                # Keep the stored monkey; without a scan state the repo is fetched again next run
+                print(f"⚠️ Error fetching {path} of {repo.full_name}: {e}")
+                return reuse_monkey(repo, root_name, degree, previous_monkey), None, False
+            if status == 304:
+                contents[key] = cached
+                files[path] = old
+            elif status == 200:
+                try:
+                    text = base64.b64decode(body["content"]).decode()
+                    contents[key] = text if key == "monkey_svg" else json.loads(text)
+                    files[path] = {"sha": body["sha"], "etag": etag}
+                except ValueError:
+                    pass  # Corrupt file, treated as missing
         
-        return None
+        state = {"pushed_at": pushed_at, "files": files}
+        if not contents["monkey_stats"] and not contents["monkey_svg"]:
+            return None, state, False
+        
+        monkey_data = repo_data(repo, root_name, degree, parent)
+        monkey_data.update(contents)
+        if monkey_data["monkey_stats"]:
+            monkey_data["monkey_stats"] = dict(monkey_data["monkey_stats"])
+        return finish_monkey(monkey_data, age), state, False
         
     except Exception as e:
         print(f"❌ Error scanning {repo.full_name}: {e}")
-        return None
+        return None, None, False
+
+
+def scan_repos_incremental(repos, root_name, api, states, stored, workers=SCAN_CONCURRENCY, renders=None):
+    """Scan repos concurrently against the stored scan state.
+    
+    Args:
+        repos: (repo, degree) tuples from collect_repos
+        root_name: Full name of the root repository
+        api: GitHubAPI for conditional requests
+        states: CommunityIndex.scan_states()
+        stored: CommunityIndex.stored_monkeys()
+        workers: Maximum repos scanned at once
+        renders: RenderCache shared by the workers
+        
+    Returns:
+        scan_repo_incremental results in the same order as repos
+    """
+    renders = renders or RenderCache()
+    
+    def scan(item):
+        repo, degree = item
+        return scan_repo_incremental(
+            repo, root_name, degree, api, states.get(repo.full_name), stored.get(repo.full_name), renders
+        )
+    
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(scan, repos))
+
+
+def scan_repos_graphql(repos, root_name, api, states, stored, batch_size=GRAPHQL_BATCH, renders=None):
+    """Scan repos against the stored scan state, fetching changed ones in bulk.
+    
+    Unchanged repos are reused as in scan_repos_incremental; the rest are
+    fetched batch_size at a time with one GraphQL query per batch, which also
+    returns the owner, parent and timestamps. SVGs are rendered from the DNA,
+    and only the ones that cannot be are fetched, with a second query. A batch
+    the GraphQL API refuses falls back to REST requests. If the GraphQL rate
+    limit outlasts the retries, the remaining repos keep their stored monkey
+    and are fetched on the next run.
+    
+    Args:
+        repos: (repo, degree) tuples from collect_repos
+        root_name: Full name of the root repository
+        api: GitHubAPI with a token
+        states: CommunityIndex.scan_states()
+        stored: CommunityIndex.stored_monkeys()
+        batch_size: Repos per GraphQL query
+        renders: RenderCache for rendering SVGs from DNA
+        
+    Returns:
+        (monkey or None, scan state or None, reused) per repo, in the same order as repos
+    """
+    renders = renders or RenderCache()
+    results = [None] * len(repos)
+    changed = []
+    for i, (repo, degree) in enumerate(repos):
+        state = states.get(repo.full_name)
+        if is_unchanged(repo, state):
+            results[i] = (reuse_monkey(repo, root_name, degree, stored.get(repo.full_name)), state, True)
+        else:
+            changed.append(i)
+    
+    for start in range(0, len(changed), batch_size):
+        batch = changed[start:start + batch_size]
+        names = [repos[i][0].full_name for i in batch]
+        try:
+            fetched = with_backoff(api.fetch_monkeys, names, batch_size, False)
+            for node in fetched.values():
+                if node:
+                    node["svg"] = renders.render(node["dna"], node["stats"])
+            # Repos with an SVG that could not be rendered
+            download = [
+                name for name, node in fetched.items()
+                if node and node["svg"] is None and MONKEY_FILES["monkey_svg"] in node["shas"]
+            ]
+            if download:
+                fetched.update(with_backoff(api.fetch_monkeys, download, batch_size, True))
+        except GitHubAPIError as e:
+            if is_rate_limited(e):
+                remaining = changed[start:]
+                print(f"⏸️  GraphQL rate limit reached; {len(remaining)} repos left for the next run.")
+                for i in remaining:
+                    repo, degree = repos[i]
+                    results[i] = (reuse_monkey(repo, root_name, degree, stored.get(repo.full_name)), None, False)
+                break
+            print(f"⚠️ GraphQL batch failed ({e}), falling back to REST...")
+            fallback = scan_repos_incremental(
+                [repos[i] for i in batch], root_name, api, states, stored, renders=renders
+            )
+            for i, result in zip(batch, fallback):
+                results[i] = result
+            continue
+        
+        for i, name in zip(batch, names):
+            node = fetched.get(name)
+            results[i] = monkey_from_graphql(node, root_name, repos[i][1]) if node else (None, None, False)
+    
+    return results
+
+
+class RenderCache:
+    """Monkey SVGs rendered locally from fork DNA, by DNA hash.
+    
+    Forks record the visualizer version that drew their monkey.svg in
+    stats.json; a fork on the same version as this checkout gets exactly the
+    SVG it committed, for a fraction of the download.
+    """
+    
+    def __init__(self, svgs=None):
+        """
+        Args:
+            svgs: DNA hash -> SVG rendered earlier by the same visualizer version
+        """
+        self.svgs = dict(svgs or {})
+        self.new = {}  # Renders to save in the community index
+        self.hits = 0
+        self._lock = threading.Lock()  # Shared by the scan workers
+    
+    def render(self, dna, stats):
+        """SVG for a fork's DNA, or None if its monkey.svg has to be downloaded.
+        
+        Rendering needs the DNA, stats.json from the same DNA and visualizer
+        version as this checkout, and pydantic.
+        """
+        if not HAS_VISUALIZER or not dna or not stats:
+            return None
+        dna_hash = dna.get("dna_hash")
+        if (not dna_hash or stats.get("dna_hash") != dna_hash
+                or stats.get("visualizer_version") != MonkeyVisualizer.VERSION):
+            return None
+        
+        with self._lock:
+            svg = self.svgs.get(dna_hash)
+        if svg is None:
+            try:
+                svg = MonkeyVisualizer.generate_svg(GeneticsEngine.dict_to_dna(dna))
+            except Exception:  # DNA this checkout cannot read (e.g. unknown traits)
+                return None
+            with self._lock:
+                self.svgs[dna_hash] = svg
+                self.new[dna_hash] = svg
+        
+        with self._lock:
+            self.hits += 1
+        return svg
+
+
+def monkey_from_graphql(node, root_name, degree):
+    """Monkey record and scan state from a GitHubAPI.fetch_monkeys entry."""
+    full_name = f"{node['owner']}/{node['name']}"
+    created = datetime.fromisoformat(node["created_at"])
+    age = (datetime.now(timezone.utc) - created).days
+    
+    monkey_data = {
+        "owner": node["owner"],
+        "repo": node["name"],
+        "full_name": full_name,
+        "url": node["url"],
+        "is_root": full_name == root_name,
+        "degree": degree,
+        "degree_label": get_degree_label(degree),
+        "parent": node["parent"] if node["fork"] else None,
+        "created_at": node["created_at"],
+        "updated_at": node["updated_at"],
+        "monkey_stats": dict(node["stats"]) if node["stats"] else None,
+        "monkey_svg": node["svg"],
+        "monkey_dna": node["dna"]
+    }
+    state = {
+        "pushed_at": node["pushed_at"],
+        "files": {path: {"sha": sha, "etag": None} for path, sha in node["shas"].items()}
+    }
+    return finish_monkey(monkey_data, age), state, False
 
 
 def generate_community_data(source_repo, monkeys):
-    """Generate community_data.json with all fork data."""
+    """Generate community_data.json with all fork data.
+    
+    Args:
+        source_repo: Full name of the scanned root repository
+        monkeys: List of scanned monkeys, or a CommunityIndex to read them from
+    """
+    if isinstance(monkeys, CommunityIndex):
+        monkeys = monkeys.monkeys()
+    
     data = {
         "last_updated": datetime.now(timezone.utc).isoformat(),
         "source_repo": source_repo,
@@ -236,13 +765,20 @@ def generate_community_data(source_repo, monkeys):
 
 
 def generate_leaderboard(monkeys):
-    """Generate leaderboard.json with rarity rankings."""
+    """Generate leaderboard.json with rarity rankings.
+    
+    Args:
+        monkeys: List of scanned monkeys, or a CommunityIndex to query
+    """
     # Sort by rarity score (descending)
-    sorted_monkeys = sorted(
-        monkeys,
-        key=lambda m: m.get("monkey_stats", {}).get("rarity_score", 0),
-        reverse=True
-    )
+    if isinstance(monkeys, CommunityIndex):
+        sorted_monkeys = monkeys.monkeys(by_rarity=True)
+    else:
+        sorted_monkeys = sorted(
+            monkeys,
+            key=lambda m: m.get("monkey_stats", {}).get("rarity_score", 0),
+            reverse=True
+        )
     
     rankings = []
     for rank, monkey in enumerate(sorted_monkeys, start=1):
@@ -277,10 +813,19 @@ def generate_leaderboard(monkeys):
 
 
 def generate_family_tree(root_name, monkeys):
-    """Generate family_tree.json with fork genealogy."""
-    # Build parent-children relationships
-    nodes = {}
+    """Generate family_tree.json with fork genealogy.
+    
+    Args:
+        root_name: Full name of the root repository
+        monkeys: List of scanned monkeys, or a CommunityIndex to query
+    """
+    if isinstance(monkeys, CommunityIndex):
+        nodes = {node["id"]: node for node in monkeys.family_tree_nodes()}
+        monkeys = []
+    else:
+        nodes = {}
     
+    # Build parent-children relationships
     for monkey in monkeys:
         full_name = monkey["full_name"]
         parent = monkey.get("parent")
@@ -330,8 +875,17 @@ def generate_family_tree(root_name, monkeys):
 
 
 def generate_network_stats(monkeys):
-    """Generate network_stats.json with aggregate statistics."""
-    if not monkeys:
+    """Generate network_stats.json with aggregate statistics.
+    
+    Args:
+        monkeys: List of scanned monkeys, or a CommunityIndex to query
+    """
+    if isinstance(monkeys, CommunityIndex):
+        data = {
+            "last_updated": datetime.now(timezone.utc).isoformat(),
+            **monkeys.network_stats()
+        }
+    elif not monkeys:
         data = {
             "last_updated": datetime.now(timezone.utc).isoformat(),
             "total_monkeys": 0,
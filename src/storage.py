@@ -2,38 +2,576 @@
 ForkMonkey Storage
 
 Handles DNA storage in GitHub Secrets and history in files.
+Storage backends: JSON files in monkey_data/ (default), SQLite, in-memory.
 """
 
 import os
+import abc
+import copy
 import json
 import base64
-from typing import Optional, Dict, List
+import itertools
+import sqlite3
+import tempfile
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Iterator, Optional, Dict, List, Tuple
 from datetime import datetime
 from pathlib import Path
-from github import Github, GithubException
+import requests
+from github import Github
 from src.genetics import MonkeyDNA, GeneticsEngine
+from src.github_api import GitHubAPI, GitHubAPIError, github_api
+from src.visualizer import MonkeyVisualizer
+
+
+def _stage_write(path: Path, data: bytes) -> Path:
+    """Write data to a temporary file next to path and flush it to disk"""
+    fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        os.unlink(temp_name)
+        raise
+    return Path(temp_name)
+
+
+def _commit_write(temp_path: Path, path: Path):
+    """Move a staged file into place; readers see the old or the new file, never a partial one"""
+    os.replace(temp_path, path)
+    try:
+        # Persist the rename itself (not supported on every platform)
+        dir_fd = os.open(path.parent, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+    except OSError:
+        pass
+
+
+def atomic_write(path: Path, data: bytes):
+    """
+    Replace a file atomically (temp file, fsync, rename)
+    
+    Args:
+        path: File to write
+        data: New file contents
+    """
+    _commit_write(_stage_write(path, data), path)
+
+
+def json_bytes(data) -> bytes:
+    """Serialize data the way the monkey_data JSON files are stored"""
+    return json.dumps(data, indent=2).encode()
+
+
+def _history_line(entry: dict) -> str:
+    """One history.jsonl line"""
+    return json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+class StorageBackend(abc.ABC):
+    """
+    Abstract base class for monkey data storage
+    
+    A backend holds the data of one monkey: JSON documents ("dna", "stats")
+    and a chronological list of history entries.
+    """
+    
+    @abc.abstractmethod
+    def read_document(self, name: str) -> Optional[dict]:
+        """Load a document, or None if it was never saved"""
+        pass
+    
+    @abc.abstractmethod
+    def commit(self, documents: Dict[str, dict], entries: List[dict]):
+        """Save documents and append history entries as one all-or-nothing step"""
+        pass
+    
+    @abc.abstractmethod
+    def iter_history(
+        self,
+        reverse: bool = False,
+        since: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[dict]:
+        """Stream history entries (see MonkeyStorage.iter_history)"""
+        pass
+    
+    @abc.abstractmethod
+    def count_history(self) -> int:
+        """Number of history entries"""
+        pass
+    
+    @abc.abstractmethod
+    def replace_history(self, entries: List[dict]):
+        """Rewrite the whole history"""
+        pass
+    
+    @abc.abstractmethod
+    def name(self) -> str:
+        """Where the data lives, for messages"""
+        pass
+
+
+class FileSystemBackend(StorageBackend):
+    """JSON files in monkey_data/ (the layout committed to monkey repos)"""
+    
+    def __init__(self, data_dir: Path = Path("monkey_data")):
+        self.data_dir = Path(data_dir)
+        self.data_dir.mkdir(exist_ok=True)
+        
+        # Append-only history: one JSON entry per line, plus a small index
+        # ({"count", "size"}) so appends never re-read earlier entries
+        self.history_file = self.data_dir / "history.jsonl"
+        self.history_index_file = self.data_dir / "history.idx.json"
+        self.legacy_history_file = self.data_dir / "history.json"
+    
+    def name(self) -> str:
+        return str(self.data_dir)
+    
+    def read_document(self, name: str) -> Optional[dict]:
+        path = self.data_dir / f"{name}.json"
+        return json.loads(path.read_bytes()) if path.exists() else None
+    
+    def commit(self, documents: Dict[str, dict], entries: List[dict]):
+        """
+        The files are staged and flushed first, then renamed into place (dna.json
+        last, as it is what the next run starts from), and the history entries
+        are appended last. The history append is the commit point: an
+        interruption never leaves a truncated file, nor a history entry for
+        documents that were not saved.
+        """
+        staged = []
+        try:
+            for name in sorted(documents, key=lambda name: name == "dna"):
+                path = self.data_dir / f"{name}.json"
+                staged.append((_stage_write(path, json_bytes(documents[name])), path))
+            
+            for temp_path, path in staged:
+                _commit_write(temp_path, path)
+            staged = []
+            
+            if entries:
+                self._append_history(entries)
+        
+        finally:
+            for temp_path, _ in staged:
+                if temp_path.exists():
+                    temp_path.unlink()
+    
+    def _append_history(self, entries: List[dict]):
+        """Append entries to history.jsonl in one write and update the index"""
+        self._migrate_history()
+        index = self._load_history_index() or self._repair_history()
+        data = "".join(_history_line(entry) for entry in entries).encode()
+        
+        with open(self.history_file, "ab") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        
+        self._save_history_index(index["count"] + len(entries), index["size"] + len(data))
+    
+    def iter_history(
+        self,
+        reverse: bool = False,
+        since: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[dict]:
+        if not self.history_file.exists():
+            # Read-only: a legacy history.json is only converted on the next write
+            legacy = self._read_legacy_history()
+            entries = reversed(legacy) if reverse else legacy
+        elif reverse:
+            entries = self._read_history_entries_reversed()
+        else:
+            entries = self._read_history_entries()
+        
+        count = 0
+        for entry in entries:
+            if limit is not None and count >= limit:
+                return
+            if since and entry.get("timestamp", "") < since:
+                if reverse:
+                    return  # Entries are chronological, so everything older follows
+                continue
+            yield entry
+            count += 1
+    
+    def count_history(self) -> int:
+        if not self.history_file.exists():
+            return len(self._read_legacy_history())
+        index = self._load_history_index()
+        return index["count"] if index else self._scan_history()[0]
+    
+    def _read_history_entries(self) -> Iterator[dict]:
+        """Stream history entries oldest first, skipping a torn final line"""
+        if not self.history_file.exists():
+            return
+        
+        with open(self.history_file, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # Interrupted append; repaired on the next write
+                if line.strip():
+                    yield json.loads(line)
+    
+    def _read_history_entries_reversed(self, block_size: int = 8192) -> Iterator[dict]:
+        """Stream history entries newest first by reading blocks back from the end"""
+        if not self.history_file.exists():
+            return
+        
+        with open(self.history_file, "rb") as f:
+            position = f.seek(0, os.SEEK_END)
+            remainder = b""
+            torn = True  # Text after the final newline is an interrupted append
+            while position > 0:
+                step = min(block_size, position)
+                position -= step
+                f.seek(position)
+                lines = (f.read(step) + remainder).split(b"\n")
+                remainder = lines.pop(0)
+                for line in reversed(lines):
+                    if torn:
+                        torn = False
+                        continue
+                    if line.strip():
+                        yield json.loads(line)
+            if remainder.strip() and not torn:
+                yield json.loads(remainder)
+    
+    def _load_history_index(self) -> Optional[dict]:
+        """Load the history index, or None if it does not match history.jsonl"""
+        try:
+            with open(self.history_index_file, "r") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = None
+        
+        size = self.history_file.stat().st_size if self.history_file.exists() else 0
+        if not index or index.get("size") != size:
+            return None
+        return index
+    
+    def _save_history_index(self, count: int, size: int):
+        """Write the history index"""
+        atomic_write(self.history_index_file, json.dumps({"count": count, "size": size}).encode())
+    
+    def _scan_history(self) -> Tuple[int, int]:
+        """(count, size) of the complete lines in history.jsonl"""
+        count = 0
+        size = 0
+        if self.history_file.exists():
+            with open(self.history_file, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    count += 1
+                    size += len(line)
+        return count, size
+    
+    def _repair_history(self) -> dict:
+        """Drop a torn final line from history.jsonl and rebuild the index (write path only)"""
+        count, size = self._scan_history()
+        if self.history_file.exists() and size != self.history_file.stat().st_size:
+            print("⚠️  Dropping incomplete history entry")
+            os.truncate(self.history_file, size)
+        
+        self._save_history_index(count, size)
+        return {"count": count, "size": size}
+    
+    def _read_legacy_history(self) -> List[dict]:
+        """Entries of a legacy history.json ({"entries": [...]}), [] if there is none"""
+        if not self.legacy_history_file.exists():
+            return []
+        with open(self.legacy_history_file, "r") as f:
+            return json.load(f).get("entries", [])
+    
+    def _migrate_history(self):
+        """Convert a legacy history.json to history.jsonl (write path only)"""
+        if not self.legacy_history_file.exists() or self.history_file.exists():
+            return
+        
+        entries = self._read_legacy_history()
+        self.replace_history(entries)
+        self.legacy_history_file.unlink()
+        print(f"📦 Migrated {len(entries)} history entries to {self.history_file}")
+    
+    def replace_history(self, entries: List[dict]):
+        data = "".join(_history_line(entry) for entry in entries).encode()
+        atomic_write(self.history_file, data)
+        self._save_history_index(len(entries), len(data))
+
+
+class SQLiteBackend(StorageBackend):
+    """
+    SQLite database shared by many monkeys, one per repo
+    
+    History is indexed by (repo, timestamp) so range and tail queries stay fast
+    with thousands of monkeys in one file.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS documents (
+            repo TEXT NOT NULL,
+            name TEXT NOT NULL,
+            data TEXT NOT NULL,
+            PRIMARY KEY (repo, name)
+        );
+        CREATE TABLE IF NOT EXISTS history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            repo TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS history_repo_timestamp ON history (repo, timestamp);
+        CREATE INDEX IF NOT EXISTS history_repo_id ON history (repo, id);
+    """
+    
+    def __init__(self, path: Path, repo_name: str):
+        self.path = Path(path)
+        self.repo_name = repo_name
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.executescript(self.SCHEMA)
+    
+    def name(self) -> str:
+        return f"{self.path} ({self.repo_name})"
+    
+    def read_document(self, name: str) -> Optional[dict]:
+        row = self.conn.execute(
+            "SELECT data FROM documents WHERE repo = ? AND name = ?", (self.repo_name, name)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+    
+    def commit(self, documents: Dict[str, dict], entries: List[dict]):
+        with self.conn:  # One transaction, rolled back on error
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO documents (repo, name, data) VALUES (?, ?, ?)",
+                [(self.repo_name, name, json.dumps(data)) for name, data in documents.items()]
+            )
+            self._insert_history(entries)
+    
+    def _insert_history(self, entries: List[dict]):
+        self.conn.executemany(
+            "INSERT INTO history (repo, timestamp, data) VALUES (?, ?, ?)",
+            [
+                (self.repo_name, entry.get("timestamp", ""), json.dumps(entry, ensure_ascii=False))
+                for entry in entries
+            ]
+        )
+    
+    def iter_history(
+        self,
+        reverse: bool = False,
+        since: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[dict]:
+        query = "SELECT data FROM history WHERE repo = ?"
+        params: list = [self.repo_name]
+        if since:
+            query += " AND timestamp >= ?"
+            params.append(since)
+        query += " ORDER BY id DESC" if reverse else " ORDER BY id"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        
+        for (data,) in self.conn.execute(query, params):
+            yield json.loads(data)
+    
+    def count_history(self) -> int:
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM history WHERE repo = ?", (self.repo_name,)
+        ).fetchone()[0]
+    
+    def replace_history(self, entries: List[dict]):
+        with self.conn:
+            self.conn.execute("DELETE FROM history WHERE repo = ?", (self.repo_name,))
+            self._insert_history(entries)
+
+
+class MemoryBackend(StorageBackend):
+    """Keeps everything in memory (tests and throwaway simulations)"""
+    
+    def __init__(self):
+        self.documents: Dict[str, dict] = {}
+        self.history: List[dict] = []
+    
+    def name(self) -> str:
+        return "memory"
+    
+    def read_document(self, name: str) -> Optional[dict]:
+        # Copies, so callers cannot change stored data by accident
+        return copy.deepcopy(self.documents.get(name))
+    
+    def commit(self, documents: Dict[str, dict], entries: List[dict]):
+        self.documents.update(copy.deepcopy(documents))
+        self.history.extend(copy.deepcopy(entries))
+    
+    def iter_history(
+        self,
+        reverse: bool = False,
+        since: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[dict]:
+        entries = reversed(self.history) if reverse else iter(self.history)
+        if since:
+            entries = (entry for entry in entries if entry.get("timestamp", "") >= since)
+        for entry in itertools.islice(entries, limit):
+            yield copy.deepcopy(entry)
+    
+    def count_history(self) -> int:
+        return len(self.history)
+    
+    def replace_history(self, entries: List[dict]):
+        self.history = copy.deepcopy(entries)
+
+
+def create_backend(
+    kind: Optional[str] = None,
+    repo_name: str = "test/repo",
+    path: Optional[str] = None
+) -> StorageBackend:
+    """
+    Create the storage backend selected by argument or environment
+    
+    Args:
+        kind: "filesystem" (default), "sqlite" or "memory"; defaults to $MONKEY_STORAGE_BACKEND
+        repo_name: Monkey the data belongs to (keys SQLite rows)
+        path: Data directory or database file; defaults to $MONKEY_STORAGE_PATH
+    """
+    kind = kind or os.getenv("MONKEY_STORAGE_BACKEND") or "filesystem"
+    path = path or os.getenv("MONKEY_STORAGE_PATH")
+    
+    if kind == "filesystem":
+        return FileSystemBackend(Path(path or "monkey_data"))
+    elif kind == "sqlite":
+        return SQLiteBackend(Path(path or "monkey_data/monkeys.db"), repo_name)
+    elif kind == "memory":
+        return MemoryBackend()
+    else:
+        raise ValueError(f"Unknown storage backend: {kind}")
+
+
+GITHUB_POOL_SIZE = 10
+REPO_CACHE_TTL = 24 * 60 * 60  # Seconds; fork relationships practically never change
+
+
+@lru_cache(maxsize=None)
+def github_client(token: str) -> Github:
+    """Shared GitHub client per token, so its HTTP connection pool is reused"""
+    return Github(token, pool_size=GITHUB_POOL_SIZE)
+
+
+class RepoMetadataCache:
+    """
+    On-disk cache of repository metadata (fork flag and parent) with a TTL
+    
+    Lives in $MONKEY_CACHE_DIR (default ~/.cache/forkmonkey) so local commands
+    do not ask the GitHub API the same question on every run.
+    """
+    
+    def __init__(self, path: Optional[Path] = None, ttl: float = REPO_CACHE_TTL):
+        cache_dir = os.getenv("MONKEY_CACHE_DIR") or Path.home() / ".cache" / "forkmonkey"
+        self.path = Path(path or Path(cache_dir) / "repos.json")
+        self.ttl = ttl
+    
+    def _load(self) -> dict:
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def get(self, repo_name: str) -> Optional[dict]:
+        """Cached metadata for a repo, or None if missing or expired"""
+        entry = self._load().get(repo_name)
+        if entry is None or time.time() - entry.get("fetched_at", 0) > self.ttl:
+            return None
+        return entry["metadata"]
+    
+    def set(self, repo_name: str, metadata: dict):
+        """Store metadata for a repo (failures only cost a refetch later)"""
+        entries = self._load()
+        entries[repo_name] = {"fetched_at": time.time(), "metadata": metadata}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            atomic_write(self.path, json_bytes(entries))
+        except OSError as e:
+            print(f"⚠️  Could not cache repo metadata: {e}")
 
 
 class MonkeyStorage:
     """Manages monkey data storage"""
     
-    def __init__(self, repo_name: Optional[str] = None, github_token: Optional[str] = None):
+    def __init__(
+        self,
+        repo_name: Optional[str] = None,
+        github_token: Optional[str] = None,
+        backend: Optional[StorageBackend] = None
+    ):
         self.repo_name = repo_name or os.getenv("GITHUB_REPOSITORY") or "test/repo"
         self.github_token = github_token or os.getenv("GITHUB_TOKEN")
         
-        self.data_dir = Path("monkey_data")
-        self.data_dir.mkdir(exist_ok=True)
+        self.backend = backend or create_backend(repo_name=self.repo_name)
+        
+        # Open session state (see session()): cached documents, dirty document
+        # names and history entries waiting to be appended
+        self._session: Optional[dict] = None
         
-        # Initialize GitHub client if token available
-        self.github = None
-        self.repo = None
-        if self.github_token:
+        # GitHub client and repo handle are created on first use (see github, repo)
+        self._github: Optional[Github] = None
+        self._repo = None
+        self._repo_fetched = False
+        self.repo_cache = RepoMetadataCache()
+    
+    @property
+    def github(self) -> Optional[Github]:
+        """Shared GitHub client, or None without a token"""
+        if self._github is None and self.github_token:
+            self._github = github_client(self.github_token)
+        return self._github
+    
+    @property
+    def repo(self):
+        """GitHub handle of this repository, fetched once on first use"""
+        if not self._repo_fetched and self.github is not None:
+            self._repo_fetched = True
             try:
-                self.github = Github(self.github_token)
-                self.repo = self.github.get_repo(self.repo_name)
+                self._repo = self.github.get_repo(self.repo_name)
             except Exception as e:
                 print(f"⚠️  GitHub API not available: {e}")
+        return self._repo
     
+    def repo_metadata(self) -> Optional[dict]:
+        """
+        Fork flag and parent of this repository
+        
+        Served from the on-disk cache while fresh; otherwise fetched from the
+        GitHub API and cached. None when the API is not available.
+        """
+        metadata = self.repo_cache.get(self.repo_name)
+        if metadata is not None:
+            return metadata
+        
+        if not self.repo:
+            return None
+        
+        parent = self.repo.parent if self.repo.fork else None
+        metadata = {
+            "fork": self.repo.fork,
+            "parent": parent.full_name if parent else None
+        }
+        self.repo_cache.set(self.repo_name, metadata)
+        return metadata
+
     def save_dna_to_secrets(self, dna: MonkeyDNA) -> bool:
         """
         Save DNA to GitHub Secrets (private, only owner can see)
@@ -63,38 +601,82 @@ class MonkeyStorage:
             print(f"⚠️  Failed to save to secrets: {e}")
             return self.save_dna_locally(dna)
     
+    @contextmanager
+    def session(self):
+        """
+        Read each document at most once and write each changed document once
+        
+        Inside the block, loads are served from memory and saves only update the
+        in-memory copies. Changed documents and new history entries are committed
+        together when the block exits normally and dropped if it raises.
+        """
+        if self._session is not None:
+            yield self  # Already inside a session
+            return
+        
+        self._session = {"documents": {}, "dirty": set(), "history": []}
+        try:
+            yield self
+        except BaseException:
+            if self._session["dirty"] or self._session["history"]:
+                print("⚠️  Discarding unsaved monkey data changes")
+            raise
+        else:
+            session = self._session
+            self._session = None
+            if session["dirty"] or session["history"]:
+                self.backend.commit(
+                    {name: session["documents"][name] for name in session["dirty"]},
+                    session["history"]
+                )
+        finally:
+            self._session = None
+    
+    def _read_json(self, name: str) -> Optional[dict]:
+        """Load a document (None if missing), cached for the session"""
+        if self._session is not None and name in self._session["documents"]:
+            return self._session["documents"][name]
+        
+        data = self.backend.read_document(name)
+        
+        if self._session is not None:
+            self._session["documents"][name] = data
+        return data
+    
+    def _commit(self, documents: Dict[str, dict], entries: List[dict]):
+        """Save documents and history entries now, or at the end of the open session"""
+        if self._session is not None:
+            self._session["documents"].update(documents)
+            self._session["dirty"].update(documents)
+            self._session["history"].extend(entries)
+        else:
+            self.backend.commit(documents, entries)
+    
     def save_dna_locally(self, dna: MonkeyDNA) -> bool:
-        """Save DNA to local file"""
+        """Save DNA to local storage"""
         try:
-            dna_dict = GeneticsEngine.dna_to_dict(dna)
+            self._commit({"dna": GeneticsEngine.dna_to_dict(dna)}, [])
             
-            dna_file = self.data_dir / "dna.json"
-            with open(dna_file, "w") as f:
-                json.dump(dna_dict, f, indent=2)
-            
-            print(f"✅ DNA saved to {dna_file}")
+            print(f"✅ DNA saved to {self.backend.name()}")
             return True
-            
+        
         except Exception as e:
             print(f"❌ Failed to save DNA: {e}")
             return False
     
     def load_dna(self) -> Optional[MonkeyDNA]:
-        """Load DNA from local file"""
+        """Load DNA from local storage"""
         try:
-            dna_file = self.data_dir / "dna.json"
+            dna_dict = self._read_json("dna")
             
-            if not dna_file.exists():
+            if dna_dict is None:
                 print("ℹ️  No DNA file found")
                 return None
             
-            with open(dna_file, "r") as f:
-                dna_dict = json.load(f)
-            
             dna = GeneticsEngine.dict_to_dna(dna_dict)
-            print(f"✅ DNA loaded from {dna_file}")
+            print(f"✅ DNA loaded from {self.backend.name()}")
             return dna
-            
+        
         except Exception as e:
             print(f"❌ Failed to load DNA: {e}")
             return None
@@ -108,105 +690,172 @@ class MonkeyStorage:
             svg_filename: Optional filename of the SVG snapshot (e.g., "2025-11-20_17-32_monkey.svg")
         """
         try:
-            history_file = self.data_dir / "history.json"
-            
-            # Load existing history
-            if history_file.exists():
-                with open(history_file, "r") as f:
-                    history = json.load(f)
-            else:
-                history = {"entries": []}
-            
-            # Add new entry
-            entry = {
-                "timestamp": datetime.now().isoformat(),
-                "dna_hash": dna.dna_hash,
-                "generation": dna.generation,
-                "mutation_count": dna.mutation_count,
-                "rarity_score": dna.get_rarity_score(),
-                "traits": {
-                    cat.value: trait.value
-                    for cat, trait in dna.traits.items()
-                },
-                "story": story
-            }
-            
-            # Add SVG filename if provided
-            if svg_filename:
-                entry["svg_filename"] = svg_filename
-            
-            history["entries"].append(entry)
-            
-            # Save
-            with open(history_file, "w") as f:
-                json.dump(history, f, indent=2)
+            self._commit({}, [self._history_entry(dna, story, svg_filename, dna.get_rarity_score())])
             
             print(f"✅ History entry saved")
             return True
-            
+        
         except Exception as e:
             print(f"❌ Failed to save history: {e}")
             return False
     
+    def _history_entry(self, dna: MonkeyDNA, story: str, svg_filename: Optional[str], rarity_score: float) -> dict:
+        """Build a history entry"""
+        entry = {
+            "timestamp": datetime.now().isoformat(),
+            "dna_hash": dna.dna_hash,
+            "generation": dna.generation,
+            "mutation_count": dna.mutation_count,
+            "rarity_score": rarity_score,
+            "traits": {
+                cat.value: trait.value
+                for cat, trait in dna.traits.items()
+            },
+            "story": story
+        }
+        
+        # Add SVG filename if provided
+        if svg_filename:
+            entry["svg_filename"] = svg_filename
+        return entry
+    
     def get_history(self) -> List[dict]:
         """Get evolution history"""
         try:
-            history_file = self.data_dir / "history.json"
-            
-            if not history_file.exists():
-                return []
-            
-            with open(history_file, "r") as f:
-                history = json.load(f)
-            
-            return history.get("entries", [])
-            
+            return list(self.iter_history())
+        
+        except Exception as e:
+            print(f"❌ Failed to load history: {e}")
+            return []
+    
+    def iter_history(
+        self,
+        reverse: bool = False,
+        since: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[dict]:
+        """
+        Stream history entries without loading the whole history
+        
+        Args:
+            reverse: Newest first (the file backend reads history.jsonl backwards)
+            since: Only entries with a timestamp at or after this ISO timestamp
+            limit: Stop after this many entries
+        """
+        pending = self._session["history"] if self._session is not None else []
+        pending = [entry for entry in pending if not since or entry.get("timestamp", "") >= since]
+        
+        if reverse:
+            stored_limit = None if limit is None else max(0, limit - len(pending))
+            entries = itertools.chain(reversed(pending), self.backend.iter_history(True, since, stored_limit))
+        else:
+            entries = itertools.chain(self.backend.iter_history(False, since, limit), pending)
+        
+        return itertools.islice(entries, limit)
+    
+    def tail_history(self, n: int) -> List[dict]:
+        """Get the last n history entries, oldest first"""
+        try:
+            return list(self.iter_history(reverse=True, limit=n))[::-1]
         except Exception as e:
             print(f"❌ Failed to load history: {e}")
             return []
     
+    def count_history(self) -> int:
+        """Number of history entries, without reading them"""
+        try:
+            if self._session is None:
+                return self.backend.count_history()
+            
+            if "history_count" not in self._session:
+                self._session["history_count"] = self.backend.count_history()
+            return self._session["history_count"] + len(self._session["history"])
+        except Exception as e:
+            print(f"❌ Failed to count history: {e}")
+            return 0
+    
+    def replace_history(self, entries: List[dict]):
+        """Rewrite the whole history (migrations and maintenance scripts only)"""
+        self.backend.replace_history(entries)
+    
     def save_stats(self, dna: MonkeyDNA, age_days: int = 0) -> bool:
         """Save monkey statistics"""
         try:
-            # Load existing stats to track streak
-            stats_file = self.data_dir / "stats.json"
-            streak = self._calculate_streak(stats_file)
-            
-            stats = {
-                "dna_hash": dna.dna_hash,
-                "generation": dna.generation,
-                "age_days": age_days,
-                "mutation_count": dna.mutation_count,
-                "rarity_score": dna.get_rarity_score(),
-                "parent_id": dna.parent_id,
-                "traits": {
-                    cat.value: {
-                        "value": trait.value,
-                        "rarity": trait.rarity.value
-                    }
-                    for cat, trait in dna.traits.items()
-                },
-                "streak": streak,
-                "last_updated": datetime.now().isoformat()
-            }
-            
-            with open(stats_file, "w") as f:
-                json.dump(stats, f, indent=2)
+            self._commit({"stats": self._build_stats(dna, age_days, dna.get_rarity_score())}, [])
             
             print(f"✅ Stats saved")
             return True
-            
+        
         except Exception as e:
             print(f"❌ Failed to save stats: {e}")
             return False
     
-    def _calculate_streak(self, stats_file: Path) -> dict:
+    def _build_stats(self, dna: MonkeyDNA, age_days: int, rarity_score: float) -> dict:
+        """Build stats.json contents, carrying the streak forward"""
+        # Load existing stats to track streak
+        streak = self._calculate_streak()
+        
+        return {
+            "dna_hash": dna.dna_hash,
+            "generation": dna.generation,
+            "age_days": age_days,
+            "mutation_count": dna.mutation_count,
+            "rarity_score": rarity_score,
+            "parent_id": dna.parent_id,
+            "traits": {
+                cat.value: {
+                    "value": trait.value,
+                    "rarity": trait.rarity.value
+                }
+                for cat, trait in dna.traits.items()
+            },
+            "streak": streak,
+            "visualizer_version": MonkeyVisualizer.VERSION,
+            "last_updated": datetime.now().isoformat()
+        }
+    
+    def commit_evolution(
+        self,
+        dna: MonkeyDNA,
+        story: str = "",
+        svg_filename: Optional[str] = None,
+        age_days: int = 0
+    ) -> bool:
+        """
+        Save DNA, stats and a history entry for one birth or evolution step
+        
+        The three are committed together by the backend, or at the end of the
+        session when one is open.
+        
+        Args:
+            dna: The monkey DNA after this step
+            story: Narrative description of what happened
+            svg_filename: Optional filename of the SVG snapshot
+            age_days: Age recorded in stats.json
+        """
+        try:
+            rarity_score = dna.get_rarity_score()
+            self._commit(
+                {
+                    "dna": GeneticsEngine.dna_to_dict(dna),
+                    "stats": self._build_stats(dna, age_days, rarity_score)
+                },
+                [self._history_entry(dna, story, svg_filename, rarity_score)]
+            )
+            
+            print(f"✅ DNA, stats and history saved")
+            return True
+        
+        except Exception as e:
+            print(f"❌ Failed to save evolution: {e}")
+            return False
+
+    def _calculate_streak(self) -> dict:
         """Calculate evolution streak from history"""
         try:
             # Load existing stats
-            if stats_file.exists():
-                with open(stats_file, "r") as f:
-                    old_stats = json.load(f)
+            old_stats = self._read_json("stats")
+            if old_stats is not None:
                 old_streak = old_stats.get("streak", {"current": 0, "best": 0, "last_date": None})
             else:
                 old_streak = {"current": 0, "best": 0, "last_date": None}
@@ -240,10 +889,8 @@ class MonkeyStorage:
     def get_streak(self) -> dict:
         """Get current streak information"""
         try:
-            stats_file = self.data_dir / "stats.json"
-            if stats_file.exists():
-                with open(stats_file, "r") as f:
-                    stats = json.load(f)
+            stats = self._read_json("stats")
+            if stats is not None:
                 return stats.get("streak", {"current": 0, "best": 0, "last_date": None})
         except Exception:
             pass
@@ -255,43 +902,41 @@ class MonkeyStorage:
         
         Returns parent repo name if fork, None otherwise
         """
-        if not self.repo:
-            return None
-        
         try:
-            if self.repo.fork:
-                parent = self.repo.parent
-                return parent.full_name
+            metadata = self.repo_metadata()
+            if metadata and metadata["fork"]:
+                return metadata["parent"]
             return None
             
         except Exception as e:
             print(f"⚠️  Failed to detect fork: {e}")
             return None
     
-    def get_parent_dna(self, parent_repo: str) -> Optional[MonkeyDNA]:
+    @property
+    def api(self) -> GitHubAPI:
+        """Shared REST/GraphQL fetch layer"""
+        return github_api(self.github_token)
+    
+    def fetch_parent(self) -> Optional[dict]:
         """
-        Fetch parent monkey's DNA from parent repository
+        Fork parent of this repo with its DNA and stats
         
-        Args:
-            parent_repo: Full repo name (owner/repo)
+        A single GraphQL request (see GitHubAPI.fetch_parent). Also refreshes
+        the cached repo metadata used by detect_fork.
+        
+        Returns None without a token or if GitHub could not be reached
         """
-        if not self.github:
-            print("⚠️  GitHub API not available")
+        if not self.github_token:
             return None
         
         try:
-            parent = self.github.get_repo(parent_repo)
-            
-            # Try to get DNA file from parent
-            content = parent.get_contents("monkey_data/dna.json")
-            dna_json = content.decoded_content.decode()
-            dna_dict = json.loads(dna_json)
-            
-            return GeneticsEngine.dict_to_dna(dna_dict)
-            
-        except GithubException as e:
-            print(f"⚠️  Failed to fetch parent DNA: {e}")
+            parent = self.api.fetch_parent(self.repo_name)
+        except (GitHubAPIError, requests.RequestException) as e:
+            print(f"⚠️  Failed to fetch parent: {e}")
             return None
+        
+        self.repo_cache.set(self.repo_name, {"fork": parent["fork"], "parent": parent["parent"]})
+        return parent
     
     def initialize_from_parent(self) -> Optional[MonkeyDNA]:
         """
@@ -299,15 +944,19 @@ class MonkeyStorage:
         
         Returns child DNA if successful, None otherwise
         """
-        parent_repo = self.detect_fork()
+        parent = self.fetch_parent()
         
-        if not parent_repo:
+        if not parent or not parent["fork"] or not parent["parent"]:
             print("ℹ️  Not a fork, generating new monkey")
             return None
         
-        print(f"🍴 Fork detected! Parent: {parent_repo}")
+        print(f"🍴 Fork detected! Parent: {parent['parent']}")
         
-        parent_dna = self.get_parent_dna(parent_repo)
+        try:
+            parent_dna = GeneticsEngine.dict_to_dna(parent["dna"]) if parent["dna"] else None
+        except Exception as e:
+            print(f"⚠️  Invalid parent DNA: {e}")
+            parent_dna = None
         
         if not parent_dna:
             print("⚠️  Could not fetch parent DNA, generating new monkey")
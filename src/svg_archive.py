@@ -0,0 +1,339 @@
+"""
+ForkMonkey SVG Archive
+
+Content-addressed archive of evolution snapshots in monkey_evolution/:
+each distinct SVG is stored once as objects/<hash>.svg, and manifest.json maps
+snapshot filenames (the svg_filename of history entries) to content hashes.
+Re-archiving an unchanged monkey costs a manifest line instead of a new file.
+
+Objects can optionally be packed into objects.pack: every SVG compressed
+against a shared template SVG (zlib preset dictionary, or zstd when the
+zstandard package is installed), readable one object at a time.
+"""
+
+import json
+import bisect
+import hashlib
+import struct
+import zlib
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple, Union
+
+from src.storage import atomic_write, json_bytes
+
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
+
+MANIFEST_VERSION = 1
+
+PACK_MAGIC = b"FMPK"
+PACK_VERSION = 1
+# magic, version, codec, template length, index length
+PACK_HEADER = struct.Struct("<4sBBII")
+CODECS = {"zlib": 0, "zstd": 1}
+
+
+def snapshot_filename(timestamp: Optional[datetime] = None) -> str:
+    """Snapshot name for a moment in time (UTC, minute resolution)"""
+    timestamp = timestamp or datetime.now(timezone.utc)
+    return f"{timestamp.strftime('%Y-%m-%d_%H-%M')}_monkey.svg"
+
+
+def content_hash(svg: str) -> str:
+    """Hash identifying an SVG's content"""
+    return hashlib.sha256(svg.encode()).hexdigest()[:16]
+
+
+class SVGPack:
+    """
+    Compressed pack of SVG objects with random access by hash
+
+    Layout: header, zlib-compressed template SVG, JSON index
+    {hash: [offset, length]}, then the compressed objects. Each object is
+    compressed on its own with the template as dictionary, so only the
+    trait-dependent fragments cost real bytes.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._index: Optional[Dict[str, list]] = None
+        self._codec = 0
+        self._template = b""
+        self._data_offset = 0
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def _load(self):
+        if self._index is not None:
+            return
+        if not self.path.exists():
+            self._index = {}
+            return
+
+        with open(self.path, "rb") as f:
+            magic, version, codec, template_length, index_length = PACK_HEADER.unpack(
+                f.read(PACK_HEADER.size)
+            )
+            if magic != PACK_MAGIC or version != PACK_VERSION:
+                raise ValueError(f"Not a version {PACK_VERSION} SVG pack: {self.path}")
+            self._codec = codec
+            self._template = zlib.decompress(f.read(template_length))
+            self._index = json.loads(f.read(index_length))
+        self._data_offset = PACK_HEADER.size + template_length + index_length
+
+    def __contains__(self, svg_hash: str) -> bool:
+        self._load()
+        return svg_hash in self._index
+
+    def hashes(self) -> list:
+        self._load()
+        return list(self._index)
+
+    def get(self, svg_hash: str) -> Optional[str]:
+        """Decompress one object, reading only its bytes"""
+        self._load()
+        if svg_hash not in self._index:
+            return None
+
+        offset, length = self._index[svg_hash]
+        with open(self.path, "rb") as f:
+            f.seek(self._data_offset + offset)
+            compressed = f.read(length)
+        return self._decompress(compressed).decode()
+
+    def _decompress(self, data: bytes) -> bytes:
+        if self._codec == CODECS["zstd"]:
+            if not HAS_ZSTD:
+                raise RuntimeError("This SVG pack uses zstd: pip install zstandard")
+            dictionary = zstandard.ZstdCompressionDict(self._template)
+            return zstandard.ZstdDecompressor(dict_data=dictionary).decompress(data)
+        decompressor = zlib.decompressobj(zdict=self._template)
+        return decompressor.decompress(data) + decompressor.flush()
+
+    @staticmethod
+    def write(path: Path, objects: Dict[str, str], template: str, codec: str = "zlib"):
+        """
+        Write a pack of objects
+
+        Args:
+            path: Pack file to (atomically) replace
+            objects: Content hash -> SVG
+            template: SVG used as compression dictionary for every object
+            codec: "zlib" or "zstd" (needs the zstandard package)
+        """
+        if codec not in CODECS:
+            raise ValueError(f"Unknown codec: {codec}")
+        if codec == "zstd" and not HAS_ZSTD:
+            raise RuntimeError("zstd packing needs the zstandard package: pip install zstandard")
+
+        template_bytes = template.encode()
+        if codec == "zstd":
+            dictionary = zstandard.ZstdCompressionDict(template_bytes)
+            compressor = zstandard.ZstdCompressor(level=19, dict_data=dictionary)
+            compress = compressor.compress
+        else:
+            def compress(data: bytes) -> bytes:
+                compressor = zlib.compressobj(9, zdict=template_bytes)
+                return compressor.compress(data) + compressor.flush()
+
+        index = {}
+        blobs = []
+        offset = 0
+        for svg_hash in sorted(objects):
+            blob = compress(objects[svg_hash].encode())
+            index[svg_hash] = [offset, len(blob)]
+            blobs.append(blob)
+            offset += len(blob)
+
+        packed_template = zlib.compress(template_bytes, 9)
+        index_bytes = json.dumps(index, separators=(",", ":")).encode()
+        header = PACK_HEADER.pack(PACK_MAGIC, PACK_VERSION, CODECS[codec], len(packed_template), len(index_bytes))
+        atomic_write(path, b"".join([header, packed_template, index_bytes, *blobs]))
+
+
+class SVGArchive:
+    """Deduplicating store of monkey SVG snapshots"""
+
+    def __init__(self, root: Path = Path("monkey_evolution")):
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.manifest_file = self.root / "manifest.json"
+        self.pack = SVGPack(self.root / "objects.pack")
+        self._manifest: Optional[Dict[str, str]] = None
+
+    def object_path(self, svg_hash: str) -> Path:
+        return self.objects_dir / f"{svg_hash}.svg"
+
+    def manifest(self) -> Dict[str, str]:
+        """Snapshot filename -> content hash, in snapshot order"""
+        if self._manifest is None:
+            if self.manifest_file.exists():
+                with open(self.manifest_file) as f:
+                    self._manifest = json.load(f)["snapshots"]
+            else:
+                self._manifest = {}
+        return self._manifest
+
+    def _save_manifest(self):
+        snapshots = dict(sorted(self.manifest().items()))
+        self._manifest = snapshots
+        atomic_write(self.manifest_file, json_bytes({"version": MANIFEST_VERSION, "snapshots": snapshots}))
+
+    def _store_object(self, svg: str) -> str:
+        """Write the SVG object unless an identical one is already stored"""
+        svg_hash = content_hash(svg)
+        path = self.object_path(svg_hash)
+        if not path.exists() and svg_hash not in self.pack:
+            self.objects_dir.mkdir(parents=True, exist_ok=True)
+            atomic_write(path, svg.encode())
+        return svg_hash
+
+    def _read_object(self, svg_hash: str) -> Optional[str]:
+        path = self.object_path(svg_hash)
+        if path.exists():
+            return path.read_text()
+        return self.pack.get(svg_hash)
+
+    def add(self, svg: str, filename: Optional[str] = None) -> str:
+        """
+        Archive an SVG snapshot
+
+        Args:
+            svg: SVG content
+            filename: Snapshot name; defaults to the current UTC minute
+
+        Returns:
+            The snapshot filename, to record as a history entry's svg_filename
+        """
+        filename = filename or snapshot_filename()
+        self.manifest()[filename] = self._store_object(svg)
+        self._save_manifest()
+        return filename
+
+    def __contains__(self, filename: str) -> bool:
+        return filename in self.manifest() or (self.root / filename).exists()
+
+    def path(self, filename: str) -> Optional[Path]:
+        """File holding a snapshot's SVG, or None if it is packed or missing"""
+        svg_hash = self.manifest().get(filename)
+        path = self.object_path(svg_hash) if svg_hash is not None else self.root / filename
+        return path if path.exists() else None
+
+    def read(self, filename: str) -> Optional[str]:
+        """SVG content of a snapshot (loose, packed or legacy), or None if it is not archived"""
+        svg_hash = self.manifest().get(filename)
+        if svg_hash is not None:
+            return self._read_object(svg_hash)
+        legacy = self.root / filename
+        return legacy.read_text() if legacy.exists() else None
+
+    def read_at(self, timestamp: Union[datetime, str]) -> Optional[str]:
+        """
+        SVG of the monkey as it was at a moment in time
+
+        Args:
+            timestamp: datetime or ISO timestamp (naive values are taken as UTC)
+
+        Returns:
+            The latest snapshot at or before the timestamp, or None if there is none
+        """
+        if isinstance(timestamp, str):
+            timestamp = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+        if timestamp.tzinfo is not None:
+            timestamp = timestamp.astimezone(timezone.utc)
+
+        filenames = [filename for filename, _ in self.snapshots()]
+        position = bisect.bisect_right(filenames, snapshot_filename(timestamp))
+        return self.read(filenames[position - 1]) if position else None
+
+    def snapshots(self) -> Iterator[Tuple[str, Optional[str]]]:
+        """(filename, content hash) of every snapshot, oldest first; legacy flat files have no hash"""
+        entries = dict(self.manifest())
+        for legacy in self.root.glob("*_monkey*.svg"):
+            entries.setdefault(legacy.name, None)
+        for filename in sorted(entries):
+            yield filename, entries[filename]
+
+    def migrate(self) -> int:
+        """
+        Move flat <timestamp>_monkey.svg files into the content-addressed store
+
+        Run once per command by evolve and pack; until then the flat files
+        stay readable where they are.
+
+        Returns:
+            Number of snapshots migrated
+        """
+        legacy_files = sorted(self.root.glob("*_monkey*.svg"))
+        if not legacy_files:
+            return 0
+
+        for legacy in legacy_files:
+            self.manifest()[legacy.name] = self._store_object(legacy.read_text())
+        self._save_manifest()
+
+        for legacy in legacy_files:
+            legacy.unlink()
+
+        print(f"📦 Moved {len(legacy_files)} SVG snapshots into {self.objects_dir}")
+        return len(legacy_files)
+
+    def pack_objects(self, codec: str = "zlib") -> Tuple[int, int, int]:
+        """
+        Compress every object (loose and already packed) into objects.pack
+
+        The template is the SVG shared by the most snapshots, which is also the
+        one closest to the typical render.
+
+        Returns:
+            (objects packed, bytes before, pack size in bytes)
+        """
+        self.migrate()
+        objects = {svg_hash: self.pack.get(svg_hash) for svg_hash in self.pack.hashes()}
+        loose_files = sorted(self.objects_dir.glob("*.svg")) if self.objects_dir.exists() else []
+        for path in loose_files:
+            objects[path.stem] = path.read_text()
+        if not objects:
+            return 0, 0, 0
+
+        usage = Counter(svg_hash for svg_hash in self.manifest().values() if svg_hash in objects)
+        template_hash = usage.most_common(1)[0][0] if usage else min(objects)
+
+        SVGPack.write(self.pack.path, objects, objects[template_hash], codec)
+        self.pack = SVGPack(self.pack.path)
+
+        for path in loose_files:
+            path.unlink()
+        if self.objects_dir.exists() and not any(self.objects_dir.iterdir()):
+            self.objects_dir.rmdir()
+
+        raw_size = sum(len(svg.encode()) for svg in objects.values())
+        return len(objects), raw_size, self.pack.path.stat().st_size
+
+    def unpack_objects(self) -> int:
+        """
+        Write every packed object back to objects/ and remove the pack
+
+        Returns:
+            Number of objects unpacked
+        """
+        if not self.pack.exists():
+            return 0
+
+        hashes = self.pack.hashes()
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        for svg_hash in hashes:
+            path = self.object_path(svg_hash)
+            if not path.exists():
+                atomic_write(path, self.pack.get(svg_hash).encode())
+
+        self.pack.path.unlink()
+        self.pack = SVGPack(self.pack.path)
+        return len(hashes)
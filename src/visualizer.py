@@ -13,6 +13,10 @@ from src.genetics import MonkeyDNA, TraitCategory, Rarity
 class MonkeyVisualizer:
     """Generates SVG monkey art from DNA"""
 
+    # Recorded in stats.json; bump whenever the SVG for the same DNA changes, so
+    # the community scanner stops re-rendering forks on an older version locally
+    VERSION = 1
+
     BODY_COLORS = {
         "brown": {"main": "#8B4513", "shadow": "#5D2E0C", "highlight": "#A0522D"},
         "tan": {"main": "#D2B48C", "shadow": "#B8956E", "highlight": "#E8D4B8"},
@@ -0,0 +1,86 @@
+"""
+Tests for the genetics benchmark harness
+"""
+
+import pytest
+from benchmarks.bench_genetics import (
+    baseline_timings,
+    build_benchmarks,
+    find_regressions,
+    load_history,
+    machine_id,
+    main,
+    run_benchmarks,
+    save_run
+)
+
+
+class TestRegressionCheck:
+    """Test comparison against recorded runs"""
+    
+    def test_flags_slowdown_past_threshold(self):
+        """Test only benchmarks slower than the threshold are reported"""
+        history = [{"machine": "m", "results": {"breed[1]": 1.0, "evolve[1]": 1.0}}]
+        results = {"breed[1]": 1.5, "evolve[1]": 1.1}
+        
+        regressions = find_regressions(results, history, "m", threshold=0.25)
+        
+        assert list(regressions) == ["breed[1]"]
+        assert regressions["breed[1]"] == pytest.approx(0.5)
+    
+    def test_baseline_is_median_of_recent_runs(self):
+        """Test other machines are ignored and one outlier does not move the baseline"""
+        history = [
+            {"machine": "m", "results": {"breed[1]": 9.0}},
+            {"machine": "m", "results": {"breed[1]": 1.0}},
+            {"machine": "other", "results": {"breed[1]": 0.1}},
+            {"machine": "m", "results": {"breed[1]": 3.0}},
+            {"machine": "m", "results": {"breed[1]": 1.1}}
+        ]
+        
+        assert baseline_timings(history, "m", runs=3) == {"breed[1]": 1.1}
+        assert find_regressions({"breed[1]": 2.2}, history, "m") == {}
+        assert list(find_regressions({"breed[1]": 3.0}, history, "m")) == ["breed[1]"]
+        assert find_regressions({"breed[1]": 2.2}, [], "m") == {}
+    
+    def test_regressed_run_is_not_recorded(self, tmp_path, monkeypatch):
+        """Test a slow run fails without becoming the baseline, unless accepted"""
+        path = tmp_path / "history.json"
+        machine = machine_id("ci")
+        save_run({"machine": machine, "results": {"calculate_hash[1]": 1e-9}}, path)
+        argv = ["--sizes", "1", "--only", "calculate_hash", "--repeat", "1", "--machine", "ci", "--history", str(path)]
+        
+        assert main(argv) == 1
+        assert main(argv) == 1
+        assert len(load_history(path)) == 1
+        
+        assert main(argv + ["--accept"]) == 0
+        assert len(load_history(path)) == 2
+    
+    def test_history_round_trip(self, tmp_path):
+        """Test runs are appended to the history file"""
+        path = tmp_path / "history.json"
+        save_run({"machine": "m", "results": {"breed[1]": 1.0}}, path)
+        save_run({"machine": "m", "results": {"breed[1]": 2.0}}, path)
+        
+        assert [run["results"]["breed[1]"] for run in load_history(path)] == [1.0, 2.0]
+
+
+class TestBenchmarks:
+    """Test the benchmark callables themselves"""
+    
+    def test_every_benchmark_runs(self):
+        """Test each hot path benchmark runs at a small size"""
+        for func in build_benchmarks(3).values():
+            func()
+    
+    def test_run_benchmarks_keys(self):
+        """Test results are keyed by name and size"""
+        results = run_benchmarks([2], only=["calculate_hash"], repeat=1)
+        
+        assert list(results) == ["calculate_hash[2]"]
+        assert results["calculate_hash[2]"] > 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,201 @@
+"""
+Tests for the SQLite community index
+"""
+
+import json
+import pytest
+from datetime import datetime, timezone
+
+from src.community_index import CommunityIndex
+from src.scan_community import generate_network_stats
+
+
+def make_monkey(full_name, parent=None, degree=1, rarity=10.0, generation=1, traits=None, svg="<svg/>"):
+    """Build a monkey dict the way scan_repo_incremental returns it"""
+    owner, repo = full_name.split("/")
+    return {
+        "owner": owner,
+        "repo": repo,
+        "full_name": full_name,
+        "url": f"https://github.com/{full_name}",
+        "is_root": parent is None,
+        "degree": degree if parent else 0,
+        "degree_label": "root" if parent is None else f"{degree}th degree",
+        "parent": parent,
+        "created_at": "2025-01-01T00:00:00+00:00",
+        "updated_at": datetime.now(timezone.utc).isoformat(),
+        "monkey_stats": {
+            "generation": generation,
+            "rarity_score": rarity,
+            "age_days": 3,
+            "mutation_count": 0,
+            "traits": traits or {"body_color": {"value": "brown", "rarity": "common"}}
+        },
+        "monkey_svg": svg,
+        "monkey_dna": None
+    }
+
+
+@pytest.fixture
+def index(tmp_path):
+    """Community index in a temporary database"""
+    index = CommunityIndex(tmp_path / "community.db")
+    yield index
+    index.close()
+
+
+@pytest.fixture
+def network():
+    """A root, two direct forks and one fork of a fork"""
+    return [
+        make_monkey("root/forkMonkey", rarity=20.0),
+        make_monkey("alice/forkMonkey", "root/forkMonkey", rarity=50.0, generation=2,
+                    traits={"body_color": {"value": "gold", "rarity": "legendary"}}),
+        make_monkey("bob/forkMonkey", "root/forkMonkey", rarity=5.0),
+        make_monkey("carol/forkMonkey", "alice/forkMonkey", degree=2, rarity=30.0, generation=3)
+    ]
+
+
+class TestCommunityIndex:
+    """Test storing and querying scan results"""
+
+    def test_upsert_reports_changes(self, index, network):
+        """Only new or changed monkeys count as changed"""
+        index.begin_scan("root/forkMonkey")
+        assert index.upsert_monkey(network[0]) is True
+        assert index.upsert_monkey(network[0]) is False
+
+        network[0]["monkey_stats"]["rarity_score"] = 21.0
+        assert index.upsert_monkey(network[0]) is True
+
+    def test_monkeys_round_trip(self, index, network):
+        """Stored monkeys come back in scan_repo_incremental shape"""
+        index.begin_scan("root/forkMonkey")
+        for monkey in network:
+            index.upsert_monkey(monkey)
+
+        stored = {monkey["full_name"]: monkey for monkey in index.monkeys()}
+        assert stored == {monkey["full_name"]: monkey for monkey in network}
+
+    def test_monkeys_by_rarity(self, index, network):
+        """Leaderboard order comes from the rarity index"""
+        index.begin_scan("root/forkMonkey")
+        for monkey in network:
+            index.upsert_monkey(monkey)
+
+        names = [monkey["full_name"] for monkey in index.monkeys(by_rarity=True)]
+        assert names == ["alice/forkMonkey", "carol/forkMonkey", "root/forkMonkey", "bob/forkMonkey"]
+
+    def test_remove_monkey(self, index, network):
+        """A repo whose monkey data is gone is no longer stored or reused"""
+        index.begin_scan("root/forkMonkey")
+        for monkey in network:
+            index.upsert_monkey(monkey)
+
+        index.remove_monkey("alice/forkMonkey")
+
+        assert "alice/forkMonkey" not in index.stored_monkeys()
+        assert len(index.monkeys()) == len(network) - 1
+
+    def test_svgs_are_deduplicated(self, index, network):
+        """Identical SVGs are stored once"""
+        index.begin_scan("root/forkMonkey")
+        for monkey in network:
+            index.upsert_monkey(monkey)
+
+        assert index.query("SELECT COUNT(*) AS n FROM svgs") == [{"n": 1}]
+
+    def test_only_current_scan_is_reported(self, index, network):
+        """Repos not seen by the latest scan drop out of the outputs"""
+        index.begin_scan("root/forkMonkey")
+        for monkey in network:
+            index.upsert_monkey(monkey)
+        index.finish_scan()
+
+        index.begin_scan("root/forkMonkey")
+        for monkey in network[:2]:
+            index.upsert_monkey(monkey)
+        index.finish_scan()
+
+        assert len(index.monkeys()) == 2
+        scans = index.query("SELECT repos_seen, monkeys_found FROM scans ORDER BY id")
+        assert scans == [{"repos_seen": 4, "monkeys_found": 4}, {"repos_seen": 2, "monkeys_found": 2}]
+
+    def test_crawl_checkpoint_keeps_earlier_repos(self, index, network):
+        """Repos from the earlier runs of an interrupted crawl stay reported"""
+        checkpoint = {"frontier": [[1, 0.0, "alice/forkMonkey", 0]], "seen": ["alice/forkMonkey"]}
+
+        # A complete crawl, then a new one cut short after two repos
+        index.begin_scan("root/forkMonkey")
+        for monkey in network:
+            index.upsert_monkey(monkey)
+        index.save_crawl_checkpoint(None)
+        index.begin_scan("root/forkMonkey")
+        for monkey in network[:2]:
+            index.upsert_monkey(monkey)
+        index.save_crawl_checkpoint(checkpoint)
+
+        assert len(index.monkeys()) == 4
+        assert index.crawl_checkpoint("root/forkMonkey") == checkpoint
+
+        # The resumed crawl completes: only repos it saw are reported
+        index.begin_scan("root/forkMonkey")
+        index.upsert_monkey(network[3])
+        index.save_crawl_checkpoint(None)
+
+        assert {m["full_name"] for m in index.monkeys()} == {
+            "root/forkMonkey", "alice/forkMonkey", "carol/forkMonkey"
+        }
+        assert index.crawl_checkpoint("root/forkMonkey") is None
+
+    def test_renders_by_visualizer_version(self, index):
+        """Rendered SVGs are kept per DNA hash and visualizer version"""
+        index.save_renders(1, {"abc": "<svg>1</svg>"})
+        index.save_renders(2, {"abc": "<svg>2</svg>"})
+
+        assert index.renders(1) == {"abc": "<svg>1</svg>"}
+        assert index.renders(2) == {"abc": "<svg>2</svg>"}
+        assert index.renders(3) == {}
+
+    def test_family_tree_nodes(self, index, network):
+        """Children are found through the parent edges"""
+        index.begin_scan("root/forkMonkey")
+        for monkey in network:
+            index.upsert_monkey(monkey)
+
+        nodes = {node["id"]: node for node in index.family_tree_nodes()}
+        assert sorted(nodes["root/forkMonkey"]["children"]) == ["alice/forkMonkey", "bob/forkMonkey"]
+        assert nodes["alice/forkMonkey"]["children"] == ["carol/forkMonkey"]
+        assert nodes["carol/forkMonkey"]["degree"] == 2
+
+    def test_network_stats_match_list_generator(self, index, network, tmp_path, monkeypatch):
+        """SQL aggregates agree with the list-based generator"""
+        index.begin_scan("root/forkMonkey")
+        for monkey in network:
+            index.upsert_monkey(monkey)
+
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "web").mkdir()
+        generate_network_stats(network)
+        with open(tmp_path / "web" / "network_stats.json") as f:
+            expected = json.load(f)
+
+        stats = index.network_stats()
+        for key in ("total_monkeys", "active_today", "generations", "avg_rarity",
+                    "max_rarity", "min_rarity", "trait_distribution", "most_common_trait", "rarest_trait"):
+            assert stats[key] == expected[key], key
+
+    def test_query(self, index, network):
+        """Ad-hoc queries return dictionaries"""
+        index.begin_scan("root/forkMonkey")
+        for monkey in network:
+            index.upsert_monkey(monkey)
+
+        rows = index.query(
+            "SELECT full_name FROM monkeys WHERE generation >= ? ORDER BY full_name", (2,)
+        )
+        assert rows == [{"full_name": "alice/forkMonkey"}, {"full_name": "carol/forkMonkey"}]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
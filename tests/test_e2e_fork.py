@@ -251,7 +251,7 @@ class TestForkMonkeyE2E:
         expected_files = [
             "monkey_data/dna.json",
             "monkey_data/stats.json", 
-            "monkey_data/history.json",
+            "monkey_data/history.jsonl",
             "monkey_data/monkey.svg",
         ]
         
@@ -2,9 +2,12 @@
 Tests for genetics system
 """
 
+import hashlib
+import random
+
 import pytest
 from src.genetics import (
-    GeneticsEngine, MonkeyDNA, Trait, TraitCategory, Rarity
+    GeneticsEngine, MonkeyDNA, MonkeyView, Population, Trait, TraitCategory, Rarity
 )
 
 
@@ -160,6 +163,58 @@ class TestTrait:
         )
         
         assert trait1.gene_sequence == trait2.gene_sequence
+    
+    def test_trait_is_immutable(self):
+        """Test traits cannot be modified after creation"""
+        trait = Trait(
+            category=TraitCategory.BODY_COLOR,
+            value="brown",
+            rarity=Rarity.COMMON
+        )
+        
+        with pytest.raises(Exception):
+            trait.value = "tan"
+
+
+class TestTraitFlyweights:
+    """Test interned trait instances"""
+    
+    def test_get_trait_returns_shared_instance(self):
+        """Test the same (category, value, rarity) gives the same object"""
+        trait1 = GeneticsEngine.get_trait(TraitCategory.PATTERN, "stars", Rarity.UNCOMMON)
+        trait2 = GeneticsEngine.get_trait(TraitCategory.PATTERN, "stars", Rarity.UNCOMMON)
+        
+        assert trait1 is trait2
+        assert trait1.gene_sequence == Trait(
+            category=TraitCategory.PATTERN, value="stars", rarity=Rarity.UNCOMMON
+        ).gene_sequence
+    
+    def test_get_trait_outside_table(self):
+        """Test unknown combinations still build a valid trait"""
+        trait = GeneticsEngine.get_trait(TraitCategory.BODY_COLOR, "golden", Rarity.RARE)
+        
+        assert trait.value == "golden"
+        assert trait.rarity == Rarity.RARE
+        assert len(trait.gene_sequence) == 8
+    
+    def test_get_trait_keeps_custom_gene_sequence(self):
+        """Test a non-standard gene sequence is not replaced by the shared trait"""
+        trait = GeneticsEngine.get_trait(
+            TraitCategory.BODY_COLOR, "brown", Rarity.COMMON, gene_sequence="regen_brown"
+        )
+        
+        assert trait.gene_sequence == "regen_brown"
+    
+    def test_breed_and_evolve_reuse_traits(self):
+        """Test offspring and evolved DNA share trait instances"""
+        parent = GeneticsEngine.generate_random_dna()
+        child = GeneticsEngine.breed(parent, mutation_rate=0.0, rng=random.Random(0))
+        evolved = GeneticsEngine.evolve(parent, evolution_strength=0.0)
+        
+        for category in TraitCategory:
+            trait = child.traits[category]
+            assert trait is GeneticsEngine.get_trait(category, trait.value, trait.rarity)
+            assert evolved.traits[category] is parent.traits[category]
 
 
 class TestMonkeyDNA:
@@ -198,6 +253,40 @@ class TestMonkeyDNA:
         
         # Same traits should give same hash
         assert dna1.dna_hash == dna2.dna_hash
+    
+    def test_dna_hash_matches_joined_sha256(self):
+        """Test the cached hash equals sha256 of the sorted, joined trait parts"""
+        dna = GeneticsEngine.generate_random_dna()
+        partial = MonkeyDNA(traits={
+            category: dna.traits[category]
+            for category in (TraitCategory.SPECIAL, TraitCategory.ACCESSORY)
+        })
+        
+        for monkey in (dna, partial, GeneticsEngine.breed(dna)):
+            trait_string = "".join(
+                f"{cat.value}:{trait.gene_sequence}" for cat, trait in sorted(monkey.traits.items())
+            )
+            assert monkey.dna_hash == hashlib.sha256(trait_string.encode()).hexdigest()[:16]
+    
+    def test_unchanged_evolve_keeps_hash(self):
+        """Test an evolve step that changes no traits keeps the DNA hash"""
+        dna = GeneticsEngine.generate_random_dna()
+        evolved = GeneticsEngine.evolve(dna, evolution_strength=0.0)
+        
+        assert evolved.dna_hash == dna.dna_hash
+    
+    def test_from_trusted_matches_validated(self):
+        """Test the trusted fast path builds the same DNA as validation would"""
+        dna = GeneticsEngine.generate_random_dna()
+        kwargs = dict(generation=3, parent_id="abc123", traits=dict(dna.traits), birth_timestamp=42)
+        
+        trusted = MonkeyDNA.from_trusted(**kwargs)
+        validated = MonkeyDNA(**kwargs)
+        
+        assert trusted == validated
+        assert trusted.dna_hash == validated.dna_hash
+        assert trusted.model_dump_json() == validated.model_dump_json()
+        assert trusted.model_copy(update={"generation": 4}).generation == 4
 
 
 class TestGenLockedTraits:
@@ -289,5 +378,251 @@ class TestGenLockedTraits:
         assert len(locked) == 0
 
 
+class TestSeededRandomness:
+    """Test reproducible genetics with explicit random streams"""
+    
+    def test_generate_with_rng(self):
+        """Test generation is reproducible with a seeded rng"""
+        dna1 = GeneticsEngine.generate_random_dna(rng=random.Random(1))
+        dna2 = GeneticsEngine.generate_random_dna(rng=random.Random(1))
+        
+        assert dna1.dna_hash == dna2.dna_hash
+        assert dna1.birth_timestamp == dna2.birth_timestamp
+    
+    def test_breed_with_seed(self):
+        """Test breeding is reproducible by (parent hash, seed)"""
+        parent = GeneticsEngine.generate_random_dna()
+        
+        child1 = GeneticsEngine.breed(parent, seed=7)
+        child2 = GeneticsEngine.breed(parent, seed=7)
+        
+        assert child1.dna_hash == child2.dna_hash
+        assert child1.birth_timestamp == child2.birth_timestamp
+    
+    def test_breed_seeds_diverge(self):
+        """Test different seeds give independent children"""
+        parent = GeneticsEngine.generate_random_dna()
+        
+        hashes = {GeneticsEngine.breed(parent, seed=seed).dna_hash for seed in range(10)}
+        
+        assert len(hashes) > 1
+    
+    def test_evolve_with_rng(self):
+        """Test evolution is reproducible with a seeded rng"""
+        dna = GeneticsEngine.generate_random_dna()
+        
+        evolved1 = GeneticsEngine.evolve(dna, evolution_strength=0.5, rng=random.Random(3))
+        evolved2 = GeneticsEngine.evolve(dna, evolution_strength=0.5, rng=random.Random(3))
+        
+        assert evolved1.dna_hash == evolved2.dna_hash
+        assert evolved1.mutation_count == evolved2.mutation_count
+    
+    def test_derive_rng_is_stable(self):
+        """Test derived streams depend only on (dna_hash, seed)"""
+        stream1 = GeneticsEngine.derive_rng("abc123", 5)
+        stream2 = GeneticsEngine.derive_rng("abc123", 5)
+        
+        assert stream1.random() == stream2.random()
+        assert GeneticsEngine.derive_rng("abc123", 6).random() != GeneticsEngine.derive_rng("abc123", 5).random()
+
+
+class TestBatchGeneration:
+    """Test vectorized batch DNA generation"""
+    
+    def test_batch_size_and_rows(self):
+        """Test batch rows materialize into valid MonkeyDNA"""
+        population = GeneticsEngine.generate_random_dna_batch(50, generation=2)
+        
+        assert isinstance(population, Population)
+        assert len(population) == 50
+        
+        for row in population:
+            dna = row.to_dna()
+            assert isinstance(dna, MonkeyDNA)
+            assert dna.generation == 2
+            assert len(dna.traits) == len(TraitCategory)
+            assert dna.dna_hash != ""
+    
+    def test_negative_index_and_bounds(self):
+        """Test row access supports negative indexes and rejects out-of-range"""
+        population = GeneticsEngine.generate_random_dna_batch(3)
+        
+        assert population[-1].dna_hash == population[2].dna_hash
+        with pytest.raises(IndexError):
+            population[3]
+    
+    def test_seeded_batch_is_reproducible(self):
+        """Test same seed gives the same batch"""
+        batch1 = GeneticsEngine.generate_random_dna_batch(20, rng=random.Random(42))
+        batch2 = GeneticsEngine.generate_random_dna_batch(20, rng=random.Random(42))
+        
+        assert [dna.dna_hash for dna in batch1] == [dna.dna_hash for dna in batch2]
+    
+    def test_batch_rarity_distribution(self):
+        """Test batch rolls match the single-monkey rarity distribution"""
+        population = GeneticsEngine.generate_random_dna_batch(5000, rng=random.Random(7))
+        table = GeneticsEngine.trait_table(TraitCategory.FACE_EXPRESSION)
+        codes = population.trait_codes[TraitCategory.FACE_EXPRESSION]
+        
+        common = sum(1 for code in codes if table[code][1] == Rarity.COMMON)
+        legendary = sum(1 for code in codes if table[code][1] == Rarity.LEGENDARY)
+        
+        assert 55 < common / len(codes) * 100 < 65
+        assert 3 < legendary / len(codes) * 100 < 7
+    
+    def test_batch_respects_gen_locks(self):
+        """Test high-generation batches never roll extinct traits"""
+        population = GeneticsEngine.generate_random_dna_batch(2000, generation=20)
+        
+        for category in GeneticsEngine.GEN_LOCKED_TRAITS:
+            locked = GeneticsEngine.get_gen_locked_traits(category, 1)
+            table = GeneticsEngine.trait_table(category)
+            values = {table[code][0] for code in population.trait_codes[category]}
+            assert not values & set(locked)
+    
+    def test_trait_table_fits_uint8(self):
+        """Test every category's trait codes fit in a byte"""
+        for category in TraitCategory:
+            assert 0 < len(GeneticsEngine.trait_table(category)) < 256
+
+
+class TestPopulation:
+    """Test the array-backed population store"""
+    
+    def test_view_matches_materialized_dna(self):
+        """Test a row view exposes the same data as MonkeyDNA"""
+        population = GeneticsEngine.generate_random_dna_batch(5)
+        view = population[0]
+        dna = view.to_dna()
+        
+        assert isinstance(view, MonkeyView)
+        assert view.dna_hash == dna.dna_hash == dna._calculate_hash()
+        assert view.get_rarity_score() == dna.get_rarity_score()
+        assert GeneticsEngine.dna_to_dict(view) == GeneticsEngine.dna_to_dict(dna)
+    
+    def test_append_round_trip(self):
+        """Test appended DNA reads back unchanged"""
+        population = Population()
+        dna = GeneticsEngine.generate_random_dna()
+        
+        index = population.append(dna)
+        view = population[index]
+        
+        assert len(population) == 1
+        assert view.dna_hash == dna.dna_hash
+        assert view.generation == dna.generation
+        assert view.birth_timestamp == dna.birth_timestamp
+        for category in TraitCategory:
+            assert view.traits[category].value == dna.traits[category].value
+            assert view.traits[category].rarity == dna.traits[category].rarity
+    
+    def test_from_dnas_links_parents(self):
+        """Test lineages keep parent links as row indexes"""
+        parent = GeneticsEngine.generate_random_dna()
+        child = GeneticsEngine.breed(parent)
+        orphan = GeneticsEngine.breed(GeneticsEngine.generate_random_dna())
+        
+        population = Population.from_dnas([parent, child, orphan])
+        
+        assert population.parent_index[1] == 0
+        assert population[1].parent_id == parent.dna_hash
+        assert population.parent_index[2] == -1
+        assert population[2].parent_id == orphan.parent_id
+        assert population[0].parent_id is None
+    
+    def test_append_rejects_unknown_trait(self):
+        """Test traits outside the trait table cannot be stored"""
+        dna = GeneticsEngine.generate_random_dna()
+        dna.traits[TraitCategory.BODY_COLOR] = Trait(
+            category=TraitCategory.BODY_COLOR,
+            value="plaid",
+            rarity=Rarity.COMMON
+        )
+        
+        with pytest.raises(ValueError):
+            Population().append(dna)
+
+
+class TestBinaryCodec:
+    """Test the fixed-width binary DNA codec"""
+    
+    def test_round_trip(self):
+        """Test DNA survives conversion to bytes and back"""
+        parent = GeneticsEngine.generate_random_dna()
+        child = GeneticsEngine.breed(parent)
+        
+        for dna in (parent, child):
+            data = GeneticsEngine.dna_to_bytes(dna)
+            restored = GeneticsEngine.bytes_to_dna(data)
+            
+            assert len(data) == GeneticsEngine.BINARY_RECORD.size
+            assert GeneticsEngine.dna_to_dict(restored) == GeneticsEngine.dna_to_dict(dna)
+        
+        assert GeneticsEngine.bytes_to_dna(GeneticsEngine.dna_to_bytes(child)).parent_id == parent.dna_hash
+    
+    def test_bulk_round_trip(self):
+        """Test many records encode into one buffer and decode in order"""
+        dnas = [GeneticsEngine.generate_random_dna(generation=gen) for gen in range(1, 50)]
+        data = GeneticsEngine.encode_many(dnas)
+        
+        assert len(data) == len(dnas) * GeneticsEngine.BINARY_RECORD.size
+        assert [dna.dna_hash for dna in GeneticsEngine.decode_many(data)] == [dna.dna_hash for dna in dnas]
+    
+    def test_decoded_traits_are_shared(self):
+        """Test decoding reuses the interned trait instances"""
+        dna = GeneticsEngine.bytes_to_dna(GeneticsEngine.dna_to_bytes(GeneticsEngine.generate_random_dna()))
+        
+        for category, trait in dna.traits.items():
+            assert trait is GeneticsEngine.get_trait(category, trait.value, trait.rarity)
+    
+    def test_round_trip_off_pool_rarity(self):
+        """Test a pool value at another rarity (as AI evolution produces) is encoded as is"""
+        dna = GeneticsEngine.generate_random_dna()
+        traits = dict(dna.traits)
+        traits[TraitCategory.BODY_COLOR] = GeneticsEngine.get_trait(TraitCategory.BODY_COLOR, "golden", Rarity.RARE)
+        dna = MonkeyDNA.from_trusted(traits=traits)
+
+        restored = GeneticsEngine.bytes_to_dna(GeneticsEngine.dna_to_bytes(dna))
+
+        assert restored.traits[TraitCategory.BODY_COLOR].value == "golden"
+        assert restored.traits[TraitCategory.BODY_COLOR].rarity == Rarity.RARE
+        assert restored.dna_hash == dna.dna_hash
+
+    def test_rejects_non_standard_traits(self):
+        """Test traits the codec cannot represent raise instead of being altered"""
+        dna = GeneticsEngine.generate_random_dna()
+        traits = dict(dna.traits)
+        traits[TraitCategory.BODY_COLOR] = GeneticsEngine.get_trait(
+            TraitCategory.BODY_COLOR, "brown", Rarity.COMMON, gene_sequence="regen_brown"
+        )
+        
+        with pytest.raises(ValueError):
+            GeneticsEngine.dna_to_bytes(dna.model_copy(update={"traits": traits}))
+        
+        traits[TraitCategory.BODY_COLOR] = Trait(
+            category=TraitCategory.BODY_COLOR, value="plaid", rarity=Rarity.COMMON
+        )
+        with pytest.raises(ValueError):
+            GeneticsEngine.dna_to_bytes(dna.model_copy(update={"traits": traits}))
+    
+    def test_rejects_truncated_data(self):
+        """Test partial records are rejected"""
+        data = GeneticsEngine.encode_many([GeneticsEngine.generate_random_dna()])
+        
+        with pytest.raises(ValueError):
+            GeneticsEngine.decode_many(data[:-1])
+
+    def test_rejects_unknown_codes(self):
+        """Test out-of-table value and rarity codes name the category"""
+        data = bytearray(GeneticsEngine.dna_to_bytes(GeneticsEngine.generate_random_dna()))
+        first_value = GeneticsEngine.BINARY_RECORD.size - 2 * len(TraitCategory)
+
+        for offset in (first_value, first_value + len(TraitCategory)):
+            corrupt = bytearray(data)
+            corrupt[offset] = 255
+            with pytest.raises(ValueError, match=TraitCategory.BODY_COLOR.value):
+                GeneticsEngine.bytes_to_dna(bytes(corrupt))
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,330 @@
+"""
+Tests for the GitHub fetch layer, against a local fake GitHub API server
+"""
+
+import json
+import threading
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+
+from src.genetics import GeneticsEngine
+from src.github_api import GitHubAPI, GitHubAPIError
+from src.scan_community import RenderCache, scan_repos_graphql
+from src.storage import MemoryBackend, MonkeyStorage
+from src.visualizer import MonkeyVisualizer
+
+
+class FakeGitHub(BaseHTTPRequestHandler):
+    """Serves canned REST resources (with ETags) and GraphQL responses"""
+
+    resources = {}  # path -> body (dict for JSON, str for raw contents)
+    graphql_data = None
+    graphql_repos = None  # owner/name -> repository node, answering aliased r<i> fields
+    graphql_errors = None  # Errors returned (with HTTP 200) instead of any data
+    requests = []  # (method, path, headers)
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.requests.append(("GET", self.path, dict(self.headers)))
+        if self.path not in self.resources:
+            return self._send(404, b'{"message": "Not Found"}')
+
+        body = self.resources[self.path]
+        data = body.encode() if isinstance(body, str) else json.dumps(body).encode()
+        etag = f'"{hash(data) & 0xffffffff:x}"'
+        if self.headers.get("If-None-Match") == etag:
+            return self._send(304)
+        self._send(200, data, {"ETag": etag, "Content-Type": "application/json"})
+
+    def do_POST(self):
+        length = int(self.headers["Content-Length"])
+        payload = json.loads(self.rfile.read(length))
+        self.requests.append(("POST", self.path, payload))
+        if self.graphql_errors:
+            return self._send(200, json.dumps({"errors": self.graphql_errors}).encode())
+        if self.graphql_repos is None:
+            return self._send(200, json.dumps({"data": self.graphql_data}).encode())
+
+        variables = payload["variables"]
+        data = {}
+        errors = []
+        for key, owner in variables.items():
+            if key.startswith("o"):
+                full_name = f"{owner}/{variables['n' + key[1:]]}"
+                data[f"r{key[1:]}"] = self.graphql_repos.get(full_name)
+                if full_name not in self.graphql_repos:
+                    errors.append({"type": "NOT_FOUND", "path": [f"r{key[1:]}"]})
+        self._send(200, json.dumps({"data": data, "errors": errors}).encode())
+
+
+@pytest.fixture
+def github_server():
+    """Fake GitHub API on a free local port"""
+    FakeGitHub.resources = {}
+    FakeGitHub.graphql_data = None
+    FakeGitHub.graphql_repos = None
+    FakeGitHub.graphql_errors = None
+    FakeGitHub.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeGitHub)
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def blob(data):
+    return {"oid": f"{hash(json.dumps(data)) & 0xffffffff:x}", "text": json.dumps(data)}
+
+
+def repository_node(full_name, parent="root/monkey", stats=None, svg=None, pushed="2025-03-01T00:00:00Z"):
+    """GraphQL Monkey fragment of a repo"""
+    owner, name = full_name.split("/")
+    return {
+        "nameWithOwner": full_name, "name": name, "url": f"https://github.com/{full_name}",
+        "isFork": parent is not None, "createdAt": "2025-01-01T00:00:00Z",
+        "updatedAt": pushed, "pushedAt": pushed,
+        "owner": {"login": owner}, "parent": {"nameWithOwner": parent} if parent else None,
+        "stats": blob(stats) if stats else None, "dna": None,
+        "svg": {"oid": "5a", "text": svg} if svg else None
+    }
+
+
+class TestGitHubAPI:
+    """Test REST and GraphQL access"""
+
+    def test_conditional_get(self, github_server):
+        """Test a GET with the current ETag is answered with 304 and no body"""
+        FakeGitHub.resources["/repos/a/monkey"] = {"full_name": "a/monkey"}
+        api = GitHubAPI(api_url=github_server)
+
+        status, body, etag = api.get_if_changed("/repos/a/monkey")
+        assert (status, body) == (200, {"full_name": "a/monkey"})
+
+        assert api.get_if_changed("/repos/a/monkey", etag) == (304, None, etag)
+        assert FakeGitHub.requests[1][2]["If-None-Match"] == etag
+
+    def test_missing_resource(self, github_server):
+        """Test a 404 is reported without a body"""
+        api = GitHubAPI(api_url=github_server)
+        assert api.get_if_changed("/repos/a/missing") == (404, None, None)
+
+    def test_graphql_needs_token(self, github_server):
+        """Test GraphQL is refused without a token"""
+        with pytest.raises(GitHubAPIError):
+            GitHubAPI(api_url=github_server).graphql("{ viewer { login } }")
+
+    def test_parent_in_one_graphql_request(self, github_server):
+        """Test the parent's DNA and stats arrive in a single request"""
+        parent_dna = GeneticsEngine.dna_to_dict(GeneticsEngine.generate_random_dna())
+        FakeGitHub.graphql_data = {
+            "repository": {
+                "nameWithOwner": "c/monkey",
+                "isFork": True,
+                "parent": {"nameWithOwner": "b/monkey", "dna": blob(parent_dna), "stats": blob({"generation": 2})}
+            }
+        }
+        api = GitHubAPI(token="token", api_url=github_server)
+
+        parent = api.fetch_parent("c/monkey")
+
+        assert len(FakeGitHub.requests) == 1
+        assert FakeGitHub.requests[0][2]["variables"] == {"owner": "c", "name": "monkey"}
+        assert parent == {
+            "full_name": "c/monkey", "fork": True, "parent": "b/monkey",
+            "dna": parent_dna, "stats": {"generation": 2}
+        }
+
+    def test_not_a_fork(self, github_server):
+        """Test a root repo has no parent"""
+        FakeGitHub.graphql_data = {"repository": {"nameWithOwner": "a/monkey", "isFork": False, "parent": None}}
+        parent = GitHubAPI(token="token", api_url=github_server).fetch_parent("a/monkey")
+
+        assert parent == {"full_name": "a/monkey", "fork": False, "parent": None, "dna": None, "stats": None}
+
+
+class TestBulkFetch:
+    """Test fetching monkey files of many forks with batched GraphQL queries"""
+
+    @pytest.fixture
+    def api(self, github_server):
+        FakeGitHub.graphql_repos = {
+            f"user{i}/monkey": repository_node(f"user{i}/monkey", stats={"rarity_score": i}, svg=f"<svg>{i}</svg>")
+            for i in range(60)
+        }
+        FakeGitHub.graphql_repos["empty/monkey"] = repository_node("empty/monkey")
+        return GitHubAPI(token="token", api_url=github_server)
+
+    def test_batches_with_aliases(self, api):
+        """Test 60 repos take three queries of aliased repository fields"""
+        names = [f"user{i}/monkey" for i in range(60)]
+
+        monkeys = api.fetch_monkeys(names, batch_size=25)
+
+        assert len(FakeGitHub.requests) == 3
+        assert "r24: repository(owner: $o24, name: $n24)" in FakeGitHub.requests[0][2]["query"]
+        assert FakeGitHub.requests[2][2]["variables"]["o0"] == "user50"
+        assert list(monkeys) == names
+        assert monkeys["user7/monkey"]["stats"] == {"rarity_score": 7}
+        assert monkeys["user7/monkey"]["svg"] == "<svg>7</svg>"
+        assert monkeys["user7/monkey"]["parent"] == "root/monkey"
+        assert monkeys["user7/monkey"]["created_at"] == "2025-01-01T00:00:00+00:00"
+        assert set(monkeys["user7/monkey"]["shas"]) == {"monkey_data/stats.json", "monkey_data/monkey.svg"}
+
+    def test_missing_repos(self, api):
+        """Test a repo deleted since it was listed does not fail its batch"""
+        monkeys = api.fetch_monkeys(["user1/monkey", "gone/monkey", "empty/monkey"])
+
+        assert monkeys["gone/monkey"] is None
+        assert monkeys["empty/monkey"]["stats"] is None
+        assert monkeys["user1/monkey"]["stats"] == {"rarity_score": 1}
+
+    def test_scanner_fetches_changed_repos_in_bulk(self, api):
+        """Test the scanner needs one query per batch and skips unchanged repos"""
+        repos = []
+        for name in ["user1/monkey", "user2/monkey", "empty/monkey", "gone/monkey"]:
+            repo = MagicMock()
+            repo.full_name = name
+            repo.pushed_at = datetime(2025, 3, 1, tzinfo=timezone.utc)
+            repos.append((repo, 1))
+        states = {"user2/monkey": {"pushed_at": "2025-02-01T00:00:00+00:00", "files": {}}}
+
+        results = scan_repos_graphql(repos, "root/monkey", api, states, {})
+
+        # Without DNA the SVGs cannot be rendered, so a second query downloads them
+        assert len(FakeGitHub.requests) == 2
+        assert FakeGitHub.requests[1][2]["variables"] == {"o0": "user1", "n0": "monkey", "o1": "user2", "n1": "monkey"}
+        monkey, state, reused = results[0]
+        assert reused is False
+        assert monkey["monkey_stats"]["rarity_score"] == 1
+        assert monkey["degree"] == 1
+        assert state["pushed_at"] == "2025-03-01T00:00:00+00:00"
+        assert results[1][0]["monkey_svg"] == "<svg>2</svg>"
+        assert results[2][0] is None and results[2][1]["files"] == {}
+        assert results[3] == (None, None, False)
+
+        # A second scan with the stored state only asks about the repo it could not read
+        stored = {m["full_name"]: m for m, _, _ in results if m}
+        states = {repo.full_name: state for (repo, _), (_, state, _) in zip(repos, results) if state}
+        again = scan_repos_graphql(repos, "root/monkey", api, states, stored)
+
+        assert FakeGitHub.requests[2][2]["variables"] == {"o0": "gone", "n0": "monkey"}
+        assert [reused for _, _, reused in again] == [True, True, True, False]
+
+    def test_scanner_renders_svgs_from_dna(self, api):
+        """Test SVGs of forks with DNA are rendered instead of downloaded"""
+        dna = GeneticsEngine.generate_random_dna()
+        stats = {"dna_hash": dna.dna_hash, "visualizer_version": MonkeyVisualizer.VERSION}
+        node = repository_node("dna/monkey", stats=stats, svg="<svg>downloaded</svg>")
+        node["dna"] = blob(GeneticsEngine.dna_to_dict(dna))
+        FakeGitHub.graphql_repos["dna/monkey"] = node
+        repo = MagicMock()
+        repo.full_name = "dna/monkey"
+        renders = RenderCache()
+
+        [(monkey, state, _)] = scan_repos_graphql([(repo, 1)], "root/monkey", api, {}, {}, renders=renders)
+
+        assert len(FakeGitHub.requests) == 1
+        assert "svg: object(expression: \"HEAD:monkey_data/monkey.svg\") { ... on Blob { oid } }" in (
+            FakeGitHub.requests[0][2]["query"]
+        )
+        assert monkey["monkey_svg"] == MonkeyVisualizer.generate_svg(dna)
+        assert "monkey_data/monkey.svg" in state["files"]
+        assert renders.hits == 1
+
+    @patch("src.scan_community.time.sleep")
+    def test_scanner_stops_at_graphql_rate_limit(self, mock_sleep, api):
+        """Test a RATE_LIMITED error is retried, then ends the scan without REST requests"""
+        repo = MagicMock()
+        repo.full_name = "user1/monkey"
+        repo.pushed_at = datetime(2025, 3, 1, tzinfo=timezone.utc)
+        [(stored, _, _)] = scan_repos_graphql([(repo, 1)], "root/monkey", api, {}, {})
+        FakeGitHub.requests = []
+        FakeGitHub.graphql_errors = [{"type": "RATE_LIMITED", "message": "API rate limit exceeded"}]
+
+        with pytest.raises(GitHubAPIError) as error:
+            api.fetch_monkeys(["user1/monkey"])
+        assert error.value.rate_limited
+        FakeGitHub.requests = []
+
+        results = scan_repos_graphql([(repo, 1)], "root/monkey", api, {}, {"user1/monkey": stored})
+
+        assert mock_sleep.called
+        assert all(method == "POST" for method, _, _ in FakeGitHub.requests)
+        # The stored monkey is kept and, without a scan state, fetched again next run
+        monkey, state, reused = results[0]
+        assert monkey["monkey_stats"]["rarity_score"] == 1
+        assert state is None and reused is False
+
+
+class TestInitializeFromParent:
+    """Test fork initialization through the fetch layer"""
+
+    @pytest.fixture
+    def storage(self, github_server, tmp_path, monkeypatch):
+        monkeypatch.setenv("MONKEY_CACHE_DIR", str(tmp_path / "cache"))
+        storage = MonkeyStorage(repo_name="c/monkey", github_token="token", backend=MemoryBackend())
+        api = GitHubAPI(token="token", api_url=github_server)
+        monkeypatch.setattr("src.storage.github_api", lambda token: api)
+        return storage
+
+    def test_breeds_child_in_one_round_trip(self, storage):
+        """Test a fork's first monkey is bred from the fetched parent DNA"""
+        parent = GeneticsEngine.generate_random_dna()
+        FakeGitHub.graphql_data = {
+            "repository": {
+                "nameWithOwner": "c/monkey",
+                "isFork": True,
+                "parent": {"nameWithOwner": "b/monkey", "dna": blob(GeneticsEngine.dna_to_dict(parent)),
+                           "stats": None, "parent": None}
+            }
+        }
+
+        child = storage.initialize_from_parent()
+
+        assert child.generation == parent.generation + 1
+        assert child.parent_id == parent.dna_hash
+        assert len(FakeGitHub.requests) == 1
+        # Fork metadata is cached for detect_fork
+        assert storage.detect_fork() == "b/monkey"
+
+    def test_not_a_fork(self, storage):
+        """Test a root repo gets no parent"""
+        FakeGitHub.graphql_data = {"repository": {"nameWithOwner": "c/monkey", "isFork": False, "parent": None}}
+        assert storage.initialize_from_parent() is None
+
+    def test_parent_without_dna(self, storage):
+        """Test a parent that has no monkey yet is reported"""
+        FakeGitHub.graphql_data = {
+            "repository": {
+                "nameWithOwner": "c/monkey",
+                "isFork": True,
+                "parent": {"nameWithOwner": "b/monkey", "dna": None, "stats": None, "parent": None}
+            }
+        }
+        assert storage.initialize_from_parent() is None
+
+    def test_no_token_skips_parent_lookup(self, storage, monkeypatch):
+        """Test a storage without a token makes no requests"""
+        monkeypatch.delenv("GITHUB_TOKEN", raising=False)
+        storage.github_token = None
+
+        assert storage.initialize_from_parent() is None
+        assert FakeGitHub.requests == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,109 @@
+"""
+Tests for exact breeding odds
+"""
+
+import random
+from collections import Counter
+
+import pytest
+from src.genetics import GeneticsEngine, Rarity, TraitCategory
+from src.odds import (
+    RARITY_TRANSITIONS, breeding_odds, chance_of_any, child_distribution,
+    evolve_distribution, fresh_distribution, rarity_vector
+)
+
+
+def _sample(make_dna, runs):
+    """Empirical (value, rarity) frequencies per category"""
+    counts = {category: Counter() for category in TraitCategory}
+    for _ in range(runs):
+        dna = make_dna()
+        for category, trait in dna.traits.items():
+            counts[category][(trait.value, trait.rarity)] += 1
+    return counts
+
+
+def _max_error(counts, distributions, runs):
+    return max(
+        abs(counts[category][key] / runs - distributions[category].get(key, 0.0))
+        for category in TraitCategory
+        for key in set(counts[category]) | set(distributions[category])
+    )
+
+
+class TestDistributions:
+    """Test distribution building blocks"""
+    
+    def test_transition_rows_sum_to_one(self):
+        """Test every rarity transition row is a probability distribution"""
+        for row in RARITY_TRANSITIONS.values():
+            assert sum(row.values()) == pytest.approx(1.0)
+    
+    def test_transition_clamps_at_edges(self):
+        """Test shifts past common or legendary stay in place"""
+        assert RARITY_TRANSITIONS[Rarity.COMMON][Rarity.COMMON] == pytest.approx(0.85)
+        assert RARITY_TRANSITIONS[Rarity.LEGENDARY][Rarity.LEGENDARY] == pytest.approx(0.85)
+        assert RARITY_TRANSITIONS[Rarity.RARE][Rarity.UNCOMMON] == pytest.approx(0.15)
+    
+    def test_fresh_distribution_matches_rarity_weights(self):
+        """Test fresh rolls follow RARITY_WEIGHTS"""
+        vector = rarity_vector(fresh_distribution(TraitCategory.PATTERN))
+        
+        assert vector[Rarity.COMMON] == pytest.approx(0.60)
+        assert vector[Rarity.LEGENDARY] == pytest.approx(0.05)
+
+
+class TestBreedingOdds:
+    """Test exact odds against sampled breeds"""
+    
+    def test_child_distribution_sums_to_one(self, sample_dna):
+        """Test each category's outcomes cover all probability"""
+        for distribution in child_distribution(sample_dna).values():
+            assert sum(distribution.values()) == pytest.approx(1.0)
+    
+    def test_child_distribution_matches_sampling(self):
+        """Test exact child odds agree with Monte Carlo breeding"""
+        rng = random.Random(11)
+        parent = GeneticsEngine.generate_random_dna(generation=1, rng=rng)
+        runs = 20000
+        
+        counts = _sample(lambda: GeneticsEngine.breed(parent, rng=rng), runs)
+        
+        assert _max_error(counts, child_distribution(parent), runs) < 0.015
+    
+    def test_evolve_distribution_matches_sampling(self):
+        """Test exact multi-step evolution odds agree with Monte Carlo evolution"""
+        rng = random.Random(12)
+        dna = GeneticsEngine.generate_random_dna(rng=rng)
+        runs = 5000
+        
+        def evolve_three_days():
+            evolved = dna
+            for _ in range(3):
+                evolved = GeneticsEngine.evolve(evolved, evolution_strength=0.3, rng=rng)
+            return evolved
+        
+        counts = _sample(evolve_three_days, runs)
+        
+        assert _max_error(counts, evolve_distribution(dna, steps=3, evolution_strength=0.3), runs) < 0.03
+    
+    def test_zero_steps_is_identity(self, sample_dna):
+        """Test no evolution leaves every trait unchanged"""
+        distributions = evolve_distribution(sample_dna, steps=0)
+        
+        for category, trait in sample_dna.traits.items():
+            assert distributions[category] == {(trait.value, trait.rarity): 1.0}
+    
+    def test_breeding_odds_summary(self, sample_dna):
+        """Test summary odds are consistent probabilities"""
+        odds = breeding_odds(sample_dna)
+        
+        assert 0 < odds["any_legendary"] <= odds["any_rare_or_better"] < 1
+        assert set(odds["rarity"]) == {category.value for category in TraitCategory}
+        assert odds["any_legendary"] == pytest.approx(
+            chance_of_any(child_distribution(sample_dna), Rarity.LEGENDARY)
+        )
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
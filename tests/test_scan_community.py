@@ -3,20 +3,35 @@ Tests for scan_community - Community Scanner
 Tests nested fork scanning (1st, 2nd, 3rd degree siblings)
 """
 
+import base64
+import json
 import pytest
+import threading
+import time
 from unittest.mock import MagicMock, patch
 from datetime import datetime, timezone
+from github import GithubException, RateLimitExceededException
 
 # Import the functions we're testing
+from src.genetics import GeneticsEngine
+from src.visualizer import MonkeyVisualizer
 from src.scan_community import (
+    CrawlBudget,
+    ForkCrawler,
+    RenderCache,
     collect_repos,
     get_degree_label,
-    scan_repo,
     generate_community_data,
     generate_leaderboard,
     generate_family_tree,
-    generate_network_stats
+    generate_network_stats,
+    rate_limit_delay,
+    scan_repo_incremental,
+    scan_repos_incremental,
+    with_backoff
 )
+from src.community_index import CommunityIndex
+from src.github_api import GitHubAPIError
 
 
 class TestGetDegreeLabel:
@@ -197,35 +212,27 @@ class TestScanRepo:
         owner_mock.login = owner
         repo.owner = owner_mock
         
-        # No monkey data by default
-        repo.get_contents = MagicMock(side_effect=Exception("Not found"))
+        repo.pushed_at = repo.updated_at
         
         return repo
     
     def test_scan_repo_with_degree(self):
-        """Test that scan_repo includes degree in output"""
+        """Test that a scanned monkey includes its degree"""
         repo = self._create_mock_repo("user1/fork1", "user1", "fork1", is_fork=True)
+        api = FakeContentsAPI({"user1/fork1/monkey_data/stats.json": '{"generation": 2, "rarity_score": 50}'})
         
-        # Mock stats.json to make repo valid
-        stats_content = MagicMock()
-        stats_content.decoded_content = b'{"generation": 2, "rarity_score": 50}'
-        repo.get_contents = MagicMock(return_value=stats_content)
-        
-        result = scan_repo(repo, "owner/root", degree=2)
+        result, _, _ = scan_repo_incremental(repo, "owner/root", 2, api)
         
         assert result is not None
         assert result["degree"] == 2
         assert result["degree_label"] == "2nd degree"
     
-    def test_scan_repo_default_degree(self):
-        """Test default degree is 0"""
+    def test_scan_root_repo(self):
+        """Test the root repo is marked as degree 0"""
         repo = self._create_mock_repo("owner/root", "owner", "root")
+        api = FakeContentsAPI({"owner/root/monkey_data/stats.json": '{"generation": 1, "rarity_score": 75}'})
         
-        stats_content = MagicMock()
-        stats_content.decoded_content = b'{"generation": 1, "rarity_score": 75}'
-        repo.get_contents = MagicMock(return_value=stats_content)
-        
-        result = scan_repo(repo, "owner/root")
+        result, _, _ = scan_repo_incremental(repo, "owner/root", 0, api)
         
         assert result is not None
         assert result["degree"] == 0
@@ -236,7 +243,7 @@ class TestScanRepo:
         """Test repo without monkey data returns None"""
         repo = self._create_mock_repo("user1/empty", "user1", "empty")
         
-        result = scan_repo(repo, "owner/root", degree=1)
+        result, _, _ = scan_repo_incremental(repo, "owner/root", 1, FakeContentsAPI({}))
         
         assert result is None
 
@@ -329,5 +336,425 @@ class TestGenerators:
             assert mock_file.write.called or mock_open.called
 
 
+
+class TestConcurrentCrawl:
+    """Test the concurrent crawler and rate-limit backoff"""
+    
+    def _network(self, width=4, depth=2, delay=0.0):
+        """Fork tree where every repo has `width` forks, tracking concurrent page requests"""
+        state = {"active": 0, "peak": 0, "lock": threading.Lock()}
+        
+        def make(full_name, level):
+            repo = MagicMock()
+            repo.full_name = full_name
+            children = [make(f"{full_name}-{i}", level + 1) for i in range(width)] if level < depth else []
+            
+            def get_page(page):
+                with state["lock"]:
+                    state["active"] += 1
+                    state["peak"] = max(state["peak"], state["active"])
+                time.sleep(delay)
+                with state["lock"]:
+                    state["active"] -= 1
+                return children
+            
+            repo.get_forks.return_value.get_page.side_effect = get_page
+            return repo
+        
+        return make("root/repo", 0), state
+    
+    def test_same_result_as_serial_crawl(self):
+        """Test concurrent batches keep BFS order and limits"""
+        root, _ = self._network()
+        serial = [(repo.full_name, degree) for repo, degree in collect_repos(root, max_total=15, workers=1)]
+        root, _ = self._network()
+        concurrent = [(repo.full_name, degree) for repo, degree in collect_repos(root, max_total=15, workers=8)]
+        
+        assert concurrent == serial
+        assert len(serial) == 15
+        assert [degree for _, degree in serial] == sorted(degree for _, degree in serial)
+    
+    def test_fork_pages_fetched_concurrently(self):
+        """Test several fork pages are requested at once, within the limit"""
+        root, state = self._network(width=6, depth=2, delay=0.02)
+        
+        collect_repos(root, max_total=200, workers=4)
+        
+        assert 1 < state["peak"] <= 4
+    
+    def test_scan_repos_keeps_order(self):
+        """Test results line up with the input repos"""
+        repos = []
+        for i in range(10):
+            repo = MagicMock()
+            repo.full_name = f"owner{i}/repo"
+            repos.append((repo, 1))
+        
+        def scan(repo, root, degree, api, state, monkey, renders):
+            return repo.full_name
+        
+        with patch("src.scan_community.scan_repo_incremental", side_effect=scan):
+            results = scan_repos_incremental(repos, "root/repo", None, {}, {}, workers=4)
+        assert results == [repo.full_name for repo, _ in repos]
+    
+    @patch("src.scan_community.time.sleep")
+    def test_backoff_retries_rate_limits(self, mock_sleep):
+        """Test rate-limited calls are retried after the advertised wait"""
+        error = RateLimitExceededException(403, {"message": "API rate limit exceeded"}, {"Retry-After": "7"})
+        func = MagicMock(side_effect=[error, error, "ok"])
+        
+        assert with_backoff(func, "arg") == "ok"
+        assert func.call_count == 3
+        mock_sleep.assert_called_with(7.0)
+    
+    @patch("src.scan_community.time.sleep")
+    def test_backoff_gives_up(self, mock_sleep):
+        """Test the rate limit error is raised after the last retry"""
+        error = GithubException(429, {"message": "secondary rate limit"}, {})
+        func = MagicMock(side_effect=error)
+        
+        with pytest.raises(GithubException):
+            with_backoff(func, retries=2)
+        assert func.call_count == 3
+    
+    @patch("src.scan_community.time.sleep")
+    def test_backoff_ignores_other_errors(self, mock_sleep):
+        """Test a missing file is not retried"""
+        func = MagicMock(side_effect=GithubException(404, {"message": "Not Found"}, {}))
+        
+        with pytest.raises(GithubException):
+            with_backoff(func)
+        assert func.call_count == 1
+        mock_sleep.assert_not_called()
+    
+    def test_rate_limit_delay(self):
+        """Test waits follow the reset header, capped, or back off exponentially"""
+        reset = GithubException(403, {}, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(time.time() + 30)})
+        assert 29 <= rate_limit_delay(reset, 0) <= 32
+        
+        far_reset = GithubException(403, {}, {"X-RateLimit-Reset": str(time.time() + 3600)})
+        assert rate_limit_delay(far_reset, 0) == 300
+        
+        assert rate_limit_delay(GithubException(429, {}, {}), 3) == 8
+    
+    @patch("src.scan_community.time.sleep")
+    def test_backoff_retries_api_client_rate_limits(self, mock_sleep):
+        """Test rate limits from the REST client are retried as well"""
+        error = GitHubAPIError("rate limited", 429, {"Retry-After": "2"})
+        func = MagicMock(side_effect=[error, "ok"])
+        
+        assert with_backoff(func) == "ok"
+        mock_sleep.assert_called_with(2.0)
+
+
+class TestForkCrawler:
+    """Test full pagination, the work budget and resumable crawls"""
+    
+    def _repo(self, full_name, forks=(), pushed_day=1, per_page=10):
+        """Repo whose fork list is served in pages of per_page, counting requests"""
+        repo = MagicMock()
+        repo.full_name = full_name
+        repo.pushed_at = datetime(2025, 1, pushed_day, tzinfo=timezone.utc)
+        forks = list(forks)
+        repo.pages = []
+        
+        def get_page(page):
+            repo.pages.append(page)
+            return forks[page * per_page:(page + 1) * per_page]
+        
+        repo.get_forks.return_value.get_page.side_effect = get_page
+        return repo
+    
+    def _network(self, count=25):
+        forks = [self._repo(f"user{i}/repo", pushed_day=1 + i % 28) for i in range(count)]
+        return self._repo("root/repo", forks), forks
+    
+    def test_reads_every_page(self):
+        """Test fork lists longer than a page are read to the end"""
+        root, forks = self._network(25)
+        
+        repos = ForkCrawler(per_page=10, workers=4).crawl(root)
+        
+        assert len(repos) == 26
+        assert root.pages == [0, 1, 2]
+        assert all(fork.pages == [0] for fork in forks)
+    
+    def test_recently_pushed_forks_expanded_first(self):
+        """Test a budget cut keeps the crawl on the most active forks"""
+        old = self._repo("old/repo", [self._repo("old-child/repo")], pushed_day=1)
+        new = self._repo("new/repo", [self._repo("new-child/repo")], pushed_day=20)
+        root = self._repo("root/repo", [old, new])
+        
+        names = [repo.full_name for repo, _ in ForkCrawler(workers=1, budget=CrawlBudget(max_calls=2)).crawl(root)]
+        
+        assert names == ["root/repo", "old/repo", "new/repo", "new-child/repo"]
+    
+    def test_budget_checkpoint_and_resume(self):
+        """Test an interrupted crawl continues where it stopped"""
+        root, forks = self._network(25)
+        by_name = {repo.full_name: repo for repo in [root, *forks]}
+        
+        first = ForkCrawler(per_page=10, workers=1, budget=CrawlBudget(max_calls=2))
+        found = first.crawl(root)
+        checkpoint = json.loads(json.dumps(first.checkpoint()))
+        
+        assert len(found) == 21
+        assert checkpoint["frontier"][0][2:] == ["root/repo", 2]
+        
+        second = ForkCrawler.resume(checkpoint, by_name.__getitem__, per_page=10, workers=4)
+        rest = second.run()
+        
+        assert sorted(repo.full_name for repo, _ in found + rest) == sorted(by_name)
+        assert root.pages == [0, 1, 2]
+        assert second.checkpoint() is None
+    
+    def test_max_total_requeues_the_page(self):
+        """Test forks cut off by max_total are found on the next run"""
+        root, forks = self._network(5)
+        by_name = {repo.full_name: repo for repo in [root, *forks]}
+        
+        crawler = ForkCrawler(max_total=3)
+        assert len(crawler.crawl(root)) == 3
+        
+        resumed = ForkCrawler.resume(crawler.checkpoint(), by_name.__getitem__)
+        assert [repo.full_name for repo, _ in resumed.run()] == ["user2/repo", "user3/repo", "user4/repo"]
+    
+    @patch("src.scan_community.time.sleep")
+    def test_rate_limit_stops_the_crawl(self, mock_sleep):
+        """Test a page refused by the rate limit is kept for the next run"""
+        root, _ = self._network(5)
+        root.get_forks.return_value.get_page.side_effect = RateLimitExceededException(
+            403, {"message": "API rate limit exceeded"}, {"Retry-After": "1"}
+        )
+        
+        crawler = ForkCrawler()
+        assert len(crawler.crawl(root)) == 1
+        assert crawler.rate_limited
+        assert crawler.checkpoint()["frontier"][0][2:] == ["root/repo", 0]
+    
+    def test_time_budget(self):
+        """Test a spent time budget stops the crawl before any request"""
+        root, _ = self._network(5)
+        budget = CrawlBudget(max_seconds=0)
+        
+        assert len(ForkCrawler(budget=budget).crawl(root)) == 1
+        assert budget.calls == 0
+
+
+class FakeContentsAPI:
+    """Contents API answering conditional requests from a dict of files"""
+    
+    def __init__(self, files):
+        self.files = files  # "owner/repo/path" -> text
+        self.calls = []
+    
+    def get_if_changed(self, path, etag=None, raw=False):
+        self.calls.append((path, etag))
+        file_path = path.replace("/repos/", "", 1).replace("/contents/", "/", 1)
+        if file_path not in self.files:
+            return 404, None, etag
+        text = self.files[file_path]
+        current = f'"{len(text)}-{hash(text) & 0xffff:x}"'
+        if etag == current:
+            return 304, None, etag
+        body = {"content": base64.b64encode(text.encode()).decode(), "sha": current.strip('"')}
+        return 200, body, current
+
+
+class TestIncrementalScan:
+    """Test skipping unchanged repos and conditional file requests"""
+    
+    def _repo(self, full_name="user1/fork1", pushed=datetime(2025, 1, 1, tzinfo=timezone.utc)):
+        repo = MagicMock()
+        repo.full_name = full_name
+        repo.owner.login, repo.name = full_name.split("/")
+        repo.html_url = f"https://github.com/{full_name}"
+        repo.fork = True
+        repo.parent.full_name = "owner/root"
+        repo.created_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        repo.updated_at = pushed
+        repo.pushed_at = pushed
+        return repo
+    
+    def _api(self):
+        return FakeContentsAPI({
+            "user1/fork1/monkey_data/stats.json": json.dumps({"generation": 2, "rarity_score": 40}),
+            "user1/fork1/monkey_data/monkey.svg": "<svg>fork1</svg>"
+        })
+    
+    def test_first_scan_fetches_files(self):
+        """Test a new repo is fetched and its file ETags are recorded"""
+        api = self._api()
+        
+        monkey, state, reused = scan_repo_incremental(self._repo(), "owner/root", 1, api)
+        
+        assert reused is False
+        assert monkey["monkey_stats"]["rarity_score"] == 40
+        assert monkey["monkey_svg"] == "<svg>fork1</svg>"
+        assert monkey["parent"] == "owner/root"
+        assert set(state["files"]) == {"monkey_data/stats.json", "monkey_data/monkey.svg"}
+        assert all(etag is None for _, etag in api.calls)
+    
+    def test_unchanged_repo_is_not_fetched(self):
+        """Test a repo not pushed since the last scan costs no requests"""
+        api = self._api()
+        monkey, state, _ = scan_repo_incremental(self._repo(), "owner/root", 1, api)
+        api.calls.clear()
+        
+        again, again_state, reused = scan_repo_incremental(self._repo(), "owner/root", 1, api, state, monkey)
+        
+        assert reused is True
+        assert api.calls == []
+        assert again_state == state
+        assert again["monkey_svg"] == monkey["monkey_svg"]
+        assert again["monkey_stats"]["age_days"] == monkey["monkey_stats"]["age_days"]
+    
+    def test_pushed_repo_revalidates_with_etags(self):
+        """Test only changed files are downloaded after a push"""
+        api = self._api()
+        monkey, state, _ = scan_repo_incremental(self._repo(), "owner/root", 1, api)
+        api.calls.clear()
+        api.files["user1/fork1/monkey_data/stats.json"] = json.dumps({"generation": 3, "rarity_score": 55})
+        
+        pushed = self._repo(pushed=datetime(2025, 2, 1, tzinfo=timezone.utc))
+        again, again_state, reused = scan_repo_incremental(pushed, "owner/root", 1, api, state, monkey)
+        
+        assert reused is False
+        assert all(etag for path, etag in api.calls if not path.endswith("dna.json"))
+        assert again["monkey_stats"]["rarity_score"] == 55
+        assert again["monkey_svg"] == "<svg>fork1</svg>"  # 304, reused
+        assert again_state["files"]["monkey_data/monkey.svg"] == state["files"]["monkey_data/monkey.svg"]
+        assert again_state["files"]["monkey_data/stats.json"] != state["files"]["monkey_data/stats.json"]
+    
+    def test_repo_without_monkey_is_remembered(self):
+        """Test an empty repo is skipped until it is pushed again"""
+        api = FakeContentsAPI({})
+        monkey, state, _ = scan_repo_incremental(self._repo(), "owner/root", 1, api)
+        assert monkey is None
+        api.calls.clear()
+        
+        assert scan_repo_incremental(self._repo(), "owner/root", 1, api, state) == (None, state, True)
+        assert api.calls == []
+    
+    def test_fetch_error_keeps_stored_monkey(self):
+        """Test a failed file request leaves no new state and no placeholder monkey"""
+        api = self._api()
+        monkey, state, _ = scan_repo_incremental(self._repo(), "owner/root", 1, api)
+        
+        def bad_gateway(path, etag=None, raw=False):
+            raise GitHubAPIError(f"GET {path} failed: 502", 502)
+        
+        api.get_if_changed = bad_gateway
+        pushed = self._repo(pushed=datetime(2025, 2, 1, tzinfo=timezone.utc))
+        again, again_state, reused = scan_repo_incremental(pushed, "owner/root", 1, api, state, monkey)
+        
+        assert again_state is None and reused is False
+        assert again["monkey_stats"]["rarity_score"] == 40
+        assert again["monkey_svg"] == "<svg>fork1</svg>"
+        
+        # A repo never stored before gets nothing rather than a placeholder
+        assert scan_repo_incremental(pushed, "owner/root", 1, api) == (None, None, False)
+    
+    def test_state_survives_in_the_index(self, tmp_path):
+        """Test a second scan run against a stored index fetches nothing"""
+        repos = [(self._repo(), 1), (self._repo("user2/empty"), 1)]
+        api = self._api()
+        
+        index = CommunityIndex(tmp_path / "community.db")
+        index.begin_scan("owner/root")
+        for (repo, _), (monkey, state, _) in zip(repos, scan_repos_incremental(repos, "owner/root", api, {}, {})):
+            index.save_scan_state(repo.full_name, state["pushed_at"], state["files"])
+            if monkey:
+                index.upsert_monkey(monkey)
+        index.finish_scan()
+        index.close()
+        api.calls.clear()
+        
+        index = CommunityIndex(tmp_path / "community.db")
+        results = scan_repos_incremental(repos, "owner/root", api, index.scan_states(), index.stored_monkeys())
+        index.close()
+        
+        assert api.calls == []
+        assert [reused for _, _, reused in results] == [True, True]
+        assert results[0][0]["monkey_stats"]["rarity_score"] == 40
+        assert results[1][0] is None
+
+
+
+def monkey_files(dna, version=MonkeyVisualizer.VERSION):
+    """dna.json and stats.json contents of a fork's monkey"""
+    dna_data = GeneticsEngine.dna_to_dict(dna)
+    stats = {"dna_hash": dna.dna_hash, "generation": dna.generation, "rarity_score": 10,
+             "visualizer_version": version}
+    return dna_data, stats
+
+
+class TestLocalRendering:
+    """Test rendering fork SVGs from DNA instead of downloading them"""
+    
+    def test_render_matches_committed_svg(self):
+        """Test a render is the SVG the fork itself would have committed"""
+        dna = GeneticsEngine.generate_random_dna()
+        renders = RenderCache()
+        
+        assert renders.render(*monkey_files(dna)) == MonkeyVisualizer.generate_svg(dna)
+        assert renders.new == {dna.dna_hash: MonkeyVisualizer.generate_svg(dna)}
+    
+    def test_cache_hit(self):
+        """Test a DNA hash already rendered is not rendered again"""
+        dna = GeneticsEngine.generate_random_dna()
+        renders = RenderCache({dna.dna_hash: "<svg>cached</svg>"})
+        
+        assert renders.render(*monkey_files(dna)) == "<svg>cached</svg>"
+        assert renders.new == {}
+        assert renders.hits == 1
+    
+    def test_needs_download(self):
+        """Test missing DNA, another visualizer version or stale stats fall back to downloading"""
+        dna = GeneticsEngine.generate_random_dna()
+        dna_data, stats = monkey_files(dna)
+        renders = RenderCache()
+        
+        assert renders.render(None, stats) is None
+        assert renders.render(*monkey_files(dna, version=MonkeyVisualizer.VERSION + 1)) is None
+        assert renders.render(dna_data, {**stats, "visualizer_version": None}) is None
+        assert renders.render(dna_data, {**stats, "dna_hash": "0" * 16}) is None
+        assert renders.render({**dna_data, "traits": {"body_color": {}}}, stats) is None
+    
+    def test_incremental_scan_skips_the_svg(self):
+        """Test a renderable fork costs two small requests and no SVG download"""
+        dna = GeneticsEngine.generate_random_dna()
+        dna_data, stats = monkey_files(dna)
+        api = FakeContentsAPI({
+            "user1/fork1/monkey_data/stats.json": json.dumps(stats),
+            "user1/fork1/monkey_data/dna.json": json.dumps(dna_data),
+            "user1/fork1/monkey_data/monkey.svg": "<svg>downloaded</svg>"
+        })
+        
+        monkey, state, _ = scan_repo_incremental(
+            TestIncrementalScan()._repo(), "owner/root", 1, api, renders=RenderCache()
+        )
+        
+        assert [path for path, _ in api.calls] == [
+            "/repos/user1/fork1/contents/monkey_data/stats.json",
+            "/repos/user1/fork1/contents/monkey_data/dna.json"
+        ]
+        assert monkey["monkey_svg"] == MonkeyVisualizer.generate_svg(dna)
+        assert "monkey_data/monkey.svg" not in state["files"]
+    
+    def test_old_visualizer_downloads_the_svg(self):
+        """Test a fork on another visualizer version still gets its own SVG"""
+        dna_data, stats = monkey_files(GeneticsEngine.generate_random_dna(), version=None)
+        api = FakeContentsAPI({
+            "user1/fork1/monkey_data/stats.json": json.dumps(stats),
+            "user1/fork1/monkey_data/dna.json": json.dumps(dna_data),
+            "user1/fork1/monkey_data/monkey.svg": "<svg>downloaded</svg>"
+        })
+        
+        monkey, _, _ = scan_repo_incremental(TestIncrementalScan()._repo(), "owner/root", 1, api)
+        
+        assert monkey["monkey_svg"] == "<svg>downloaded</svg>"
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
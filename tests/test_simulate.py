@@ -0,0 +1,94 @@
+"""
+Tests for the lineage simulator
+"""
+
+import pytest
+from src.genetics import GeneticsEngine, Rarity, TraitCategory
+from src.simulate import GEN_LOCKED_VALUES, GenerationStats, run_simulation
+
+
+class TestRunSimulation:
+    """Test multi-generation simulation"""
+    
+    def test_generation_sizes(self):
+        """Test each generation has lineages * fan_out^(gen-1) monkeys"""
+        results = run_simulation(lineages=3, depth=3, fan_out=2, workers=1)
+        
+        assert [stats.generation for stats in results] == [1, 2, 3, 4]
+        assert [stats.count for stats in results] == [3, 6, 12, 24]
+    
+    def test_same_seed_same_results(self):
+        """Test runs are reproducible"""
+        run1 = run_simulation(lineages=4, depth=2, evolve_days=2, seed=5, workers=1)
+        run2 = run_simulation(lineages=4, depth=2, evolve_days=2, seed=5, workers=1)
+        
+        assert [s.to_dict() for s in run1] == [s.to_dict() for s in run2]
+    
+    def test_results_independent_of_worker_count(self):
+        """Test parallel runs match in-process runs"""
+        serial = run_simulation(lineages=6, depth=2, seed=3, workers=1)
+        parallel = run_simulation(lineages=6, depth=2, seed=3, workers=2)
+        
+        assert [s.to_dict() for s in serial] == [s.to_dict() for s in parallel]
+    
+    def test_histogram_covers_every_trait(self):
+        """Test rarity histograms count one trait per category per monkey"""
+        results = run_simulation(lineages=5, depth=1, workers=1)
+        
+        for stats in results:
+            for category in TraitCategory:
+                assert sum(stats.rarity_histogram[category].values()) == stats.count
+
+
+class TestGenerationStats:
+    """Test aggregate statistics"""
+    
+    def test_add_and_merge(self):
+        """Test merging matches adding every monkey to one aggregate"""
+        monkeys = [GeneticsEngine.generate_random_dna() for _ in range(6)]
+        
+        combined = GenerationStats(1)
+        for dna in monkeys:
+            combined.add(dna)
+        
+        left, right = GenerationStats(1), GenerationStats(1)
+        for dna in monkeys[:2]:
+            left.add(dna)
+        for dna in monkeys[2:]:
+            right.add(dna)
+        left.merge(right)
+        
+        assert left.to_dict() == combined.to_dict()
+        expected = sum(dna.get_rarity_score() for dna in monkeys) / len(monkeys)
+        assert left.avg_rarity == pytest.approx(expected)
+    
+    def test_gen_locked_tracking(self):
+        """Test gen-locked carriers are counted and others reported extinct"""
+        dna = GeneticsEngine.generate_random_dna()
+        dna.traits[TraitCategory.SPECIAL] = GeneticsEngine.get_trait(
+            TraitCategory.SPECIAL, "genesis_blessing", Rarity.LEGENDARY
+        )
+        
+        stats = GenerationStats(1)
+        stats.add(dna)
+        
+        assert stats.gen_locked_counts["special:genesis_blessing"] == 1
+        assert "special:genesis_blessing" not in stats.extinct_gen_locked
+        assert "special:pioneer_glow" in stats.extinct_gen_locked
+    
+    def test_gen_locked_carriers_count_monkeys(self):
+        """Test a monkey with two gen-locked traits is one carrier"""
+        dna = GeneticsEngine.generate_random_dna()
+        locked = [(category, values[0]) for category, values in GEN_LOCKED_VALUES.items()][:2]
+        for category, value in locked:
+            dna.traits[category] = GeneticsEngine.get_trait(category, value, Rarity.LEGENDARY)
+        
+        stats = GenerationStats(1)
+        stats.add(dna)
+        
+        assert sum(stats.gen_locked_counts.values()) == 2
+        assert stats.gen_locked_carriers == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -7,8 +7,18 @@ import json
 import tempfile
 import shutil
 from pathlib import Path
+from unittest.mock import MagicMock, patch
 from src.genetics import GeneticsEngine
-from src.storage import MonkeyStorage
+from src.visualizer import MonkeyVisualizer
+from src.storage import (
+    FileSystemBackend,
+    MemoryBackend,
+    MonkeyStorage,
+    RepoMetadataCache,
+    SQLiteBackend,
+    atomic_write,
+    create_backend
+)
 
 
 @pytest.fixture
@@ -71,6 +81,7 @@ class TestMonkeyStorage:
         assert stats["dna_hash"] == dna.dna_hash
         assert stats["age_days"] == 5
         assert "rarity_score" in stats
+        assert stats["visualizer_version"] == MonkeyVisualizer.VERSION
     
     def test_save_history_entry(self, temp_storage):
         """Test saving history entry"""
@@ -102,6 +113,248 @@ class TestMonkeyStorage:
         """Test getting history when empty"""
         history = temp_storage.get_history()
         assert history == []
+    
+    def test_history_is_append_only(self, temp_storage):
+        """Test each entry is appended as one line and the index tracks it"""
+        dna = GeneticsEngine.generate_random_dna()
+        temp_storage.save_history_entry(dna, "First 🐵")
+        first_size = temp_storage.backend.history_file.stat().st_size
+        temp_storage.save_history_entry(dna, "Second")
+        
+        data = temp_storage.backend.history_file.read_bytes()
+        lines = data.splitlines()
+        assert len(lines) == 2
+        assert json.loads(lines[0])["story"] == "First 🐵"
+        assert data[first_size:] == lines[1] + b"\n"
+        
+        with open(temp_storage.backend.history_index_file) as f:
+            assert json.load(f) == {"count": 2, "size": len(data)}
+    
+    def test_migrates_legacy_history(self, temp_storage):
+        """Test an old history.json is converted to history.jsonl on first use"""
+        entries = [{"timestamp": "2025-01-01T00:00:00", "story": "Old"}]
+        with open(temp_storage.backend.legacy_history_file, "w") as f:
+            json.dump({"entries": entries}, f, indent=2)
+        
+        temp_storage.save_history_entry(GeneticsEngine.generate_random_dna(), "New")
+        
+        history = temp_storage.get_history()
+        assert [entry["story"] for entry in history] == ["Old", "New"]
+        assert not temp_storage.backend.legacy_history_file.exists()
+    
+    def test_reading_legacy_history_changes_nothing(self, temp_storage):
+        """Test reads serve history.json as is; only the next write converts it"""
+        backend = temp_storage.backend
+        entries = [{"timestamp": "2025-01-01T00:00:00", "story": "Old"}]
+        with open(backend.legacy_history_file, "w") as f:
+            json.dump({"entries": entries}, f, indent=2)
+        before = sorted(path.name for path in backend.data_dir.iterdir())
+        
+        assert temp_storage.get_history() == entries
+        assert list(temp_storage.iter_history(reverse=True)) == entries
+        assert backend.count_history() == 1
+        
+        assert sorted(path.name for path in backend.data_dir.iterdir()) == before
+    
+    def test_reading_torn_history_changes_nothing(self, temp_storage):
+        """Test reads skip a torn final line without truncating the file or writing the index"""
+        temp_storage.save_history_entry(GeneticsEngine.generate_random_dna(), "Complete")
+        backend = temp_storage.backend
+        with open(backend.history_file, "ab") as f:
+            f.write(b'{"story": "Interru')
+        size = backend.history_file.stat().st_size
+        index = backend.history_index_file.read_bytes()
+        
+        assert backend.count_history() == 1
+        assert [entry["story"] for entry in temp_storage.get_history()] == ["Complete"]
+        
+        assert backend.history_file.stat().st_size == size
+        assert backend.history_index_file.read_bytes() == index
+    
+    def test_recovers_from_torn_append(self, temp_storage):
+        """Test a half-written final line is ignored and then dropped"""
+        dna = GeneticsEngine.generate_random_dna()
+        temp_storage.save_history_entry(dna, "Complete")
+        with open(temp_storage.backend.history_file, "ab") as f:
+            f.write(b'{"story": "Interru')
+        
+        assert [entry["story"] for entry in temp_storage.get_history()] == ["Complete"]
+        
+        temp_storage.save_history_entry(dna, "Next")
+        assert [entry["story"] for entry in temp_storage.get_history()] == ["Complete", "Next"]
+
+
+class TestAtomicWrites:
+    """Test crash-safe file writes"""
+    
+    def test_atomic_write_replaces_file(self, tmp_path):
+        """Test the new contents replace the old and no temp files remain"""
+        path = tmp_path / "data.json"
+        path.write_text("old")
+        
+        atomic_write(path, b"new")
+        
+        assert path.read_text() == "new"
+        assert [p.name for p in tmp_path.iterdir()] == ["data.json"]
+    
+    def test_commit_evolution(self, temp_storage):
+        """Test DNA, stats and history are saved together"""
+        dna = GeneticsEngine.generate_random_dna()
+        
+        assert temp_storage.commit_evolution(dna, "Born", svg_filename="a.svg", age_days=2)
+        
+        assert temp_storage.load_dna().dna_hash == dna.dna_hash
+        with open("monkey_data/stats.json") as f:
+            assert json.load(f)["age_days"] == 2
+        assert temp_storage.tail_history(1)[0]["svg_filename"] == "a.svg"
+        assert not list(Path("monkey_data").glob("*.tmp"))
+    
+    def test_failed_commit_keeps_previous_files(self, temp_storage, monkeypatch):
+        """Test a failure before the files are in place leaves them and the history untouched"""
+        old = GeneticsEngine.generate_random_dna()
+        temp_storage.commit_evolution(old, "Born")
+        
+        def fail(temp_path, path):
+            raise OSError("disk full")
+        monkeypatch.setattr("src.storage._commit_write", fail)
+        
+        assert not temp_storage.commit_evolution(GeneticsEngine.generate_random_dna(), "Evolved")
+        assert temp_storage.load_dna().dna_hash == old.dna_hash
+        with open("monkey_data/stats.json") as f:
+            assert json.load(f)["dna_hash"] == old.dna_hash
+        assert [entry["story"] for entry in temp_storage.iter_history()] == ["Born"]
+        assert not list(Path("monkey_data").glob("*.tmp"))
+    
+    def test_history_is_appended_last(self, temp_storage, monkeypatch):
+        """Test the history entry is only written once the new files are in place"""
+        dna = GeneticsEngine.generate_random_dna()
+        append = temp_storage.backend._append_history
+        
+        def check_files_first(entries):
+            with open("monkey_data/dna.json") as f:
+                assert json.load(f)["dna_hash"] == dna.dna_hash
+            append(entries)
+        monkeypatch.setattr(temp_storage.backend, "_append_history", check_files_first)
+        
+        assert temp_storage.commit_evolution(dna, "Born")
+        assert temp_storage.count_history() == 1
+
+
+class TestStorageSession:
+    """Test cached, deferred-write storage sessions"""
+    
+    def test_reads_each_file_once(self, temp_storage, monkeypatch):
+        """Test repeated loads inside a session hit the cache"""
+        temp_storage.commit_evolution(GeneticsEngine.generate_random_dna(), "Born")
+        reads = []
+        original = temp_storage._read_json.__func__
+        
+        def counting_read(self, name):
+            if name not in self._session["documents"]:
+                reads.append(name)
+            return original(self, name)
+        monkeypatch.setattr(MonkeyStorage, "_read_json", counting_read)
+        
+        with temp_storage.session():
+            temp_storage.load_dna()
+            temp_storage.load_dna()
+            temp_storage.get_streak()
+            temp_storage.save_stats(temp_storage.load_dna(), age_days=1)
+        
+        assert sorted(reads) == ["dna", "stats"]
+    
+    def test_writes_deferred_until_exit(self, temp_storage):
+        """Test changes are visible inside the session and on disk only after it"""
+        dna = GeneticsEngine.generate_random_dna()
+        
+        with temp_storage.session():
+            temp_storage.commit_evolution(dna, "Born")
+            temp_storage.save_history_entry(dna, "Again")
+            
+            assert not Path("monkey_data/dna.json").exists()
+            assert temp_storage.load_dna().dna_hash == dna.dna_hash
+            assert temp_storage.count_history() == 2
+            assert [e["story"] for e in temp_storage.tail_history(2)] == ["Born", "Again"]
+        
+        assert MonkeyStorage().load_dna().dna_hash == dna.dna_hash
+        assert [e["story"] for e in temp_storage.get_history()] == ["Born", "Again"]
+        assert temp_storage.count_history() == 2
+    
+    def test_error_discards_changes(self, temp_storage):
+        """Test nothing is written when the session block raises"""
+        with pytest.raises(RuntimeError):
+            with temp_storage.session():
+                temp_storage.commit_evolution(GeneticsEngine.generate_random_dna(), "Born")
+                raise RuntimeError("evolution failed")
+        
+        assert temp_storage.load_dna() is None
+        assert temp_storage.count_history() == 0
+
+
+class TestHistoryReader:
+    """Test streaming and paginated history access"""
+    
+    @pytest.fixture
+    def filled_storage(self, temp_storage):
+        """Storage with 50 history entries whose timestamps increase"""
+        entries = [
+            {"timestamp": f"2025-01-01T00:00:{second:02d}", "story": f"Day {second}", "note": "x" * 300}
+            for second in range(50)
+        ]
+        temp_storage.replace_history(entries)
+        return temp_storage
+    
+    def test_iter_history_forward_and_reverse(self, filled_storage):
+        """Test iteration order in both directions"""
+        forward = [entry["story"] for entry in filled_storage.iter_history()]
+        backward = [entry["story"] for entry in filled_storage.iter_history(reverse=True)]
+        
+        assert forward == [f"Day {second}" for second in range(50)]
+        assert backward == forward[::-1]
+    
+    def test_iter_history_since_and_limit(self, filled_storage):
+        """Test filtering by timestamp and limiting the number of entries"""
+        since = "2025-01-01T00:00:45"
+        
+        assert len(list(filled_storage.iter_history(since=since))) == 5
+        assert len(list(filled_storage.iter_history(reverse=True, since=since))) == 5
+        assert [e["story"] for e in filled_storage.iter_history(limit=2)] == ["Day 0", "Day 1"]
+    
+    def test_reverse_reads_across_blocks(self, filled_storage):
+        """Test backwards reading with blocks smaller than a line"""
+        entries = list(filled_storage.backend._read_history_entries_reversed(block_size=64))
+        
+        assert [entry["story"] for entry in entries] == [f"Day {second}" for second in range(49, -1, -1)]
+    
+    def test_tail_and_count(self, filled_storage):
+        """Test the last entries and the entry count"""
+        assert [entry["story"] for entry in filled_storage.tail_history(3)] == ["Day 47", "Day 48", "Day 49"]
+        assert filled_storage.count_history() == 50
+    
+    def test_count_without_index(self, filled_storage):
+        """Test the count is recomputed when the index is missing, and the index rebuilt on the next write"""
+        filled_storage.backend.history_index_file.unlink()
+        
+        assert filled_storage.count_history() == 50
+        assert not filled_storage.backend.history_index_file.exists()
+        
+        filled_storage.save_history_entry(GeneticsEngine.generate_random_dna(), "Day 50")
+        assert filled_storage.count_history() == 51
+        assert filled_storage.backend.history_index_file.exists()
+    
+    def test_reverse_skips_torn_line(self, filled_storage):
+        """Test an interrupted append is not returned as the newest entry"""
+        with open(filled_storage.backend.history_file, "ab") as f:
+            f.write(b'{"story": "Interru')
+        
+        assert filled_storage.tail_history(1)[0]["story"] == "Day 49"
+        assert filled_storage.count_history() == 50
+    
+    def test_empty_history(self, temp_storage):
+        """Test readers with no history file"""
+        assert temp_storage.tail_history(5) == []
+        assert temp_storage.count_history() == 0
+        assert list(temp_storage.iter_history(reverse=True)) == []
 
 
 class TestStreakSystem:
@@ -154,5 +407,153 @@ class TestStreakSystem:
         assert stats["streak"]["best"] >= 1
 
 
+
+@pytest.fixture(params=["filesystem", "sqlite", "memory"])
+def backend(request, tmp_path):
+    """Each storage backend, writing under a temporary directory"""
+    if request.param == "filesystem":
+        return FileSystemBackend(tmp_path / "monkey_data")
+    if request.param == "sqlite":
+        return SQLiteBackend(tmp_path / "monkeys.db", "owner/monkey")
+    return MemoryBackend()
+
+
+class TestStorageBackends:
+    """Test every backend behaves the same through MonkeyStorage"""
+    
+    def test_dna_stats_and_history(self, backend):
+        """Test the full save/load cycle"""
+        storage = MonkeyStorage(backend=backend)
+        dna = GeneticsEngine.generate_random_dna()
+        
+        assert storage.load_dna() is None
+        assert storage.commit_evolution(dna, "Born", age_days=1)
+        storage.save_history_entry(dna, "Again")
+        
+        assert storage.load_dna().dna_hash == dna.dna_hash
+        assert storage.get_streak()["current"] == 1
+        assert storage.count_history() == 2
+        assert [entry["story"] for entry in storage.get_history()] == ["Born", "Again"]
+        assert [entry["story"] for entry in storage.tail_history(1)] == ["Again"]
+    
+    def test_history_queries(self, backend):
+        """Test since, limit and reverse are applied by the backend"""
+        entries = [{"timestamp": f"2025-01-0{day}T00:00:00", "story": str(day)} for day in range(1, 10)]
+        backend.replace_history(entries)
+        
+        assert [e["story"] for e in backend.iter_history(reverse=True, limit=3)] == ["9", "8", "7"]
+        assert [e["story"] for e in backend.iter_history(since="2025-01-08T00:00:00")] == ["8", "9"]
+        assert [e["story"] for e in backend.iter_history(reverse=True, since="2025-01-08T00:00:00")] == ["9", "8"]
+        assert backend.count_history() == 9
+    
+    def test_session(self, backend):
+        """Test sessions defer writes on every backend"""
+        storage = MonkeyStorage(backend=backend)
+        dna = GeneticsEngine.generate_random_dna()
+        
+        with storage.session():
+            storage.commit_evolution(dna, "Born")
+            assert backend.read_document("dna") is None
+        
+        assert backend.read_document("dna")["dna_hash"] == dna.dna_hash
+        assert backend.count_history() == 1
+
+
+class TestBackendSelection:
+    """Test configuring which backend MonkeyStorage uses"""
+    
+    def test_sqlite_keeps_repos_apart(self, tmp_path):
+        """Test many monkeys can share one database"""
+        path = tmp_path / "monkeys.db"
+        first = MonkeyStorage(repo_name="a/monkey", backend=SQLiteBackend(path, "a/monkey"))
+        second = MonkeyStorage(repo_name="b/monkey", backend=SQLiteBackend(path, "b/monkey"))
+        
+        first.commit_evolution(GeneticsEngine.generate_random_dna(), "A")
+        
+        assert second.load_dna() is None
+        assert second.count_history() == 0
+        assert first.count_history() == 1
+    
+    def test_create_backend_from_environment(self, tmp_path, monkeypatch):
+        """Test the backend can be chosen with environment variables"""
+        monkeypatch.setenv("MONKEY_STORAGE_BACKEND", "sqlite")
+        monkeypatch.setenv("MONKEY_STORAGE_PATH", str(tmp_path / "monkeys.db"))
+        
+        backend = create_backend(repo_name="a/monkey")
+        
+        assert isinstance(backend, SQLiteBackend)
+        assert backend.path == tmp_path / "monkeys.db"
+        assert isinstance(create_backend("memory"), MemoryBackend)
+    
+    def test_default_is_filesystem(self, temp_storage):
+        """Test the JSON files in monkey_data/ stay the default"""
+        assert isinstance(temp_storage.backend, FileSystemBackend)
+        assert temp_storage.backend.data_dir == Path("monkey_data")
+    
+    def test_unknown_backend(self):
+        """Test a misconfigured backend name is reported"""
+        with pytest.raises(ValueError):
+            create_backend("redis")
+
+
+class TestGitHubAccess:
+    """Test the GitHub client is only created when needed"""
+    
+    @pytest.fixture
+    def github(self, tmp_path, monkeypatch):
+        """Mock GitHub client for a fork of root/forkMonkey"""
+        monkeypatch.setenv("MONKEY_CACHE_DIR", str(tmp_path / "cache"))
+        client = MagicMock()
+        client.get_repo.return_value.fork = True
+        client.get_repo.return_value.parent.full_name = "root/forkMonkey"
+        with patch("src.storage.github_client", return_value=client) as factory:
+            yield factory
+    
+    def test_local_commands_do_not_touch_github(self, github):
+        """Test creating storage and reading data makes no API calls"""
+        storage = MonkeyStorage(repo_name="a/monkey", github_token="token", backend=MemoryBackend())
+        storage.load_dna()
+        storage.get_history()
+        
+        github.assert_not_called()
+    
+    def test_detect_fork_fetches_once(self, github):
+        """Test the repo handle is fetched on first use and then reused"""
+        storage = MonkeyStorage(repo_name="a/monkey", github_token="token", backend=MemoryBackend())
+        
+        assert storage.detect_fork() == "root/forkMonkey"
+        assert storage.detect_fork() == "root/forkMonkey"
+        
+        github.return_value.get_repo.assert_called_once_with("a/monkey")
+    
+    def test_repo_metadata_cached_on_disk(self, github):
+        """Test a new storage answers detect_fork from the on-disk cache"""
+        MonkeyStorage(repo_name="a/monkey", github_token="token", backend=MemoryBackend()).detect_fork()
+        
+        storage = MonkeyStorage(repo_name="a/monkey", github_token="token", backend=MemoryBackend())
+        assert storage.detect_fork() == "root/forkMonkey"
+        assert github.return_value.get_repo.call_count == 1
+    
+    def test_repo_metadata_expires(self, tmp_path):
+        """Test cached metadata is ignored after the TTL"""
+        cache = RepoMetadataCache(tmp_path / "repos.json", ttl=60)
+        cache.set("a/monkey", {"fork": False, "parent": None})
+        
+        assert cache.get("a/monkey") == {"fork": False, "parent": None}
+        assert cache.get("b/monkey") is None
+        
+        with patch("src.storage.time.time", return_value=10 ** 12):
+            assert cache.get("a/monkey") is None
+    
+    def test_no_token_no_client(self, github, monkeypatch):
+        """Test storage without a token never creates a client"""
+        monkeypatch.delenv("GITHUB_TOKEN", raising=False)
+        storage = MonkeyStorage(repo_name="a/monkey", backend=MemoryBackend())
+        
+        assert storage.github is None
+        assert storage.detect_fork() is None
+        github.assert_not_called()
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,157 @@
+"""
+Tests for the content-addressed SVG archive
+"""
+
+import json
+import pytest
+from datetime import datetime, timezone
+
+from src.svg_archive import HAS_ZSTD, SVGArchive, SVGPack, content_hash, snapshot_filename
+
+
+@pytest.fixture
+def archive(tmp_path):
+    """Empty archive in a temporary directory"""
+    return SVGArchive(tmp_path / "monkey_evolution")
+
+
+class TestSVGArchive:
+    """Test archiving and reading snapshots"""
+
+    def test_snapshot_filename(self):
+        """Test snapshot names keep the legacy timestamp format"""
+        moment = datetime(2025, 11, 20, 17, 32, tzinfo=timezone.utc)
+        assert snapshot_filename(moment) == "2025-11-20_17-32_monkey.svg"
+
+    def test_add_and_read(self, archive):
+        """Test a snapshot reads back through the manifest"""
+        filename = archive.add("<svg>a</svg>", "2025-01-01_00-00_monkey.svg")
+
+        assert filename == "2025-01-01_00-00_monkey.svg"
+        assert archive.read(filename) == "<svg>a</svg>"
+        assert filename in archive
+        assert archive.read("2025-01-02_00-00_monkey.svg") is None
+
+    def test_identical_snapshots_share_one_object(self, archive):
+        """Test duplicate renders add a manifest entry but no file"""
+        archive.add("<svg>a</svg>", "2025-01-01_00-00_monkey.svg")
+        archive.add("<svg>a</svg>", "2025-01-02_00-00_monkey.svg")
+        archive.add("<svg>b</svg>", "2025-01-03_00-00_monkey.svg")
+
+        assert len(list(archive.objects_dir.iterdir())) == 2
+        assert archive.path("2025-01-01_00-00_monkey.svg") == archive.path("2025-01-02_00-00_monkey.svg")
+
+    def test_manifest_on_disk(self, archive):
+        """Test the manifest maps snapshot filenames to content hashes"""
+        archive.add("<svg>a</svg>", "2025-01-01_00-00_monkey.svg")
+
+        with open(archive.manifest_file) as f:
+            manifest = json.load(f)
+
+        assert manifest["snapshots"] == {"2025-01-01_00-00_monkey.svg": content_hash("<svg>a</svg>")}
+        assert SVGArchive(archive.root).read("2025-01-01_00-00_monkey.svg") == "<svg>a</svg>"
+
+    def test_migrates_flat_files(self, archive):
+        """Test legacy <timestamp>_monkey.svg files move into the object store"""
+        archive.root.mkdir()
+        (archive.root / "2025-01-01_00-00_monkey.svg").write_text("<svg>a</svg>")
+        (archive.root / "2025-01-02_00-00_monkey.svg").write_text("<svg>a</svg>")
+
+        # Readable before migration
+        assert archive.read("2025-01-01_00-00_monkey.svg") == "<svg>a</svg>"
+
+        # Adding a snapshot leaves them in place
+        archive.add("<svg>b</svg>", "2025-01-03_00-00_monkey.svg")
+        assert len(list(archive.root.glob("*_monkey.svg"))) == 2
+
+        assert archive.migrate() == 2
+
+        assert list(archive.root.glob("*_monkey.svg")) == []
+        assert len(list(archive.objects_dir.iterdir())) == 2
+        assert archive.read("2025-01-02_00-00_monkey.svg") == "<svg>a</svg>"
+
+    def test_snapshots_in_order(self, archive):
+        """Test snapshots are listed oldest first, legacy files included"""
+        archive.add("<svg>b</svg>", "2025-01-02_00-00_monkey.svg")
+        (archive.root / "2025-01-01_00-00_monkey.svg").write_text("<svg>a</svg>")
+
+        names = [filename for filename, _ in archive.snapshots()]
+        assert names == ["2025-01-01_00-00_monkey.svg", "2025-01-02_00-00_monkey.svg"]
+
+    def test_read_at(self, archive):
+        """Test the snapshot current at a moment in time is found"""
+        archive.add("<svg>a</svg>", "2025-01-01_00-00_monkey.svg")
+        archive.add("<svg>b</svg>", "2025-01-03_00-00_monkey.svg")
+
+        assert archive.read_at("2025-01-02T12:00:00") == "<svg>a</svg>"
+        assert archive.read_at("2025-01-03T00:00:00+00:00") == "<svg>b</svg>"
+        assert archive.read_at(datetime(2030, 1, 1, tzinfo=timezone.utc)) == "<svg>b</svg>"
+        assert archive.read_at("2024-12-31T23:59:00") is None
+
+
+def render(color: str) -> str:
+    """An SVG that only differs from its siblings in one fragment"""
+    body = "".join(f'<circle cx="{i}" cy="{i}" r="{i % 7}" fill="#{i:06x}"/>' for i in range(200))
+    return f'<svg xmlns="http://www.w3.org/2000/svg">{body}<rect fill="{color}"/></svg>'
+
+
+class TestSVGPack:
+    """Test packing the archive into one compressed file"""
+
+    @pytest.fixture
+    def filled(self, archive):
+        """Archive with three distinct renders over five snapshots"""
+        for day, color in enumerate(["red", "red", "blue", "green", "red"], start=1):
+            archive.add(render(color), f"2025-01-0{day}_00-00_monkey.svg")
+        return archive
+
+    def test_pack_round_trip(self, filled):
+        """Test every snapshot reads back identically from the pack"""
+        before = {filename: filled.read(filename) for filename, _ in filled.snapshots()}
+
+        count, raw_size, packed_size = filled.pack_objects()
+
+        assert count == 3
+        assert packed_size < raw_size / 3
+        assert not filled.objects_dir.exists()
+        assert {filename: filled.read(filename) for filename in before} == before
+        assert SVGArchive(filled.root).read_at("2025-01-03T12:00:00") == render("blue")
+
+    def test_add_after_pack(self, filled):
+        """Test known renders stay packed and new ones are stored loose"""
+        filled.pack_objects()
+
+        filled.add(render("red"), "2025-01-06_00-00_monkey.svg")
+        assert not filled.objects_dir.exists()
+
+        filled.add(render("pink"), "2025-01-07_00-00_monkey.svg")
+        assert filled.read("2025-01-07_00-00_monkey.svg") == render("pink")
+
+        # Repacking merges the loose object into the pack
+        assert filled.pack_objects()[0] == 4
+
+    def test_unpack(self, filled):
+        """Test unpacking restores the loose objects"""
+        filled.pack_objects()
+
+        assert filled.unpack_objects() == 3
+        assert not filled.pack.exists()
+        assert filled.path("2025-01-03_00-00_monkey.svg").read_text() == render("blue")
+
+    def test_rejects_foreign_file(self, tmp_path):
+        """Test a file that is not a pack is reported"""
+        path = tmp_path / "objects.pack"
+        path.write_bytes(b"not a pack at all, definitely")
+
+        with pytest.raises(ValueError):
+            SVGPack(path).get("abc")
+
+    @pytest.mark.skipif(HAS_ZSTD, reason="zstandard is installed")
+    def test_zstd_needs_zstandard(self, filled):
+        """Test zstd packing explains the missing optional dependency"""
+        with pytest.raises(RuntimeError):
+            filled.pack_objects("zstd")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
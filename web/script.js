@@ -15,7 +15,8 @@ const ForkMonkey = {
         community: null,
         leaderboard: null,
         familyTree: null,
-        networkStats: null
+        networkStats: null,
+        svgManifest: null
     },
 
     currentTab: 'dashboard',
@@ -163,7 +164,10 @@ const ForkMonkey = {
             // Files in monkey_data/ (outside web/ in dev, inside web/ in prod)
             ['dna', `${basePath}monkey_data/dna.json`],
             ['stats', `${basePath}monkey_data/stats.json`],
-            ['history', `${basePath}monkey_data/history.json`],
+            // history.jsonl has one entry per line; history.json is the legacy layout
+            ['history', `${basePath}monkey_data/history.jsonl`, `${basePath}monkey_data/history.json`],
+            // Snapshot filename -> content hash of the SVG in monkey_evolution/objects/
+            ['svgManifest', `${basePath}monkey_evolution/manifest.json`],
             // Files in web/ (same folder as index.html)
             ['community', 'community_data.json'],
             ['leaderboard', 'leaderboard.json'],
@@ -172,10 +176,17 @@ const ForkMonkey = {
         ];
 
         const results = await Promise.allSettled(
-            files.map(async ([key, url]) => {
-                const response = await fetch(url);
+            files.map(async ([key, url, fallbackUrl]) => {
+                let response = await fetch(url);
+                if (!response.ok && fallbackUrl) {
+                    url = fallbackUrl;
+                    response = await fetch(url);
+                }
                 if (!response.ok) throw new Error(`Failed to load ${key}`);
-                return { key, data: await response.json() };
+                const data = url.endsWith('.jsonl')
+                    ? this.parseJsonLines(await response.text())
+                    : await response.json();
+                return { key, data };
             })
         );
 
@@ -189,6 +200,22 @@ const ForkMonkey = {
         this.updateNavStats();
     },
 
+    /**
+     * Parse a JSON Lines file into { entries: [...] }, skipping blank or torn lines
+     */
+    parseJsonLines(text) {
+        const entries = [];
+        text.split('\n').forEach(line => {
+            if (!line.trim()) return;
+            try {
+                entries.push(JSON.parse(line));
+            } catch (error) {
+                console.log('Skipping malformed history line:', error);
+            }
+        });
+        return { entries };
+    },
+
     /**
      * Update navigation bar stats
      */
@@ -581,7 +608,8 @@ const ForkMonkey = {
 
     /**
      * Get evolution SVG for a specific history entry
-     * Uses svg_filename if available (new entries), otherwise calculates from timestamp (legacy)
+     * Uses svg_filename if available (new entries), otherwise calculates from timestamp (legacy),
+     * and resolves it through monkey_evolution/manifest.json when the snapshot is archived by hash
      * 
      * @param {string} timestamp - ISO timestamp of the entry
      * @param {string|null} svgFilename - Direct SVG filename if available
@@ -607,18 +635,22 @@ const ForkMonkey = {
             filename = `${year}-${month}-${day}_${hours}-${minutes}_monkey.svg`;
         }
 
-        // Check cache
-        if (this.svgCache[filename]) {
-            return this.svgCache[filename];
-        }
+        // Archived snapshots are stored by content hash; older ones as flat files
+        const svgHash = this.data.svgManifest?.snapshots?.[filename];
+        const svgPath = svgHash
+            ? `${basePath}monkey_evolution/objects/${svgHash}.svg`
+            : `${basePath}monkey_evolution/${filename}`;
 
-        const svgPath = `${basePath}monkey_evolution/${filename}`;
+        // Check cache (identical snapshots share one object)
+        if (this.svgCache[svgPath]) {
+            return this.svgCache[svgPath];
+        }
 
         try {
             const response = await fetch(svgPath);
             if (response.ok) {
                 const svgContent = await response.text();
-                this.svgCache[filename] = svgContent;
+                this.svgCache[svgPath] = svgContent;
                 return svgContent;
             }
         } catch (error) {